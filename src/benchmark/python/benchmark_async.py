@@ -0,0 +1,140 @@
+"""Throughput of AsyncHotelManager with many concurrent requests, compared with HotelManager.
+
+The same synthetic reservations, arrivals and checkouts are processed one after the other by HotelManager, and as
+concurrent requests of an event loop by AsyncHotelManager. The requests per second of each one are written as json.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_async.py --requests 2000 --concurrency 64 --output async.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel.AsyncHotelManager import AsyncHotelManager
+from UC3MTravel.HotelManager import HotelManager
+from benchmark_hotel_manager import makeReservation, makeStoredReservation, makeStoredStay
+
+
+def writeArrivalFiles(hotel_manager: HotelManager, reservations: list):
+    """Writes a stay file for each of the reservations and returns their names. guestArrival checks that the
+    reservation was made on the arrival date, so the reservations are stored again as if they had been made at the
+    beginning of the day"""
+    today_timestamp = datetime.timestamp(datetime.strptime(reservations[0]["arrival_date"], "%d/%m/%Y"))
+    stays_directory = hotel_manager.getJsonDirectory("stays_store")
+    arrival_files = []
+    for parameters in reservations:
+        reservation = makeStoredReservation(parameters, today_timestamp)
+        hotel_manager.storage.saveReservations({reservation["id_card"]: reservation})
+        file_name = f"benchmark_arrival_{reservation['id_card']}.json"
+        with open(os.path.join(stays_directory, file_name), "w", encoding="utf-8") as stay_file:
+            json.dump({"Localizer": reservation["localizer"], "IdCard": reservation["id_card"]}, stay_file)
+        arrival_files.append(file_name)
+    return arrival_files
+
+
+def writeLeavingStays(hotel_manager: HotelManager, id_cards: list):
+    """Stores a processed stay that leaves today for each of the reservations and returns their room keys"""
+    departure = datetime.timestamp(datetime.utcnow())
+    room_keys = []
+    for id_card in id_cards:
+        stay = makeStoredStay(hotel_manager.storage.loadReservation(id_card), departure)
+        hotel_manager.storage.saveStays({stay["room_key"]: stay})
+        room_keys.append(stay["room_key"])
+    return room_keys
+
+
+def result(implementation: str, operation: str, requests: int, seconds: float):
+    """Returns the result of processing the given requests in the given seconds"""
+    return {"implementation": implementation,
+            "operation": operation,
+            "requests": requests,
+            "requests_per_second": requests / seconds if seconds else None}
+
+
+def benchmarkSync(reservations: list):
+    """Processes every request with HotelManager, one after the other"""
+    results = []
+    with tempfile.TemporaryDirectory() as storage_root:
+        hotel_manager = HotelManager(storage_root=storage_root)
+        start = time.perf_counter()
+        for parameters in reservations:
+            hotel_manager.roomReservation(**parameters)
+        results.append(result("HotelManager", "roomReservation", len(reservations), time.perf_counter() - start))
+
+        arrival_files = writeArrivalFiles(hotel_manager, reservations)
+        start = time.perf_counter()
+        for file_name in arrival_files:
+            hotel_manager.guestArrival(file_name)
+        results.append(result("HotelManager", "guestArrival", len(arrival_files), time.perf_counter() - start))
+
+        room_keys = writeLeavingStays(hotel_manager, [parameters["id_card"] for parameters in reservations])
+        start = time.perf_counter()
+        for room_key in room_keys:
+            hotel_manager.guest_checkout(room_key)
+        results.append(result("HotelManager", "guest_checkout", len(room_keys), time.perf_counter() - start))
+    return results
+
+
+async def benchmarkAsync(reservations: list, concurrency: int, max_workers: int):
+    """Processes every request with AsyncHotelManager, with up to concurrency requests at the same time"""
+    results = []
+    name = f"AsyncHotelManager({max_workers} workers)"
+    with tempfile.TemporaryDirectory() as storage_root:
+        async with AsyncHotelManager(storage_root=storage_root, max_workers=max_workers,
+                                     max_pending=concurrency) as hotel_manager:
+            start = time.perf_counter()
+            await asyncio.gather(*(hotel_manager.roomReservation(**parameters) for parameters in reservations))
+            results.append(result(name, "roomReservation", len(reservations), time.perf_counter() - start))
+
+            arrival_files = writeArrivalFiles(hotel_manager.hotel_manager, reservations)
+            start = time.perf_counter()
+            await asyncio.gather(*(hotel_manager.guestArrival(file_name) for file_name in arrival_files))
+            results.append(result(name, "guestArrival", len(arrival_files), time.perf_counter() - start))
+
+            room_keys = writeLeavingStays(hotel_manager.hotel_manager,
+                                          [parameters["id_card"] for parameters in reservations])
+            start = time.perf_counter()
+            await asyncio.gather(*(hotel_manager.guest_checkout(room_key) for room_key in room_keys))
+            results.append(result(name, "guest_checkout", len(room_keys), time.perf_counter() - start))
+    return results
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests of each function")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in the pool at the same time")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16], help="threads of AsyncHotelManager")
+    parser.add_argument("--seed", type=int, default=87, help="seed of the synthetic data")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    today = datetime.utcnow().strftime("%d/%m/%Y")
+    reservations = [makeReservation(rng, number, today) for number in range(args.requests)]
+
+    results = benchmarkSync(reservations)
+    for max_workers in args.workers:
+        results.extend(asyncio.run(benchmarkAsync(reservations, args.concurrency, max_workers)))
+
+    output = json.dumps({"python": platform.python_version(), "concurrency": args.concurrency, "results": results},
+                        indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
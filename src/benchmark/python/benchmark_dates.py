@@ -0,0 +1,91 @@
+"""Benchmark of the parsing of "DD/MM/YYYY" dates.
+
+The dates of the reservations are parsed with datetime.strptime and with the functions of DateCodec, once with an
+empty memo (every string parsed for the first time) and once with the memo already filled (the strings of a hotel
+repeat), and the median nanoseconds per date of each way are written as json.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_dates.py --dates 10000 --repeat 5 --output dates.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel.DateCodec import clearMemo, dateTimestamp, parseDate
+
+# Different days used by the generated dates, like the days of the reservations of a year
+DIFFERENT_DAYS = 365
+
+
+def makeDates(count: int):
+    """Returns count "DD/MM/YYYY" strings of DIFFERENT_DAYS consecutive days"""
+    first = date(2024, 1, 1)
+    return [(first + timedelta(days=index % DIFFERENT_DAYS)).strftime("%d/%m/%Y") for index in range(count)]
+
+
+def strptimeDate(text: str):
+    """The way the HotelManager parsed the dates before DateCodec"""
+    return datetime.strptime(text, "%d/%m/%Y").date()
+
+
+def strptimeTimestamp(text: str):
+    """The way guestArrival computed the timestamps before DateCodec"""
+    return datetime.timestamp(datetime.strptime(text, "%d/%m/%Y"))
+
+
+def measure(function, dates, memo: str):
+    """Returns the nanoseconds per date of calling function for each date. The memo is emptied before starting when
+    memo is "cold", and filled before starting when it is "warm" """
+    clearMemo()
+    if memo == "warm":
+        for text in dates:
+            function(text)
+    start = time.perf_counter_ns()
+    for text in dates:
+        function(text)
+    return (time.perf_counter_ns() - start) / len(dates)
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dates", type=int, default=10000, help="dates parsed in each repetition")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions of each measure")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    dates = makeDates(args.dates)
+    cases = [("date", "strptime", strptimeDate, "cold"),
+             ("date", "parseDate", parseDate.__wrapped__, "cold"),
+             ("date", "parseDate", parseDate, "cold"),
+             ("date", "parseDate", parseDate, "warm"),
+             ("timestamp", "strptime", strptimeTimestamp, "cold"),
+             ("timestamp", "dateTimestamp", dateTimestamp, "cold"),
+             ("timestamp", "dateTimestamp", dateTimestamp, "warm")]
+    results = []
+    for result, name, function, memo in cases:
+        # The unwrapped parseDate shows the cost of the codec itself, without the memo
+        memo_name = "none" if function is parseDate.__wrapped__ else memo
+        times = [measure(function, dates, memo) for _ in range(args.repeat)]
+        results.append({"result": result, "parser": name, "memo": memo_name, "dates": args.dates,
+                        "ns_per_date_p50": statistics.median(times)})
+    clearMemo()
+    output = json.dumps({"python": platform.python_version(), "different_days": DIFFERENT_DAYS, "results": results},
+                        indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
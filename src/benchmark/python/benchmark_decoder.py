@@ -0,0 +1,82 @@
+"""Parse plus validate time per record of the json schemas of HotelJsonDecoder.
+
+Synthetic stay files, reservations and processed stays are decoded into their records, and compared with the previous
+read path: json.loads followed by copying every key into a positional tuple. The results are written as json.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_decoder.py --records 100000 --output decoder.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel import HotelJsonDecoder
+from UC3MTravel.HotelJsonDecoder import PROCESSED_STAY_SCHEMA, RESERVATION_SCHEMA, STAY_REQUEST_SCHEMA
+from benchmark_hotel_manager import makeReservation, makeStoredReservation, makeStoredStay
+
+
+def previousDecode(content: bytes, keys: tuple):
+    """Previous read path: the json is parsed and every key is copied into a tuple"""
+    data = json.loads(content)
+    return tuple(data[key] for key in keys)
+
+
+def timeDecoder(decoder, documents: list):
+    """Returns the nanoseconds per document needed to decode every document"""
+    start = time.perf_counter()
+    for document in documents:
+        decoder(document)
+    return (time.perf_counter() - start) / len(documents) * 1e9
+
+
+def compare(name: str, schema, documents: list):
+    """Times the previous read path and the schema over the same documents"""
+    previous_ns = timeDecoder(lambda document: previousDecode(document, schema.keys), documents)
+    current_ns = timeDecoder(schema.decodeJson, documents)
+    return {"record": name,
+            "records": len(documents),
+            "previous_ns_per_record": previous_ns,
+            "schema_ns_per_record": current_ns,
+            "speedup": previous_ns / current_ns}
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000, help="documents decoded of each kind")
+    parser.add_argument("--seed", type=int, default=87, help="seed of the synthetic data")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    reservations = [makeStoredReservation(makeReservation(rng, number, "01/07/2024"), 1719792000.0)
+                    for number in range(args.records)]
+    # The documents are encoded as they are written in the stores
+    stay_requests = [json.dumps({"Localizer": data["localizer"], "IdCard": data["id_card"]}, indent=4).encode()
+                     for data in reservations]
+    stays = [json.dumps(makeStoredStay(data, 1719878400.0), indent=4).encode() for data in reservations]
+    reservations = [json.dumps(data, indent=4).encode() for data in reservations]
+
+    results = [compare("StayRequest", STAY_REQUEST_SCHEMA, stay_requests),
+               compare("HotelReservation", RESERVATION_SCHEMA, reservations),
+               compare("HotelStay", PROCESSED_STAY_SCHEMA, stays)]
+
+    output = json.dumps({"python": platform.python_version(),
+                         "parser": HotelJsonDecoder.loads.__module__,
+                         "results": results}, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
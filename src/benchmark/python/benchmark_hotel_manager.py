@@ -0,0 +1,260 @@
+"""Benchmark of roomReservation, guestArrival and guest_checkout.
+
+For every store size, a temporary store is filled with synthetic valid reservations and processed stays, and then
+each of the three functions is called a number of times (roomReservation is also measured as a batch with
+roomReservations, guestArrival with guestArrivals, and guest_checkout with guest_checkouts). Every batch result has
+its speedup over the calls one by one. The operations per second and the p50/p99 latencies are
+written as json, so the results of different versions can be compared. With --write-behind the processed stays are
+stored in the background by a StayWriteBuffer.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_hotel_manager.py --sizes 1000 100000 1000000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelReservation import HotelReservation
+from UC3MTravel.HotelStay import HotelStay
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+# Letters of the id_card, ordered by the remainder of dividing its number by 23
+LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+ROOM_TYPES = ["single", "double", "suite"]
+STORAGES = {"json": JsonStorage, "json_sharded": lambda storage_root: JsonStorage(storage_root, sharded=True),
+            "sqlite": SqliteStorage, "journal": JournalStorage}
+# Operation called one by one that each batch operation replaces
+BATCH_OPERATIONS = {"roomReservations": "roomReservation",
+                    "guestArrivals_threads": "guestArrival",
+                    "guestArrivals_processes": "guestArrival",
+                    "guest_checkouts": "guest_checkout"}
+# Numbers of the id_cards used by the measured operations, so they never collide with the ones of the filled store
+MEASURED_ID_CARDS_START = 50000000
+# The store is filled in chunks, so the memory used does not depend on its size
+FILL_CHUNK = 10000
+
+
+def makeIdCard(number: int):
+    """Returns the valid id_card of the given number"""
+    return f"{number:08d}{LETTERS[number % 23]}"
+
+
+def makeCreditCard(rng: random.Random):
+    """Returns a random credit card number that follows the Luhn algorithm"""
+    payload = [rng.randint(0, 9) for _ in range(15)]
+    sum_total = 0
+    for position, digit in enumerate(reversed(payload)):
+        if position % 2 == 0:
+            digit *= 2
+            if digit >= 10:
+                digit -= 9
+        sum_total += digit
+    return "".join(map(str, payload)) + str((10 - sum_total % 10) % 10)
+
+
+def makeReservation(rng: random.Random, number: int, arrival_date: str):
+    """Returns the parameters of roomReservation of a synthetic valid reservation"""
+    return {"credit_card": makeCreditCard(rng),
+            "name_surname": f"Guest{number} Surname{number}",
+            "id_card": makeIdCard(number),
+            "phone_number": f"6{rng.randint(0, 99999999):08d}",
+            "room_type": rng.choice(ROOM_TYPES),
+            "arrival_date": arrival_date,
+            "num_days": rng.randint(1, 10)}
+
+
+def makeStoredReservation(parameters: dict, reservation_date: float):
+    """Returns the stored data of a reservation made on reservation_date, as guestArrival expects to read it"""
+    reservation = HotelReservation(id_card=parameters["id_card"],
+                                   credit_card=parameters["credit_card"],
+                                   name_surname=parameters["name_surname"],
+                                   phone_number=parameters["phone_number"],
+                                   room_type=parameters["room_type"],
+                                   arrival_date=parameters["arrival_date"],
+                                   num_days=parameters["num_days"])
+    reservation.reservation_date = reservation_date
+    return {"id_card": reservation.id_card,
+            "name_surname": reservation.name_surname,
+            "credit_card": reservation.credit_card,
+            "phone_number": reservation.phone_number,
+            "reservation_date": reservation.reservation_date,
+            "arrival_date": reservation.arrival_date,
+            "num_days": reservation.num_days,
+            "room_type": reservation.room_type,
+            "localizer": reservation.localizer}
+
+
+def makeStoredStay(reservation: dict, departure: float):
+    """Returns the stored data of the processed stay of a reservation that leaves at the given timestamp"""
+    stay = HotelStay(reservation["id_card"], reservation["localizer"], reservation["num_days"],
+                     reservation["room_type"])
+    stay.departure = departure
+    return {"alg": "SHA-256",
+            "type": stay.type,
+            "idCard": stay.id_card,
+            "localizer": stay.localizer,
+            "arrival": stay.arrival,
+            "departure": stay.departure,
+            "room_key": stay.room_key}
+
+
+def fillStore(storage, rng: random.Random, size: int, today: str, today_timestamp: float):
+    """Stores size reservations, and a processed stay for each of them"""
+    for start in range(0, size, FILL_CHUNK):
+        reservations = {}
+        stays = {}
+        for number in range(start, min(start + FILL_CHUNK, size)):
+            reservation = makeStoredReservation(makeReservation(rng, number, today), today_timestamp)
+            stay = makeStoredStay(reservation, today_timestamp)
+            reservations[reservation["id_card"]] = reservation
+            stays[stay["room_key"]] = stay
+        storage.saveReservations(reservations)
+        storage.saveStays(stays)
+
+
+def percentile(sorted_values: list, fraction: float):
+    """Returns the value below which the given fraction of the sorted values lie"""
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name: str, store_size: int, function, arguments: list):
+    """Calls function once for each element of arguments and returns the statistics of the latencies"""
+    latencies = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(argument)
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    latencies.sort()
+    return {"operation": name,
+            "store_size": store_size,
+            "operations": len(latencies),
+            "ops_per_second": len(latencies) / total if total else None,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000}
+
+
+def measureBatch(name: str, store_size: int, function, argument):
+    """Calls a batch function once and returns the number of operations per second it processed"""
+    start = time.perf_counter()
+    operations = len(function(argument))
+    total = time.perf_counter() - start
+    return {"operation": name,
+            "store_size": store_size,
+            "operations": operations,
+            "ops_per_second": operations / total if total else None}
+
+
+def benchmarkStoreSize(storage_name: str, store_size: int, operations: int, seed: int, write_behind: bool = False):
+    """Runs the three benchmarks over a store of the given size and returns their results"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    today = now.strftime("%d/%m/%Y")
+    # guestArrival checks that the reservation was made on the arrival date
+    today_timestamp = datetime.timestamp(datetime.strptime(today, "%d/%m/%Y"))
+    results = []
+
+    with tempfile.TemporaryDirectory() as storage_root:
+        storage = STORAGES[storage_name](storage_root)
+        hotel_manager = HotelManager(storage=storage, write_behind=write_behind)
+        fillStore(storage, rng, store_size, today, today_timestamp)
+
+        # roomReservation: new clients that are not in the store yet
+        reservations = [makeReservation(rng, MEASURED_ID_CARDS_START + number, today) for number in range(operations)]
+        results.append(measure("roomReservation", store_size,
+                               lambda parameters: hotel_manager.roomReservation(**parameters), reservations))
+        # roomReservations: as many other new clients, validated and stored as a single batch
+        reservations = [makeReservation(rng, MEASURED_ID_CARDS_START + operations + number, today)
+                        for number in range(operations)]
+        results.append(measureBatch("roomReservations", store_size, hotel_manager.roomReservations, reservations))
+
+        # guestArrival: clients of the store that arrive today, with the stay files dropped in stays_store
+        stays_directory = hotel_manager.getJsonDirectory("stays_store")
+        arrival_files = []
+        for number in range(operations):
+            id_card = makeIdCard(number % store_size)
+            file_name = f"benchmark_arrival_{number}.json"
+            with open(os.path.join(stays_directory, file_name), "w", encoding="utf-8") as stay_file:
+                json.dump({"Localizer": storage.loadReservation(id_card)["localizer"], "IdCard": id_card}, stay_file)
+            arrival_files.append(file_name)
+        results.append(measure("guestArrival", store_size, hotel_manager.guestArrival, arrival_files))
+
+        # guestArrivals: the same stay files, processed as a batch by a pool of threads and by a pool of processes
+        os.makedirs(os.path.join(stays_directory, "benchmark_batch"))
+        for file_name in arrival_files:
+            os.replace(os.path.join(stays_directory, file_name),
+                       os.path.join(stays_directory, "benchmark_batch", file_name))
+        results.append(measureBatch("guestArrivals_threads", store_size, hotel_manager.guestArrivals,
+                                    "benchmark_batch"))
+        if isinstance(storage, JsonStorage):
+            results.append(measureBatch("guestArrivals_processes", store_size,
+                                        lambda directory: hotel_manager.guestArrivals(directory, use_processes=True),
+                                        "benchmark_batch"))
+
+        # guest_checkout: processed stays that leave today
+        room_keys = []
+        for number in range(operations):
+            stay = makeStoredStay(storage.loadReservation(makeIdCard(number % store_size)), datetime.timestamp(now))
+            storage.saveStays({stay["room_key"]: stay})
+            room_keys.append(stay["room_key"])
+        results.append(measure("guest_checkout", store_size, hotel_manager.guest_checkout, room_keys))
+        # guest_checkouts: the same stays, checked out again as a single batch
+        results.append(measureBatch("guest_checkouts", store_size, hotel_manager.guest_checkouts, room_keys))
+
+        hotel_manager.close()
+        if hasattr(storage, "close"):
+            storage.close()
+
+    single_results = {result["operation"]: result for result in results}
+    for result in results:
+        single_result = single_results.get(BATCH_OPERATIONS.get(result["operation"]))
+        if single_result is not None and result["ops_per_second"] and single_result["ops_per_second"]:
+            result["speedup"] = result["ops_per_second"] / single_result["ops_per_second"]
+    return results
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000],
+                        help="number of records of the store before measuring")
+    parser.add_argument("--operations", type=int, default=1000, help="calls measured for each function")
+    parser.add_argument("--storage", choices=sorted(STORAGES), default="json", help="storage backend")
+    parser.add_argument("--write-behind", action="store_true", help="store the processed stays in the background")
+    parser.add_argument("--seed", type=int, default=87, help="seed of the synthetic data")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    report = {"created": datetime.utcnow().isoformat() + "Z",
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "storage": args.storage,
+              "write_behind": args.write_behind,
+              "results": []}
+    for store_size in args.sizes:
+        report["results"].extend(benchmarkStoreSize(args.storage, store_size, args.operations, args.seed,
+                                                     args.write_behind))
+
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
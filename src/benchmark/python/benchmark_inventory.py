@@ -0,0 +1,100 @@
+"""Benchmark of the room inventory behind roomReservation.
+
+A RoomInventory is filled with many overlapping synthetic reservations, and then the time needed to book a room and to
+query the availability of a stay is measured, compared with counting the overlapping reservations one by one. The
+results are written as json.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_inventory.py --reservations 100000 --output inventory.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.RoomInventory import RoomInventory
+
+ROOM_TYPES = ["single", "double", "suite"]
+FIRST_DAY = date(2024, 7, 1)
+
+
+def makeStays(rng: random.Random, count: int, days: int):
+    """Returns count random (room type, arrival, num_days) stays with an arrival in the first days days"""
+    return [(rng.choice(ROOM_TYPES), FIRST_DAY + timedelta(days=rng.randrange(days)), rng.randint(1, 10))
+            for _ in range(count)]
+
+
+def scanAvailable(stays: list, capacity: int, room_type: str, arrival: date, num_days: int):
+    """Availability computed by going through every stay, as it would be without the per night counters"""
+    most_booked = 0
+    for night in range(num_days):
+        day = arrival + timedelta(days=night)
+        booked = sum(1 for stay_type, stay_arrival, stay_days in stays
+                     if stay_type == room_type and stay_arrival <= day < stay_arrival + timedelta(days=stay_days))
+        most_booked = max(most_booked, booked)
+    return capacity - most_booked
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=100000, help="overlapping reservations booked")
+    parser.add_argument("--days", type=int, default=90, help="days over which the arrivals are spread")
+    parser.add_argument("--queries", type=int, default=10000, help="availability queries measured")
+    parser.add_argument("--scan-queries", type=int, default=20, help="queries measured with the scan")
+    parser.add_argument("--seed", type=int, default=87, help="seed of the synthetic data")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    stays = makeStays(rng, args.reservations, args.days)
+    # A stay lasts 5.5 nights on average, and the capacity is for 5 nights, so the busiest nights get full and some
+    # reservations are rejected
+    capacity = args.reservations * 5 // (len(ROOM_TYPES) * args.days)
+    inventory = RoomInventory(dict.fromkeys(ROOM_TYPES, capacity))
+
+    rejected = 0
+    start = time.perf_counter()
+    for room_type, arrival, num_days in stays:
+        try:
+            inventory.reserve(room_type, arrival, num_days)
+        except HotelManagementException:
+            rejected += 1
+    reserve_seconds = time.perf_counter() - start
+
+    queries = makeStays(rng, args.queries, args.days)
+    start = time.perf_counter()
+    for room_type, arrival, num_days in queries:
+        inventory.available(room_type, arrival, num_days)
+    query_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for room_type, arrival, num_days in queries[:args.scan_queries]:
+        scanAvailable(stays, capacity, room_type, arrival, num_days)
+    scan_seconds = time.perf_counter() - start
+
+    results = {"python": platform.python_version(),
+               "reservations": args.reservations,
+               "capacity_per_room_type": capacity,
+               "rejected": rejected,
+               "reserve_ns_per_reservation": reserve_seconds / len(stays) * 1e9,
+               "available_ns_per_query": query_seconds / len(queries) * 1e9,
+               "scan_ns_per_query": scan_seconds / args.scan_queries * 1e9}
+    output = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
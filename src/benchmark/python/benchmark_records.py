@@ -0,0 +1,90 @@
+"""Memory footprint and attribute access time of the HotelReservation and HotelStay records.
+
+The records are built in bulk from parsed jsons, and compared with records that keep the same attributes in a
+__dict__, as they did before. The results are written as json.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_records.py --records 100000 --output records.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel.HotelReservation import HotelReservation
+from UC3MTravel.HotelStay import HotelStay
+from benchmark_hotel_manager import makeReservation, makeStoredReservation, makeStoredStay
+
+
+class DictRecord:  # pylint: disable=too-few-public-methods
+    """Record that keeps its attributes in a __dict__, as HotelReservation and HotelStay did before"""
+    def __init__(self, data: dict):
+        for key, value in data.items():
+            setattr(self, "_DictRecord__" + key, value)
+
+
+def measureMemory(build):
+    """Returns the records built by build and the bytes that were allocated to build them"""
+    gc.collect()
+    tracemalloc.start()
+    records = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return records, allocated
+
+
+def measureAccess(records: list, attribute: str):
+    """Returns the nanoseconds needed to read an attribute of a record"""
+    start = time.perf_counter()
+    for record in records:
+        getattr(record, attribute)
+    return (time.perf_counter() - start) / len(records) * 1e9
+
+
+def compareRecords(name: str, records_data: list, record_class):
+    """Measures the records of record_class and the records with a __dict__ built from the same data"""
+    records, allocated = measureMemory(lambda: record_class.fromJsonRecords(records_data))
+    dict_records, dict_allocated = measureMemory(lambda: [DictRecord(data) for data in records_data])
+    return {"record": name,
+            "records": len(records),
+            "bytes_per_record": allocated / len(records),
+            "dict_bytes_per_record": dict_allocated / len(dict_records),
+            "id_card_access_ns": measureAccess(records, "id_card")}
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000, help="records built of each class")
+    parser.add_argument("--seed", type=int, default=87, help="seed of the synthetic data")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    # The records are decoded from json, as they would be when they are loaded from a store
+    reservations_data = [json.loads(json.dumps(makeStoredReservation(makeReservation(rng, number, "01/07/2024"),
+                                                                     1719792000.0)))
+                         for number in range(args.records)]
+    stays_data = [json.loads(json.dumps(makeStoredStay(data, 1719878400.0))) for data in reservations_data]
+
+    results = [compareRecords("HotelReservation", reservations_data, HotelReservation),
+               compareRecords("HotelStay", stays_data, HotelStay)]
+
+    output = json.dumps({"python": platform.python_version(), "results": results}, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark of the startup cost of the UC3MTravel package.
+
+Each statement is run many times in a new interpreter with -X importtime, and the median of the time spent importing
+the package (the cumulative import time of its modules) and of the wall time of the whole interpreter are written as
+json, so a short lived command that only imports the package can be compared with one that uses the HotelManager.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_startup.py --runs 20 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+PACKAGE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python")
+# Statements measured, and the module whose cumulative import time is reported for each of them
+STATEMENTS = {"import UC3MTravel": "UC3MTravel",
+              "from UC3MTravel import HotelManager": "UC3MTravel.HotelManager",
+              "pass": None}
+
+
+def runInterpreter(statement: str, module: str):
+    """Runs the statement in a new interpreter and returns its wall time and the cumulative import time of module, in
+    milliseconds"""
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.path.abspath(PACKAGE_DIRECTORY)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], env=environment,
+                            capture_output=True, text=True, check=True)
+    wall_time = (time.perf_counter() - start) * 1000
+    import_time = None
+    for line in result.stderr.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            import_time = int(fields[1]) / 1000
+    return wall_time, import_time
+
+
+def main(argv=None):
+    """Runs the benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="interpreters started for each statement")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for statement, module in STATEMENTS.items():
+        measures = [runInterpreter(statement, module) for _ in range(args.runs)]
+        import_times = [import_time for _, import_time in measures if import_time is not None]
+        results.append({"statement": statement,
+                        "runs": args.runs,
+                        "wall_ms_p50": statistics.median(wall_time for wall_time, _ in measures),
+                        "import_ms_p50": statistics.median(import_times) if import_times else None})
+    output = json.dumps({"python": platform.python_version(), "results": results}, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
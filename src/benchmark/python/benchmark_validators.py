@@ -0,0 +1,219 @@
+"""Micro-benchmark of the field validators of HotelManager.
+
+Each validator is compared with the character by character implementation it replaced, over the same synthetic
+values, and the results are written as json. The batch of credit cards is compared with validating them one by one.
+
+Usage (from the root of the project):
+    python src/benchmark/python/benchmark_validators.py --values 100000 --output validators.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "main", "python"))
+
+# pylint: disable=wrong-import-position
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from benchmark_hotel_manager import makeCreditCard, makeIdCard
+
+
+def previousIsAllDigits(digit_string: str, exception_message: str):
+    """isAllDigits as it was before: membership of every character in a list of digits"""
+    digits_list = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+    for character in digit_string:
+        if character not in digits_list:
+            raise HotelManagementException(exception_message)
+
+
+def previousValidateCreditCard(credit_card: str):
+    """validateCreditCard as it was before: Luhn's algorithm computed digit by digit"""
+    if not isinstance(credit_card, str):
+        raise HotelManagementException("credit_card is not a string")
+    if len(credit_card) != 16:
+        raise HotelManagementException("credit_card is not 16 characters long")
+    previousIsAllDigits(credit_card, "credit_card must have 16 digits")
+    check_digit = credit_card[len(credit_card) - 1]
+    payload = credit_card[:len(credit_card) - 1]
+    sum_total = 0
+    double = True
+    for i in range(len(credit_card) - 2, -1, -1):
+        if double:
+            sum_digit = 2 * int(payload[i])
+            if sum_digit >= 10:
+                sum_digit = 1 + sum_digit % 10
+        else:
+            sum_digit = int(payload[i])
+        sum_total += sum_digit
+        double = not double
+    if int(check_digit) != (10 - (sum_total % 10)) % 10:
+        raise HotelManagementException("credit_card does not follow the Luhn algorithm")
+
+
+def previousValidateNameSurname(name_surname: str):
+    """validateNameSurname as it was before: one iteration through the characters looking for white spaces"""
+    if not isinstance(name_surname, str):
+        raise HotelManagementException("name_surname is not a string")
+    if not 10 <= len(name_surname) <= 50:
+        raise HotelManagementException("name_surname must be between 10 and 50 characters long")
+    if name_surname[0] == " " or name_surname[-1] == " ":
+        raise HotelManagementException("name_surname must contain at least 2 strings separated by a white space")
+    is_there_white_space = False
+    current_white_space = False
+    for character in name_surname:
+        if character == " ":
+            if current_white_space:
+                raise HotelManagementException(
+                    "name_surname must contain at least 2 strings separated by a white space")
+            current_white_space = True
+            is_there_white_space = True
+        elif current_white_space:
+            current_white_space = False
+    if not is_there_white_space:
+        raise HotelManagementException("name_surname must contain at least 2 strings separated by a white space")
+
+
+def previousValidateIdCard(id_card: str):
+    """Format checks of validateIdCard as they were before (without looking for a previous reservation)"""
+    if not isinstance(id_card, str):
+        raise HotelManagementException("id_card is not a string")
+    if len(id_card) != 9:
+        raise HotelManagementException("id_card must have 8 digits and 1 final letter")
+    digits = id_card[:8]
+    letter = id_card[-1]
+    previousIsAllDigits(digits, "id_card must have 8 digits and 1 final letter")
+    letters_list = ["T", "R", "W", "A", "G", "M", "Y", "F", "P", "D", "X", "B", "N", "J", "Z", "S", "Q", "V", "H",
+                    "L", "C", "K", "E"]
+    if letter not in letters_list:
+        raise HotelManagementException("id_card must have 8 digits and 1 final letter")
+    if letter != letters_list[int(digits) % 23]:
+        raise HotelManagementException("invalid letter for id_card")
+
+
+def previousValidatePhoneNumber(phone_number: str):
+    """validatePhoneNumber as it was before"""
+    if not isinstance(phone_number, str):
+        raise HotelManagementException("phone_number is not a string")
+    if len(phone_number) != 9:
+        raise HotelManagementException("phone_number is not 9 characters long")
+    previousIsAllDigits(phone_number, "phone_number must have 9 digits")
+
+
+def previousValidateArrivalDate(arrival_date: str):
+    """validateArrivalDate as it was before: separate checks of every part of the date"""
+    if not isinstance(arrival_date, str):
+        raise HotelManagementException("arrival_date is not a string")
+    if len(arrival_date) != 10:
+        raise HotelManagementException("invalid arrival_date format \"DD/MM/YYYY\"")
+    day_string = arrival_date[:2]
+    month_string = arrival_date[3:5]
+    year_string = arrival_date[6:]
+    if arrival_date[2] != "/" or arrival_date[5] != "/":
+        raise HotelManagementException("invalid arrival_date format \"DD/MM/YYYY\"")
+    previousIsAllDigits(day_string, "invalid arrival_date format \"DD/MM/YYYY\"")
+    previousIsAllDigits(month_string, "invalid arrival_date format \"DD/MM/YYYY\"")
+    previousIsAllDigits(year_string, "invalid arrival_date format \"DD/MM/YYYY\"")
+    day = int(day_string)
+    month = int(month_string)
+    year = int(year_string)
+    if not 1 <= month <= 12:
+        raise HotelManagementException("arrival_date does not exist")
+    days_list = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        days_list[1] = 29
+    if day > days_list[month - 1]:
+        raise HotelManagementException("arrival_date does not exist")
+    current_date = datetime.now()
+    if year < current_date.year:
+        raise HotelManagementException("arrival_date before current date")
+    if year == current_date.year and month < current_date.month:
+        raise HotelManagementException("arrival_date before current date")
+    if year == current_date.year and month == current_date.month and day < current_date.day:
+        raise HotelManagementException("arrival_date before current date")
+
+
+def timeValidator(validator, values: list):
+    """Returns the seconds needed to call validator with every value, ignoring the exceptions it raises"""
+    start = time.perf_counter()
+    for value in values:
+        try:
+            validator(value)
+        except HotelManagementException:
+            pass
+    return time.perf_counter() - start
+
+
+def compare(name: str, previous, current, values: list):
+    """Times the previous and the current implementation of a validator over the same values"""
+    previous_seconds = timeValidator(previous, values)
+    current_seconds = timeValidator(current, values)
+    return {"validator": name,
+            "values": len(values),
+            "previous_ns_per_value": previous_seconds / len(values) * 1e9,
+            "current_ns_per_value": current_seconds / len(values) * 1e9,
+            "speedup": previous_seconds / current_seconds}
+
+
+def main(argv=None):
+    """Runs the micro-benchmark with the command line arguments and writes the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=100000, help="values validated by each implementation")
+    parser.add_argument("--seed", type=int, default=87, help="seed of the synthetic data")
+    parser.add_argument("--output", help="json file for the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    # The id_cards are looked for in an empty store
+    temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    hotel_manager = HotelManager(storage_root=temp_dir.name)
+    # Half of the credit cards follow the Luhn algorithm and the other half have a random check digit
+    credit_cards = [makeCreditCard(rng) if number % 2 == 0 else f"{rng.randint(0, 10 ** 16 - 1):016d}"
+                    for number in range(args.values)]
+
+    names = [rng.choice(["John Smith", "Mary Jane Watson", "Peter  Parker", " Bruce Wayne", "ClarkKentXX"])
+             for _ in range(args.values)]
+    id_cards = [makeIdCard(rng.randint(0, 99999999)) if number % 2 == 0 else f"{rng.randint(0, 99999999):08d}T"
+                for number in range(args.values)]
+    phone_numbers = [f"{rng.randint(0, 999999999):09d}" for _ in range(args.values)]
+    dates = [f"{rng.randint(1, 31):02d}/{rng.randint(1, 12):02d}/{rng.randint(2024, 2030)}"
+             for _ in range(args.values)]
+
+    results = [compare("validateCreditCard", previousValidateCreditCard, hotel_manager.validateCreditCard,
+                       credit_cards),
+               compare("validateNameSurname", previousValidateNameSurname, hotel_manager.validateNameSurname, names),
+               compare("validateIdCard", previousValidateIdCard, hotel_manager.validateIdCard, id_cards),
+               compare("validatePhoneNumber", previousValidatePhoneNumber, hotel_manager.validatePhoneNumber,
+                       phone_numbers),
+               compare("validateArrivalDate", previousValidateArrivalDate, hotel_manager.validateArrivalDate, dates)]
+    # The batch is compared with validating the same credit cards one by one, with half of them rejected and with all
+    # of them valid (where the exceptions of the rejected ones do not hide the cost of the checks)
+    valid_credit_cards = credit_cards[0::2]
+    for name, values in [("validateCreditCards", credit_cards), ("validateCreditCards (valid)", valid_credit_cards)]:
+        previous_seconds = timeValidator(hotel_manager.validateCreditCard, values)
+        start = time.perf_counter()
+        hotel_manager.validateCreditCards(values)
+        current_seconds = time.perf_counter() - start
+        results.append({"validator": name,
+                        "values": len(values),
+                        "previous_ns_per_value": previous_seconds / len(values) * 1e9,
+                        "current_ns_per_value": current_seconds / len(values) * 1e9,
+                        "speedup": previous_seconds / current_seconds})
+
+    temp_dir.cleanup()
+
+    output = json.dumps({"python": platform.python_version(), "results": results}, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
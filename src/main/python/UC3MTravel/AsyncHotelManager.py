@@ -0,0 +1,74 @@
+"""AsyncHotelManager module"""
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelMetrics import HotelMetrics
+from UC3MTravel.HotelStorage import HotelStorage
+
+
+class AsyncHotelManager:
+    """Asyncio version of HotelManager. Every function is run by a HotelManager in a bounded pool of threads, so the
+    reads and writes of the stores never block the event loop. It has the same validations and raises the same
+    HotelManagementExceptions as HotelManager"""
+    def __init__(self, storage_root: str = None, storage: HotelStorage = None, metrics: HotelMetrics = None,
+                 max_workers: int = 4, max_pending: int = None, room_capacity: dict = None):
+        self.__hotel_manager = HotelManager(storage_root=storage_root, storage=storage, metrics=metrics,
+                                            room_capacity=room_capacity)
+        self.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix="AsyncHotelManager")
+        # Maximum number of calls that can be in the pool at the same time (running or waiting for a thread). Any
+        # other call waits in the event loop until one of them finishes, so a burst of requests cannot queue an
+        # unlimited amount of work in the pool
+        self.__pending_slots = asyncio.Semaphore(max_pending if max_pending is not None else 2 * max_workers)
+
+    @property
+    def hotel_manager(self):
+        """Property representing the HotelManager that runs every function"""
+        return self.__hotel_manager
+
+    async def roomReservation(self, credit_card: str, name_surname: str, id_card: str, phone_number: str,
+                              room_type: str, arrival_date: str, num_days: int, idempotency_key: str = None):
+        """Function 1. Request a hotel reservation. Returns its localizer"""
+        return await self.runInExecutor(self.__hotel_manager.roomReservation, credit_card, name_surname, id_card,
+                                        phone_number, room_type, arrival_date, num_days, idempotency_key)
+
+    async def guestArrival(self, input_file: str):
+        """Function 2: Arrival at the hotel. Returns the room_key of the stay"""
+        return await self.runInExecutor(self.__hotel_manager.guestArrival, input_file)
+
+    async def guest_checkout(self, room_key: str):
+        """Function 3. CheckOut of the stay of the given room_key. Returns True"""
+        return await self.runInExecutor(self.__hotel_manager.guest_checkout, room_key)
+
+    async def runInExecutor(self, function, *args):
+        """Runs function in the pool of threads once there is a free slot, and returns its result.
+        If the call is cancelled before a thread has started it, the function is never run. If it is cancelled while
+        it is running, the function cannot be stopped, so it finishes in its thread and its result is discarded"""
+        loop = asyncio.get_running_loop()
+        await self.__pending_slots.acquire()
+        try:
+            concurrent_future = self.__executor.submit(functools.partial(function, *args))
+        except BaseException:
+            self.__pending_slots.release()
+            raise
+        # The slot is only freed when the thread has finished with the call (or the call has been cancelled before
+        # starting), even if the awaiting coroutine was cancelled before that
+        concurrent_future.add_done_callback(lambda _: self.releaseSlot(loop))
+        return await asyncio.wrap_future(concurrent_future)
+
+    def releaseSlot(self, loop: asyncio.AbstractEventLoop):
+        """Frees a slot of the pool from any thread. If the event loop has already been closed, nobody can be waiting
+        for the slot"""
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(self.__pending_slots.release)
+
+    async def close(self):
+        """Waits for the calls that are running and stops the pool of threads"""
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
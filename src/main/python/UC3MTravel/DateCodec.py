@@ -0,0 +1,69 @@
+"""DateCodec module"""
+import functools
+from datetime import date, datetime
+
+# Number of different strings whose result is remembered by each parser. A hotel works with a few hundred different
+# days at a time, so the same strings are parsed again and again
+MEMO_SIZE = 4096
+
+
+class DateFormatError(ValueError):
+    """Raised when a string does not have the "DD/MM/YYYY" (or "DD/MM/YYYY HH:MM:SS") format. A string with the right
+    format that is not a real date raises a plain ValueError instead"""
+
+
+def splitDate(text: str):
+    """Returns the day, month and year of a "DD/MM/YYYY" string, checking only its format (2 digits, slash, 2 digits,
+    slash, 4 digits), not that the date exists"""
+    if not isinstance(text, str):
+        raise TypeError("the date is not a string")
+    if len(text) != 10 or text[2] != "/" or text[5] != "/":
+        raise DateFormatError("invalid date format \"DD/MM/YYYY\"")
+    digits = text[0:2] + text[3:5] + text[6:10]
+    # isdigit also accepts digits of other alphabets, so they must be ascii too
+    if not digits.isascii() or not digits.isdigit():
+        raise DateFormatError("invalid date format \"DD/MM/YYYY\"")
+    return int(text[0:2]), int(text[3:5]), int(text[6:10])
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def parseDate(text: str):
+    """Returns the date of a "DD/MM/YYYY" string. It is equivalent to datetime.strptime(text, "%d/%m/%Y").date(), but
+    only accepts 2 digit days and months, and does not build a regular expression or look at the locale"""
+    day, month, year = splitDate(text)
+    return date(year, month, day)
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def dateTimestamp(text: str):
+    """Returns the timestamp of the midnight of a "DD/MM/YYYY" string, like
+    datetime.timestamp(datetime.strptime(text, "%d/%m/%Y"))"""
+    day, month, year = splitDate(text)
+    return datetime.timestamp(datetime(year, month, day))
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def parseDateTime(text: str):
+    """Returns the datetime of a "DD/MM/YYYY HH:MM:SS" string, like datetime.strptime(text, "%d/%m/%Y %H:%M:%S")"""
+    if not isinstance(text, str):
+        raise TypeError("the date is not a string")
+    if len(text) != 19 or text[10] != " " or text[13] != ":" or text[16] != ":":
+        raise DateFormatError("invalid date format \"DD/MM/YYYY HH:MM:SS\"")
+    day, month, year = splitDate(text[:10])
+    time_digits = text[11:13] + text[14:16] + text[17:19]
+    if not time_digits.isascii() or not time_digits.isdigit():
+        raise DateFormatError("invalid date format \"DD/MM/YYYY HH:MM:SS\"")
+    return datetime(year, month, day, int(text[11:13]), int(text[14:16]), int(text[17:19]))
+
+
+def formatDate(day: date):
+    """Returns the "DD/MM/YYYY" string of a date"""
+    return f"{day.day:02d}/{day.month:02d}/{day.year:04d}"
+
+
+def clearMemo():
+    """Forgets every remembered result, for example after the local time zone has changed (the timestamps depend on
+    it)"""
+    parseDate.cache_clear()
+    dateTimestamp.cache_clear()
+    parseDateTime.cache_clear()
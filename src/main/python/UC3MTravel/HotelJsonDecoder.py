@@ -0,0 +1,95 @@
+"""HotelJsonDecoder module"""
+import json
+from typing import NamedTuple
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelReservation import HotelReservation
+from UC3MTravel.HotelStay import HotelStay
+
+try:
+    # orjson parses the same documents several times faster than the json module. It is optional: if it is not
+    # installed, the json module is used. Its errors are a subclass of json.JSONDecodeError, so they are handled the
+    # same way
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+
+class StayRequest(NamedTuple):
+    """Content of a stay file dropped in the stays_store folder by the front desk"""
+    id_card: str
+    localizer: str
+
+
+class JsonSchema:
+    """Keys that a json record must have and the types of their values. A parsed json is checked in a single pass
+    and then converted into a record of the class it describes"""
+    __slots__ = ("__fields", "__build", "__structure_message", "__value_message")
+
+    def __init__(self, fields: tuple, build, structure_message: str, value_message: str):
+        # Tuple of (key, type or tuple of types) pairs
+        self.__fields = fields
+        # Function that receives the checked dict and returns its record
+        self.__build = build
+        # Messages of the HotelManagementException raised when a key is missing (or the json is not an object) and
+        # when a value does not have the expected type
+        self.__structure_message = structure_message
+        self.__value_message = value_message
+
+    @property
+    def keys(self):
+        """Property representing the keys that every record must have"""
+        return tuple(key for key, _ in self.__fields)
+
+    def validate(self, data):
+        """Checks that data is a dict with every key of the schema, and that every value has its expected type, else
+        it raises the corresponding HotelManagementException"""
+        if not isinstance(data, dict):
+            raise HotelManagementException(self.__structure_message)
+        for key, types in self.__fields:
+            try:
+                value = data[key]
+            except KeyError as ex:
+                raise HotelManagementException(self.__structure_message) from ex
+            # A bool is an int for isinstance, but it is never a valid number of days or timestamp
+            if not isinstance(value, types) or isinstance(value, bool):
+                raise HotelManagementException(self.__value_message)
+        return data
+
+    def decode(self, data):
+        """Returns the record of a parsed json, after checking it"""
+        return self.__build(self.validate(data))
+
+    def decodeJson(self, content):
+        """Parses a json document (str or bytes) and returns its record. A document that is not valid json raises the
+        same exception as a missing key"""
+        try:
+            data = loads(content)
+        except json.JSONDecodeError as ex:
+            raise HotelManagementException(self.__structure_message) from ex
+        return self.decode(data)
+
+
+# Numbers are written as floats by json.dump, but a record could have been written with integer timestamps
+NUMBER = (int, float)
+
+# Stay files of the stays_store folder. Their messages are the ones of guestArrival
+STAY_REQUEST_SCHEMA = JsonSchema((("IdCard", str), ("Localizer", str)),
+                                 lambda data: StayRequest(data["IdCard"], data["Localizer"]),
+                                 "The JSON does not have the expected structure.",
+                                 "The JSON data does not have valid values.")
+
+# Reservations stored by roomReservation
+RESERVATION_SCHEMA = JsonSchema((("id_card", str), ("name_surname", str), ("credit_card", str),
+                                 ("phone_number", str), ("reservation_date", NUMBER), ("arrival_date", str),
+                                 ("num_days", int), ("room_type", str), ("localizer", str)),
+                                HotelReservation.fromJsonData,
+                                "JSON Decode Error - Invalid JSON Key",
+                                "JSON Decode Error - Invalid JSON Value")
+
+# Processed stays stored by guestArrival. The departure of the oldest stays was written as a "%d/%m/%Y %H:%M:%S" string
+PROCESSED_STAY_SCHEMA = JsonSchema((("alg", str), ("type", str), ("idCard", str), ("localizer", str),
+                                    ("arrival", NUMBER), ("departure", NUMBER + (str,)), ("room_key", str)),
+                                   HotelStay.fromJsonData,
+                                   "JSON Decode Error - Invalid JSON Key",
+                                   "JSON Decode Error - Invalid JSON Value")
@@ -1,69 +1,355 @@
 """HotelManager module"""
-import json
+import glob
 import os
-from datetime import datetime
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from UC3MTravel.DateCodec import DateFormatError, dateTimestamp, formatDate, parseDate
+from UC3MTravel.HotelJsonDecoder import PROCESSED_STAY_SCHEMA, RESERVATION_SCHEMA, STAY_REQUEST_SCHEMA
 from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelMetrics import HotelMetrics, NO_METRICS, instrumented
 from UC3MTravel.HotelReservation import HotelReservation
 from UC3MTravel.HotelStay import HotelStay
+from UC3MTravel.HotelStorage import HotelStorage
+from UC3MTravel.JsonStorage import JsonStorage, readJsonFile
+from UC3MTravel.OccupancyIndex import MAX_STAY_DAYS, OccupancyIndex, getStayDate, getStayDates
+from UC3MTravel.StayWriteBuffer import StayWriteBuffer
 
+# Translation tables from the ascii code of a digit to its value, and to the value Luhn's algorithm gives to it when it
+# has to be doubled (2 * digit, adding together the 2 digits of the result if it is 10 or higher)
+LUHN_DIGITS = bytes(range(256)).replace(b"0123456789", bytes(range(10)))
+LUHN_DOUBLED_DIGITS = bytes(range(256)).replace(b"0123456789", bytes([0, 2, 4, 6, 8, 1, 3, 5, 7, 9]))
 
-class HotelManager:
-    """Hotel Manager Class"""
-    def __init__(self):
-        pass
+# Characters that are digits
+DIGITS = frozenset("0123456789")
+# Letters of the id_card, ordered by the remainder of dividing its number by 23
+ID_CARD_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+# Format of an id_card (8 digits and 1 final letter)
+ID_CARD_PATTERN = re.compile("[0-9]{8}[" + ID_CARD_LETTERS + "]")
+# Format of several id_cards joined together, so a whole batch is checked with a single match
+ID_CARDS_PATTERN = re.compile("(?:[0-9]{8}[" + ID_CARD_LETTERS + "])*")
 
-    def roomReservation(self, credit_card: str, name_surname: str, id_card: str, phone_number: str, room_type: str,
-                        arrival_date: str, num_days: int):
-        """Function 1. Request a hotel reservation.
-        Returns a valid MD5 string corresponding to the localizer and creates a json file with the reservation data"""
+# Keys of every record of a batch of reservations (the parameters of roomReservation, except the idempotency_key)
+RESERVATION_FIELDS = frozenset(("credit_card", "name_surname", "id_card", "phone_number", "room_type",
+                                "arrival_date", "num_days"))
 
-        # We validate all the parameters
-        self.validateCreditCard(credit_card)
-        self.validateNameSurname(name_surname)
-        self.validateIdCard(id_card)
-        self.validatePhoneNumber(phone_number)
-        self.validateRoomType(room_type)
-        self.validateArrivalDate(arrival_date)
-        self.validateNumDays(num_days)
+# HotelManager used by each worker process of guestArrivals. It is created once per process by startArrivalWorker
+ARRIVAL_WORKER_MANAGER = None
 
-        # We create the json file with the reservation data that will be further processed in guestArrival (Function 2)
 
-        # As there can only be 1 reservation per client, we use the value of the id_card to ensure the name of each
-        # generated file is unique
-        file_name = id_card + ".json"
+def startArrivalWorker(storage_root: str):
+    """Initializer of the worker processes of guestArrivals: creates the HotelManager of the process, which uses the
+    json stores of the given storage root"""
+    global ARRIVAL_WORKER_MANAGER  # pylint: disable=global-statement
+    ARRIVAL_WORKER_MANAGER = HotelManager(storage_root=storage_root)
 
-        # This json file contains the attributes of the HotelReservation class, which are calculated using the
-        # attributes of our current HotelManager class
-        hr = HotelReservation(credit_card=credit_card,
-                              name_surname=name_surname,
-                              id_card=id_card,
-                              phone_number=phone_number,
-                              room_type=room_type,
-                              arrival_date=arrival_date,
-                              num_days=num_days)
 
-        # The algorithm to obtain the localizer (a MD5 string) is applied and stored
-        md5_localizer = hr.localizer
+def processArrivalFile(input_file: str):
+    """Processes a stay file in a worker process of guestArrivals"""
+    return ARRIVAL_WORKER_MANAGER.tryGuestArrival(input_file)
 
-        # Data that will be written in the json file
-        json_data = {"id_card": hr.id_card,
-                     "name_surname": hr.name_surname,
-                     "credit_card": hr.credit_card,
-                     "phone_number": hr.phone_number,
-                     "reservation_date": hr.reservation_date,
-                     "arrival_date": hr.arrival_date,
-                     "num_days": hr.num_days,
-                     "room_type": hr.room_type,
-                     "localizer": md5_localizer
-                     }
-
-        # We will create a json file named file_name in the reservations_store folder, and the content we have to write
-        # on it is defined in json_data
-        self.createJsonFile(file_name, "reservations_store", json_data, True)
+
+class HotelManager:
+    """Hotel Manager Class"""
+    def __init__(self, storage_root: str = None, storage: HotelStorage = None, metrics: HotelMetrics = None,
+                 room_capacity: dict = None, write_behind: bool = False, flush_interval: float = 1.0,
+                 max_unflushed_stays: int = 1000):
+        # Backend used for every read and write of reservations, processed stays and checkouts. By default, every
+        # record is kept in its own json file inside the storage root
+        self.__storage = storage if storage is not None else JsonStorage(storage_root)
+        # Sink of the timings and counters of every operation. By default instrumentation is disabled
+        self.__metrics = metrics if metrics is not None else NO_METRICS
+        if metrics is not None:
+            self.__storage.metrics = metrics
+        # Number of rooms of each room type ({"single": 20, "double": 30, "suite": 5}). If it is not given, the
+        # capacity of the hotel is not checked. The rooms booked every night are counted by the storage, in the same
+        # step in which it stores the reservations, so they are shared by every HotelManager and process using it
+        self.__room_capacity = room_capacity
+        # In write-behind mode, guestArrival returns the room_key as soon as the stay is in the write ahead log of the
+        # buffer, which stores the stays in the background every flush_interval seconds (or as soon as there are
+        # max_unflushed_stays of them). The HotelManager must then be closed to store the last ones
+        self.__stay_buffer = None
+        if write_behind:
+            self.__stay_buffer = StayWriteBuffer(self.__storage, flush_interval, max_unflushed_stays,
+                                                 metrics=self.__metrics)
+
+    @property
+    def storage(self):
+        """Property representing the storage backend of the HotelManager"""
+        return self.__storage
+
+    @property
+    def metrics(self):
+        """Property representing the metrics sink of the HotelManager"""
+        return self.__metrics
+
+    @property
+    def stay_buffer(self):
+        """Property representing the write-behind buffer of the processed stays, or None if it is not used"""
+        return self.__stay_buffer
+
+    def close(self):
+        """Stores the processed stays that are still in the write-behind buffer and stops it"""
+        if self.__stay_buffer is not None:
+            self.__stay_buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @instrumented("roomReservation")
+    def roomReservation(self, credit_card: str, name_surname: str, id_card: str, phone_number: str, room_type: str,
+                        arrival_date: str, num_days: int, idempotency_key: str = None):
+        """Function 1. Request a hotel reservation.
+        Returns a valid MD5 string corresponding to the localizer and creates a json file with the reservation data.
+        If the client sends an idempotency_key, retrying the same request (for example, after a timeout) returns the
+        localizer of the reservation that was already made instead of rejecting the id_card"""
+
+        # A request whose idempotency_key was already used is answered with the reservation made by the first one
+        if idempotency_key is not None:
+            claim = self.__storage.loadIdempotencyKey(idempotency_key)
+            if claim is not None:
+                return self.replayIdempotencyKey(claim, id_card)
+
+        # We validate all the parameters and obtain the data of the reservation
+        try:
+            json_data = self.prepareReservation(credit_card, name_surname, id_card, phone_number, room_type,
+                                                arrival_date, num_days)
+        except HotelManagementException:
+            # Another worker with the same idempotency_key could have stored the reservation since the key was checked
+            # (and then the id_card is already reserved)
+            claim = self.__storage.loadIdempotencyKey(idempotency_key) if idempotency_key is not None else None
+            if claim is None:
+                raise
+            return self.replayIdempotencyKey(claim, id_card)
+
+        # We store the reservation (by default, in a json file in the reservations_store folder named after the
+        # id_card, as there can only be 1 reservation per client). Checking that the id_card has no reservation and
+        # that the hotel has a free room of the room_type every night of the stay, booking it, and storing the
+        # reservation is a single step of the storage, so another worker (or process) cannot store the same id_card
+        # or take the last room between the validation and the write.
+        # The claim of the idempotency_key keeps the whole reservation, so if this worker stops before storing it (for
+        # example, its process is killed), a retry of the request stores it instead of waiting for it forever
+        claim = None
+        claimed = False
+        try:
+            if idempotency_key is not None:
+                claim = self.__storage.claimIdempotencyKey(idempotency_key, {"id_card": id_card,
+                                                                             "localizer": json_data["localizer"],
+                                                                             "reservation": json_data})
+                claimed = claim is None
+            if claim is None:
+                # If the id_card already has a reservation, it can be the one of this claim, stored by a retry of this
+                # request
+                self.storeReservation(json_data, stored_by_retry=claimed)
+        except BaseException:
+            if claimed:
+                self.__storage.releaseIdempotencyKey(idempotency_key)
+            raise
+
+        # Another worker has claimed the key since it was checked
+        if claim is not None:
+            return self.replayIdempotencyKey(claim, id_card)
 
         # We return the localizer
-        return md5_localizer
+        return json_data["localizer"]
+
+    def replayIdempotencyKey(self, claim: dict, id_card: str):
+        """Returns the localizer of the reservation made by the request that claimed an idempotency key. If that
+        request has not stored the reservation kept in its claim, it is stored now, so a request that stopped before
+        storing it can be retried. Raises a HotelManagementException if the key was used for another client"""
+        if claim.get("id_card") != id_card:
+            raise HotelManagementException("idempotency_key already used for another reservation")
+        if not self.isReservationStored(id_card, claim.get("localizer")):
+            reservation_data = claim.get("reservation")
+            # A claim without its reservation can only be finished by the request that made it
+            if not isinstance(reservation_data, dict) or reservation_data.get("localizer") != claim.get("localizer"):
+                raise HotelManagementException("a reservation with the same idempotency_key is in progress")
+            # Another worker can store the reservation of the claim first
+            if self.storeReservation(reservation_data, stored_by_retry=True):
+                self.__metrics.count("roomReservation", "idempotent_completions")
+        self.__metrics.count("roomReservation", "idempotent_replays")
+        return claim["localizer"]
+
+    def storeReservation(self, json_data: dict, stored_by_retry: bool = False):
+        """Stores a validated reservation, booking its rooms in the same step, and returns True. Raises a
+        HotelManagementException if the hotel does not have a free room of its type every night of the stay, or if the
+        id_card already has a reservation. If stored_by_retry is True and the stored reservation of the id_card is
+        this one (another request with the same idempotency_key has stored it), False is returned instead"""
+        id_card = json_data["id_card"]
+        with self.__metrics.stage("roomReservation", "write"):
+            existing_id_cards, unavailable_id_cards = self.__storage.bookReservations({id_card: json_data},
+                                                                                      self.__room_capacity)
+        if unavailable_id_cards:
+            raise HotelManagementException("room_type is not available for the given dates")
+        if not existing_id_cards:
+            return True
+        if stored_by_retry and self.isReservationStored(id_card, json_data["localizer"]):
+            return False
+        raise HotelManagementException("a client with specified id_card already has a reservation")
+
+    def isReservationStored(self, id_card: str, localizer: str):
+        """Returns True if the stored reservation of the id_card is the one with the given localizer"""
+        try:
+            reservation_data = self.__storage.loadReservation(id_card)
+        except HotelManagementException:
+            return False
+        return isinstance(reservation_data, dict) and reservation_data.get("localizer") == localizer
+
+    @instrumented("roomReservations")
+    def roomReservations(self, reservations):
+        """Function 1 for a batch of reservations.
+        Receives an iterable of reservation records (dicts whose keys are the parameters of roomReservation) and
+        returns a list with, for each record in the same order, its localizer or the HotelManagementException that
+        rejected it. The records are validated as a batch, and all the accepted reservations are written at the end in
+        a single pass"""
+        records = list(reservations)
+        with self.__metrics.stage("roomReservations", "validation"):
+            results = self.validateReservationRecords(records)
+        # Data of the accepted reservations, and their position in the results, indexed by their id_card
+        pending_reservations = {}
+        pending_indexes = {}
+        for position, record in enumerate(records):
+            if results[position] is not None:
+                continue
+            # A client cannot make 2 reservations in the same batch either
+            if record["id_card"] in pending_reservations:
+                results[position] = HotelManagementException(
+                    "a client with specified id_card already has a reservation")
+                continue
+            json_data = self.createReservationData(**record)
+            pending_reservations[json_data["id_card"]] = json_data
+            pending_indexes[json_data["id_card"]] = position
+            results[position] = json_data["localizer"]
+
+        # The storage books the rooms of the reservations in the order they were given, in the same step in which it
+        # stores them, so if it fails only the rooms of the reservations it stored stay booked
+        with self.__metrics.stage("roomReservations", "write"):
+            existing_id_cards, unavailable_id_cards = self.__storage.bookReservations(pending_reservations,
+                                                                                      self.__room_capacity)
+
+        # The reservations of the id_cards that another worker has stored since they were validated are rejected, and
+        # so are the ones without a free room
+        for id_card in existing_id_cards:
+            results[pending_indexes[id_card]] = HotelManagementException(
+                "a client with specified id_card already has a reservation")
+            del pending_reservations[id_card]
+        for id_card in unavailable_id_cards:
+            results[pending_indexes[id_card]] = HotelManagementException(
+                "room_type is not available for the given dates")
+            del pending_reservations[id_card]
+        self.__metrics.count("roomReservations", "accepted", len(pending_reservations))
+        self.__metrics.count("roomReservations", "rejected", len(results) - len(pending_reservations))
+        return results
+
+    def roomAvailability(self, room_type: str, arrival_date: str, num_days: int):
+        """Returns the number of rooms of room_type that are free every night of a stay of num_days nights from the
+        "DD/MM/YYYY" arrival_date, or None if the capacity of the hotel is not known"""
+        self.validateRoomType(room_type)
+        self.validateNumDays(num_days)
+        if self.__room_capacity is None:
+            return None
+        booked_rooms = self.__storage.countBookedRooms(room_type, self.parseReportDate(arrival_date), num_days)
+        return max(0, self.__room_capacity.get(room_type, 0) - booked_rooms)
+
+    def validateReservationRecords(self, records: list):
+        """Validates a batch of reservation records and returns a list with, for each one in the same order, None if it
+        is valid or else the HotelManagementException that roomReservation would raise for it. A record that is not a
+        dict with exactly the parameters of roomReservation is rejected like any other invalid record, instead of
+        failing the whole batch"""
+        results = []
+        # Positions in results of the records with the expected fields
+        positions = []
+        for record in records:
+            if not isinstance(record, dict) or record.keys() != RESERVATION_FIELDS:
+                results.append(HotelManagementException("reservation record does not have the expected fields"))
+            else:
+                positions.append(len(results))
+                results.append(None)
+
+        # The credit cards, the id_cards and the arrival dates are checked as columns of the whole batch
+        card_errors = self.validateCreditCards([records[position]["credit_card"] for position in positions])
+        id_card_errors = self.checkIdCardFormats([records[position]["id_card"] for position in positions])
+        date_errors = self.validateArrivalDates([records[position]["arrival_date"] for position in positions])
+
+        # The first check that fails is reported, in the same order as roomReservation makes them. The id_cards that
+        # already have a reservation are looked up at once, for the records whose first checks pass
+        for index, position in enumerate(positions):
+            results[position] = (card_errors[index] or
+                                 self.checkField(self.validateNameSurname, records[position]["name_surname"]) or
+                                 id_card_errors[index])
+        reserved_id_cards = self.__storage.findReservedIdCards(
+            [records[position]["id_card"] for position in positions if results[position] is None])
+        for index, position in enumerate(positions):
+            if results[position] is not None:
+                continue
+            record = records[position]
+            if record["id_card"] in reserved_id_cards:
+                results[position] = HotelManagementException(
+                    "a client with specified id_card already has a reservation")
+            else:
+                results[position] = (self.checkField(self.validatePhoneNumber, record["phone_number"]) or
+                                     self.checkField(self.validateRoomType, record["room_type"]) or
+                                     date_errors[index] or
+                                     self.checkField(self.validateNumDays, record["num_days"]))
+        return results
+
+    def checkField(self, validator, value):
+        """Returns the HotelManagementException raised by validator for the value, or None if it is valid"""
+        try:
+            validator(value)
+        except HotelManagementException as ex:
+            return ex
+        return None
+
+    def prepareReservation(self, credit_card: str, name_surname: str, id_card: str, phone_number: str,
+                           room_type: str, arrival_date: str, num_days: int):
+        """Validates the parameters of a reservation and returns the data that has to be written in its json file.
+        Its stages are measured as stages of roomReservation"""
+        # We validate all the parameters
+        with self.__metrics.stage("roomReservation", "validation"):
+            self.validateCreditCard(credit_card)
+            self.validateNameSurname(name_surname)
+            self.validateIdCard(id_card)
+            self.validatePhoneNumber(phone_number)
+            self.validateRoomType(room_type)
+            self.validateArrivalDate(arrival_date)
+            self.validateNumDays(num_days)
+        return self.createReservationData(credit_card, name_surname, id_card, phone_number, room_type, arrival_date,
+                                          num_days)
+
+    def createReservationData(self, credit_card: str, name_surname: str, id_card: str, phone_number: str,
+                              room_type: str, arrival_date: str, num_days: int):
+        """Returns the data that has to be written in the json file of a reservation whose parameters are valid"""
+        with self.__metrics.stage("roomReservation", "localizer"):
+            # This json file contains the attributes of the HotelReservation class, which are calculated using the
+            # attributes of our current HotelManager class
+            hr = HotelReservation(credit_card=credit_card,
+                                  name_surname=name_surname,
+                                  id_card=id_card,
+                                  phone_number=phone_number,
+                                  room_type=room_type,
+                                  arrival_date=arrival_date,
+                                  num_days=num_days)
+
+            # The algorithm to obtain the localizer (a MD5 string) is applied and stored
+            md5_localizer = hr.localizer
 
+        # Data that will be written in the json file
+        return {"id_card": hr.id_card,
+                "name_surname": hr.name_surname,
+                "credit_card": hr.credit_card,
+                "phone_number": hr.phone_number,
+                "reservation_date": hr.reservation_date,
+                "arrival_date": hr.arrival_date,
+                "num_days": hr.num_days,
+                "room_type": hr.room_type,
+                "localizer": md5_localizer
+                }
+
+    @instrumented("guestArrival")
     def guestArrival(self, input_file: str):
         """ Function 2: Arrival at the hotel
         Returns a SHA-256 string with the key in hexadecimal format (HM-FR-02-O1),
@@ -76,44 +362,41 @@ class HotelManager:
         stay_json_dir = self.getJsonDirectory("stays_store")
         stay_file_path = os.path.join(stay_json_dir, input_file)
 
-        # We will open and read the content from the input file with the function readDataFromJson.
-        id_card, localizer = self.readDataFromStayJson(stay_file_path)
+        # We will open and read the content from the input file with the function readDataFromStayJson.
+        with self.__metrics.stage("guestArrival", "read_stay"):
+            stay_request = self.readDataFromStayJson(stay_file_path)
 
-        # Getting the path of the reservation file whose name is id_card.json
-        reservation_json_dir = self.getJsonDirectory("reservations_store")
-        reservation_filename = id_card + ".json"
-        reservation_file_path = os.path.join(reservation_json_dir, reservation_filename)
-        # Reading and storing the data from the reservation file into a tuple.
-        reservation_data = self.readDataFromReservationJson(reservation_file_path)
-        if localizer != reservation_data[8]:
+        # Reading the reservation of the client, whose keys and values are checked while it is decoded
+        with self.__metrics.stage("guestArrival", "read_reservation"):
+            reservation_data = self.__storage.loadReservation(stay_request.id_card)
+            reservation = RESERVATION_SCHEMA.decode(reservation_data)
+        if stay_request.localizer != reservation_data["localizer"]:
             raise HotelManagementException("The JSON data does not have valid values.")
-        if id_card != reservation_data[0]:
+        if stay_request.id_card != reservation.id_card:
             raise HotelManagementException("The JSON data does not have valid values.")
 
-        reservation = HotelReservation(reservation_data[0], reservation_data[2], reservation_data[1],
-                                       reservation_data[3], reservation_data[7], reservation_data[5],
-                                       reservation_data[6])
-
-        # We want to generate a new localizer with the data we have read from the reservation .json and compare it
-        new_localizer = reservation.localizer
-        if new_localizer != localizer:
+        with self.__metrics.stage("guestArrival", "localizer"):
+            # We want to generate a new localizer with the data we have read from the reservation .json and compare it
+            # (the decoded reservation keeps its stored reservation_date, on which the localizer depends)
+            new_localizer = reservation.localizer
+        if new_localizer != stay_request.localizer:
             raise HotelManagementException("The locator does not correspond to the stored data.")
-        # reservation_data[4] is reservation_date, reservation_data[5] is arrival_date
         try:
             # converting arrival date into a timestamp.
-            arrival_date = datetime.timestamp(datetime.strptime(reservation_data[5], "%d/%m/%Y"))
+            arrival_date = dateTimestamp(reservation.arrival_date)
         except ValueError as ex:
             raise HotelManagementException("The arrival date does not correspond to the reservation date") from ex
 
         # Now we can compare both dates to ensure they are equal.
-        if arrival_date != reservation_data[4]:
+        if arrival_date != reservation.reservation_date:
             raise HotelManagementException("The arrival date does not correspond to the reservation date")
 
-        hotel_stay = HotelStay(reservation_data[0], localizer, reservation_data[6], reservation_data[7])
-        # We retrieve the room key that has been already calculated in the HotelStay() object.
-        room_key = hotel_stay.room_key
+        with self.__metrics.stage("guestArrival", "room_key"):
+            hotel_stay = HotelStay(reservation.id_card, stay_request.localizer, reservation.num_days,
+                                   reservation.room_type)
+            # We retrieve the room key that has been already calculated in the HotelStay() object.
+            room_key = hotel_stay.room_key
 
-        file_name = room_key + ".json"
         json_data = {
             "alg": "SHA-256",
             "type": hotel_stay.type,
@@ -123,10 +406,62 @@ class HotelManager:
             "departure": hotel_stay.departure,
             "room_key": hotel_stay.room_key
         }
-        self.createJsonFile(file_name, "processed_stays_store", json_data, False)
+        with self.__metrics.stage("guestArrival", "write"):
+            if self.__stay_buffer is not None:
+                self.__stay_buffer.addStay(room_key, json_data)
+            else:
+                self.__storage.saveStays({room_key: json_data})
 
         return room_key
 
+    @instrumented("guestArrivals")
+    def guestArrivals(self, stay_files: str, max_workers: int = None, use_processes: bool = False):
+        """Function 2 for a batch of stay files.
+        stay_files is a directory of the stays_store folder (all its json files are processed) or a glob pattern
+        relative to it. Returns a dict with, for each file, the room_key of its stay or the exception that rejected
+        it, so an invalid file does not stop the rest. The files are processed by a pool of threads, or by a pool of
+        processes if use_processes is True (only for the default json stores, which every process can open)"""
+        input_files = self.findStayFiles(stay_files)
+        if not input_files:
+            return {}
+
+        if use_processes:
+            if not isinstance(self.__storage, JsonStorage):
+                raise ValueError("guestArrivals can only use processes with the json stores")
+            # Every process has its own HotelManager, and the stay files are sent to them in chunks so that the cost
+            # of sending them is shared by several files
+            chunk_size = max(1, len(input_files) // (4 * (max_workers or os.cpu_count() or 1)))
+            with ProcessPoolExecutor(max_workers, initializer=startArrivalWorker,
+                                     initargs=(self.__storage.storage_root,)) as executor:
+                results = list(executor.map(processArrivalFile, input_files, chunksize=chunk_size))
+        else:
+            with ThreadPoolExecutor(max_workers) as executor:
+                results = list(executor.map(self.tryGuestArrival, input_files))
+
+        arrivals = dict(zip(input_files, results))
+        accepted = sum(1 for result in results if isinstance(result, str))
+        self.__metrics.count("guestArrivals", "accepted", accepted)
+        self.__metrics.count("guestArrivals", "rejected", len(results) - accepted)
+        return arrivals
+
+    def findStayFiles(self, stay_files: str):
+        """Returns, sorted, the paths relative to the stays_store folder of the json files of the given directory or
+        of the files that match the given glob pattern"""
+        stay_json_dir = self.getJsonDirectory("stays_store")
+        if os.path.isdir(os.path.join(stay_json_dir, stay_files)):
+            stay_files = os.path.join(stay_files, "*.json")
+        return sorted(file_name for file_name in glob.glob(stay_files, root_dir=stay_json_dir)
+                      if os.path.isfile(os.path.join(stay_json_dir, file_name)))
+
+    def tryGuestArrival(self, input_file: str):
+        """Returns the room_key of the given stay file, or the exception raised while processing it"""
+        try:
+            return self.guestArrival(input_file)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # Any error only affects the file that caused it
+            return ex
+
+    @instrumented("guest_checkout")
     def guest_checkout(self, room_key: str):
         """
         Function 3. CheckOut HM-FR-03:
@@ -135,49 +470,169 @@ class HotelManager:
         (we will assume that the guest can only leave the hotel on the scheduled date).
         Finally, it will record the output in a file.
         """
-        # Validate the input - Adjusted to check for MD5 length, which is 32 characters
-        if not isinstance(room_key, str) or len(room_key) != 32:  # MD5 string length
-            #print(room_key)
+        # Validate the input - The room key is the SHA-256 signature of the stay, which is 64 characters long
+        if not isinstance(room_key, str) or len(room_key) != 64:  # SHA-256 string length
             raise HotelManagementException("Invalid room key format.")
 
-        # Search for the room_key in the "processed_stays_store"
-        file_path = self.getRoomKeyFilePath(room_key)
-        if not os.path.exists(file_path):
-            raise HotelManagementException("Room key not found in processed stays store.")
+        # Search for the room_key in the processed stays
+        with self.__metrics.stage("guest_checkout", "read_stay"):
+            stay_data = self.loadStay(room_key)
 
         # Verify that the departure date is today
-        with open(file_path, "r", encoding="utf-8") as file:
-            stay_data = json.load(file)
-        expected_departure = datetime.strptime(stay_data["departure"],
-                                               "%d/%m/%Y %H:%M:%S").date()  # Adjusted for potential time inclusion
+        expected_departure = self.getDepartureDate(stay_data["departure"])
         if expected_departure != datetime.utcnow().date():  # Adjusted to use UTC to align with system-wide use of UTC
             raise HotelManagementException("Departure date is not valid.")
 
         # Record the departure data
         departure_data = {
             "room_key": room_key,
-            "departure_date": datetime.utcnow().strftime("%d/%m/%Y")  # Use UTC for consistency
+            "departure_date": formatDate(datetime.utcnow().date())  # Use UTC for consistency
         }
-        self.saveDepartureData(room_key, departure_data)
+        with self.__metrics.stage("guest_checkout", "write"):
+            self.saveDepartureData(room_key, departure_data)
         return True
 
-    def getRoomKeyFilePath(self, room_key: str):
-        """Retrieve the file path for the room key"""
-        directory = self.getJsonDirectory("processed_stays_store")
-        # The room_key is directly used to name the stay file
-        file_name = f"{room_key}.json"
-        file_path = os.path.join(directory, file_name)
-        if os.path.exists(file_path):
-            return file_path
-        raise FileNotFoundError(f"No file found for room key: {room_key}")
+    @instrumented("guest_checkouts")
+    def guest_checkouts(self, room_keys):
+        """Function 3 for a batch of room keys, for the departures of the end of the day.
+        Returns a dict with, for each room_key in the order they were given, True or the HotelManagementException
+        that rejected it, so an invalid room_key does not stop the rest (one that cannot be a key of the dict is
+        reported under its repr). The stays are loaded together, their departure dates are compared with the bounds
+        of today, and all the checkouts are written at the end in a single commit"""
+        outcomes, pending_keys = self.checkRoomKeys(room_keys)
+        with self.__metrics.stage("guest_checkouts", "read_stays"):
+            stays = self.loadPendingStays(pending_keys)
+
+        # guestArrival stores the departure as a timestamp, so instead of converting every departure to a date they
+        # are compared with the timestamps of the beginning of today and of tomorrow
+        today = datetime.utcnow().date()
+        today_start = datetime.combine(today, datetime.min.time()).timestamp()
+        tomorrow_start = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        departure_date = formatDate(today)
+        checkouts = {}
+        for room_key in pending_keys:
+            try:
+                stay_data = stays[room_key]
+                if isinstance(stay_data, Exception):
+                    raise stay_data
+                departure = stay_data["departure"]
+                if isinstance(departure, (int, float)) and not isinstance(departure, bool):
+                    valid_departure = today_start <= departure < tomorrow_start
+                else:
+                    valid_departure = self.getDepartureDate(departure) == today
+                if not valid_departure:
+                    raise HotelManagementException("Departure date is not valid.")
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                outcomes[room_key] = ex
+                continue
+            checkouts[room_key] = {"room_key": room_key, "departure_date": departure_date}
+            outcomes[room_key] = True
+
+        with self.__metrics.stage("guest_checkouts", "write"):
+            self.__storage.saveRecords("checkouts", checkouts)
+        self.__metrics.count("guest_checkouts", "accepted", len(checkouts))
+        self.__metrics.count("guest_checkouts", "rejected", len(outcomes) - len(checkouts))
+        return outcomes
+
+    def checkRoomKeys(self, room_keys):
+        """Checks the format of a batch of room keys. Returns the outcomes of guest_checkouts, with the
+        HotelManagementException of every invalid room_key and None for the rest, and the list of the valid room keys
+        without repetitions, whose stays still have to be loaded"""
+        outcomes = {}
+        pending_keys = []
+        for room_key in room_keys:
+            # The format is checked before the room_key is used as a key of the outcomes, as an invalid one could even
+            # be unhashable (such as a list). Those are reported under their repr
+            if isinstance(room_key, str) and len(room_key) == 64:
+                if room_key not in outcomes:
+                    outcomes[room_key] = None
+                    pending_keys.append(room_key)
+                continue
+            try:
+                hash(room_key)
+            except TypeError:
+                room_key = repr(room_key)
+            outcomes.setdefault(room_key, HotelManagementException("Invalid room key format."))
+        return outcomes, pending_keys
+
+    def loadPendingStays(self, room_keys):
+        """Returns a dict with the processed stay of each of the given room keys, or the exception raised while loading
+        it. The stays still waiting in the write buffer are taken from it, and the rest are loaded together from the
+        storage"""
+        stays = {}
+        if self.__stay_buffer is not None:
+            for room_key in room_keys:
+                stay_data = self.__stay_buffer.getStay(room_key)
+                if stay_data is not None:
+                    stays[room_key] = stay_data
+        stays.update(self.__storage.loadStays([room_key for room_key in room_keys if room_key not in stays]))
+        return stays
+
+    def loadStay(self, room_key: str):
+        """Returns the processed stay of the room_key. A stay that is still in the write-behind buffer is returned from
+        it, so a guest can check out before the stay has been stored"""
+        if self.__stay_buffer is not None:
+            stay_data = self.__stay_buffer.getStay(room_key)
+            if stay_data is not None:
+                return stay_data
+        return self.__storage.loadStay(room_key)
+
+    def getDepartureDate(self, departure):
+        """Returns the date of the departure of a processed stay. guestArrival stores it as a timestamp, but it can
+        also be a "DD/MM/YYYY HH:MM:SS" string"""
+        try:
+            return getStayDate(departure)
+        except (ValueError, TypeError, OverflowError, OSError) as ex:
+            raise HotelManagementException("Departure date is not valid.") from ex
 
     def saveDepartureData(self, room_key: str, departure_data: dict):
-        """Saves information to a directory"""
-        directory = self.getJsonDirectory("checkouts_store")  # Ensure exists or is created
-        file_name = f"{room_key}_checkout.json"  # Naming for checkout files
-        file_path = os.path.join(directory, file_name)
-        with open(file_path, "w", encoding="utf-8") as file:
-            json.dump(departure_data, file, indent=4)
+        """Saves the checkout information in the storage backend"""
+        self.__storage.saveCheckout(room_key, departure_data)
+
+    def departuresOn(self, day: str):
+        """Returns the processed stays whose departure is on the given "DD/MM/YYYY" day, ordered by their room_key.
+        Each one is a dict with its room_key, idCard, type, arrival and departure dates and checked_out"""
+        report_date = self.parseReportDate(day)
+        return self.loadOccupancyIndex(report_date, report_date).departures(report_date)
+
+    def occupancyOn(self, day: str = None):
+        """Returns the number of occupied rooms of each room type on the given "DD/MM/YYYY" day (today by default)"""
+        report_date = datetime.utcnow().date() if day is None else self.parseReportDate(day)
+        # A guest in the hotel on the day leaves in the next MAX_STAY_DAYS days
+        return self.loadOccupancyIndex(report_date + timedelta(days=1),
+                                       report_date + timedelta(days=MAX_STAY_DAYS)).occupancy(report_date)
+
+    def parseReportDate(self, day: str):
+        """Returns the date of a "DD/MM/YYYY" string, or raises a HotelManagementException"""
+        try:
+            return parseDate(day)
+        except (ValueError, TypeError) as ex:
+            raise HotelManagementException("invalid date format \"DD/MM/YYYY\"") from ex
+
+    def loadOccupancyIndex(self, first_departure: date, last_departure: date):
+        """Returns an index with the processed stays whose departure is between first_departure and last_departure,
+        and their checkouts. The storage finds them by their departure date in the same store every HotelManager and
+        process writes, and the stays of the write-behind buffer that have not been stored yet are added to them"""
+        stays = self.__storage.loadDepartures(first_departure, last_departure)
+        if self.__stay_buffer is not None:
+            for room_key, stay_data in self.__stay_buffer.items():
+                stay_dates = getStayDates(stay_data)
+                if stay_dates is not None and first_departure <= stay_dates[2] <= last_departure:
+                    stays[room_key] = stay_data
+        occupancy_index = OccupancyIndex()
+        self.addStaysToIndex(occupancy_index, stays.items())
+        for room_key in self.__storage.loadCheckouts(stays):
+            occupancy_index.addCheckout(room_key)
+        return occupancy_index
+
+    def addStaysToIndex(self, occupancy_index: OccupancyIndex, stays):
+        """Adds every (room_key, processed stay) pair to the given index, skipping the stays that are not valid"""
+        for room_key, stay_data in stays:
+            stay_dates = getStayDates(stay_data) if isinstance(stay_data, dict) else None
+            if stay_dates is None or "idCard" not in stay_data:
+                continue
+            room_type, arrival, departure = stay_dates
+            occupancy_index.addStay(room_key, stay_data["idCard"], room_type, arrival, departure)
 
     def validateCreditCard(self, credit_card: str):
         """Checks if the credit_card parameter of the roomReservation function is valid, else it raises the
@@ -188,39 +643,82 @@ class HotelManager:
         if len(credit_card) != 16:
             raise HotelManagementException("credit_card is not 16 characters long")
 
-        # This function checks if all the characters of credit_card are digits, else it returns a
-        # HotelManagementException with the message that is passed as the second parameter
-        self.isAllDigits(credit_card, "credit_card must have 16 digits")
+        # All the characters of credit_card must be digits. Checking it with the str methods avoids iterating through
+        # the characters in Python
+        if not (credit_card.isascii() and credit_card.isdigit()):
+            raise HotelManagementException("credit_card must have 16 digits")
 
         # Luhn's algorithm: checks if the last digit of the credit card number is valid
+        if self.luhnSum(credit_card) % 10 != 0:
+            raise HotelManagementException("credit_card does not follow the Luhn algorithm")
 
-        # We separate the last digit (check_digit) from the rest (payload)
-        # Operations are performed on the payload to figure out the unique valid last digit
-        check_digit = credit_card[len(credit_card) - 1]
-        payload = credit_card[:len(credit_card) - 1]
-        sum_total = 0
-        double = True
-
-        # We iterate through each digit of the payload, starting from the last one
-        for i in range(len(credit_card) - 2, -1, -1):
-            # Digits in odd positions (1st iteration, 3rd, 5th...) are doubled
-            if double:
-                sum_digit = 2 * int(payload[i])
-                # If we obtain a number equal or higher than 10, we take each of its digits and add them together
-                # Example: 15 = 1 + 5 = 6
-                if sum_digit >= 10:
-                    sum_digit = 1 + sum_digit % 10
-            # Digits in even positions are left as they are
+    def validateCreditCards(self, credit_cards):
+        """Checks a batch of credit cards (any iterable of them, such as a list or a NumPy array of strings) and returns
+        a list with, for each one in the same order, None if it is valid or else the HotelManagementException that
+        validateCreditCard would raise"""
+        results = []
+        # Positions in results of the credit cards with 16 characters, which still have to be checked
+        candidates = []
+        for credit_card in credit_cards:
+            if not isinstance(credit_card, str):
+                results.append(HotelManagementException("credit_card is not a string"))
+            elif len(credit_card) != 16:
+                results.append(HotelManagementException("credit_card is not 16 characters long"))
             else:
-                sum_digit = int(payload[i])
-            # We add all the obtained digits together
-            sum_total += sum_digit
-            # If we doubled this digit, the next one should not be doubled and viceversa
-            double = not double
-
-        # We obtain the valid check digit with a final formula, and we compare it with the one of the input credit_card
-        if int(check_digit) != (10 - (sum_total % 10)) % 10:
-            raise HotelManagementException("credit_card does not follow the Luhn algorithm")
+                candidates.append(len(results))
+                results.append(credit_card)
+        if not candidates:
+            return results
+
+        candidates, joined_cards = self.checkCardDigits(results, candidates)
+        for luhn_sum, position in zip(self.luhnSums(joined_cards), candidates):
+            if luhn_sum % 10 != 0:
+                results[position] = HotelManagementException("credit_card does not follow the Luhn algorithm")
+            else:
+                results[position] = None
+        return results
+
+    def checkCardDigits(self, results: list, candidates: list):
+        """Checks that the credit cards in the given positions of results only have digits, replacing the ones that do
+        not with their HotelManagementException. Returns the positions of the credit cards that passed and the string
+        of all of them joined"""
+        # The candidates are joined in a single string, so the digits of the whole batch are checked at once. Only if
+        # one of them has another character they are checked one by one
+        joined_cards = "".join([results[position] for position in candidates])
+        if joined_cards.isascii() and joined_cards.isdigit():
+            return candidates, joined_cards
+        valid_positions = []
+        for position in candidates:
+            if results[position].isascii() and results[position].isdigit():
+                valid_positions.append(position)
+            else:
+                results[position] = HotelManagementException("credit_card must have 16 digits")
+        return valid_positions, "".join([results[position] for position in valid_positions])
+
+    def luhnSums(self, joined_cards: str):
+        """Returns the sum of Luhn's algorithm of each of the 16 digit credit cards joined in joined_cards, as bytes"""
+        # As every credit card has 16 digits, the digits that are doubled are the ones in even positions of the joined
+        # buffer, so the buffer is translated into the values of its digits with 2 translations. Then the 16 values of
+        # each credit card are added together in 4 rounds: each round adds every pair of neighbour values at once,
+        # using the values in even and in odd positions as the bytes of 2 big integers (a sum is at most 16 * 9 = 144,
+        # so it never overflows into the next byte)
+        card_bytes = joined_cards.encode("ascii")
+        values = bytearray(card_bytes.translate(LUHN_DIGITS))
+        values[0::2] = card_bytes[0::2].translate(LUHN_DOUBLED_DIGITS)
+        for _ in range(4):
+            values = (int.from_bytes(values[0::2], "little") +
+                      int.from_bytes(values[1::2], "little")).to_bytes(len(values) // 2, "little")
+        return values
+
+    def luhnSum(self, credit_card: str):
+        """Returns the sum of Luhn's algorithm for a 16 digit credit card, check digit included. The credit card
+        follows the algorithm if the sum is a multiple of 10"""
+        # Starting from the last digit of the payload (the one before the check digit), every other digit is doubled,
+        # and if we obtain a number equal or higher than 10 its 2 digits are added together (15 = 1 + 5 = 6). For 16
+        # digits, those are the digits in even positions. Instead of computing it digit by digit, the ascii codes of
+        # the digits are translated with precomputed tables into their values (doubled or not) and then added
+        card_bytes = credit_card.encode("ascii")
+        return sum(card_bytes[0::2].translate(LUHN_DOUBLED_DIGITS)) + sum(card_bytes[1::2].translate(LUHN_DIGITS))
 
     def validateNameSurname(self, name_surname: str):
         """Checks if the name_surname parameter of the roomReservation function is valid, else it raises the
@@ -231,83 +729,59 @@ class HotelManager:
         if not 10 <= len(name_surname) <= 50:
             raise HotelManagementException("name_surname must be between 10 and 50 characters long")
 
-        # If there is a white space at the beginning or at the end of the string, that white space is not separating
-        # 2 strings and thus denotes an invalid format
-        if name_surname[0] == " " or name_surname[-1] == " ":
+        # We need minimum 2 strings separated by 1 white space, and every pair of subsequent strings must have only 1
+        # white space separating them. So the format is invalid if:
+        # - There is a white space at the beginning or at the end of the string (it is not separating 2 strings)
+        # - There are 2 subsequent white spaces
+        # - There are no white spaces at all (which is the same as saying we have less than 2 strings)
+        # Each of these conditions is checked by a single str operation, without iterating through the characters
+        if (name_surname[0] == " " or name_surname[-1] == " " or "  " in name_surname
+                or " " not in name_surname):
             raise HotelManagementException("name_surname must contain at least 2 strings separated by a white space")
 
-        # True is there is at least 1 white space in the string
-        # We need minimum 2 strings and 1 white space, which are different ways of expressing the same (having 1 white
-        # space implies we have 2 strings)
-        is_there_white_space = False
-        # True if the character of an iteration is a white space
-        # Will be used to check every pair of subsequent strings have a white space separating them and only 1
-        current_white_space = False
-
-        # We iterate through each character
-        for character in name_surname:
-            if character == " ":
-                # If the character of the previous iteration was a white space and the current one too, that means
-                # we have 2 subsequent white spaces, so the format is invalid
-                if current_white_space:
-                    raise HotelManagementException(
-                        "name_surname must contain at least 2 strings separated by a white space")
-                # We update the variable according to the new information of the current iteration
-                current_white_space = True
-                # We have found at least 1 white space
-                is_there_white_space = True
-            elif current_white_space:
-                # We update the variable according to the new information of the current iteration
-                current_white_space = False
-
-        # If we have 0 white spaces, it is the same as saying we have less than 2 strings
-        if not is_there_white_space:
-            raise HotelManagementException(
-                "name_surname must contain at least 2 strings separated by a white space")
-
     def validateIdCard(self, id_card: str):
         """Checks if the id_card parameter of the roomReservation function is valid, else it raises the
         corresponding HotelManagementExceptions"""
+        self.checkIdCardFormat(id_card)
+
+        # Now we need to check if the client that is doing the reservation already has a reservation
+        # Each client is univocally identified by his/her id_card, so we need to check that there is no reservation
+        # stored for the input id_card
+        # We look for the id_card in the index of reservations instead of iterating through the directory
+        if self.isIdCardReserved(id_card):
+            raise HotelManagementException("a client with specified id_card already has a reservation")
+
+    def checkIdCardFormat(self, id_card: str):
+        """Checks that the id_card has 8 digits and the letter that corresponds to them, else it raises the
+        corresponding HotelManagementExceptions"""
         if not isinstance(id_card, str):
             raise HotelManagementException("id_card is not a string")
 
-        if len(id_card) != 9:
-            raise HotelManagementException("id_card must have 8 digits and 1 final letter")
-
-        # A valid id_card has 8 digits at the beginning and 1 final letter, so we separate them to analyze them
-        digits = id_card[:8]
-        letter = id_card[-1]
-
-        # Checks that the 8 starting characters are actually 8 digits
-        self.isAllDigits(digits, "id_card must have 8 digits and 1 final letter")
-
-        # Letters are ordered in this way to apply in an easy way the algorithm of valid final letter
-        letters_list = ["T", "R", "W", "A", "G", "M", "Y", "F", "P", "D", "X", "B", "N", "J", "Z", "S", "Q", "V", "H",
-                        "L", "C", "K", "E"]
-
-        # Checks that the final letter is actually a letter
-        if letter not in letters_list:
+        # A valid id_card has 8 digits at the beginning and 1 final letter, which are checked with a single pattern
+        if len(id_card) != 9 or not ID_CARD_PATTERN.fullmatch(id_card):
             raise HotelManagementException("id_card must have 8 digits and 1 final letter")
 
         # The algorithm of the valid final letter consists in a modulo operation done on the 8-digit number, which
-        # returns 23 possible values, and each of them is associated to a letter (an index of letters_list)
+        # returns 23 possible values, and each of them is associated to a letter (an index of ID_CARD_LETTERS)
         # We compare if the valid letter coincides with the input letter
-        if letter != letters_list[int(digits) % 23]:
+        if id_card[-1] != ID_CARD_LETTERS[int(id_card[:8]) % 23]:
             raise HotelManagementException("invalid letter for id_card")
 
-        # Now we need to check if the client that is doing the reservation already has a reservation
-        # Each client is univocally identified by his/her id_card, and the name of every json file corresponds to
-        # the id_card of the client who made the reservation, so we need to check that there is no json file stored in
-        # the reservations_store directory whose name is the input id_card
-
-        # We get the reservations_store directory (absolute path)
-        directory = self.getJsonDirectory("reservations_store")
-
-        # We iterate through each of the json files stored in that directory
-        for file_name in os.listdir(directory):
-            # The name of the json files corresponds to the id_card of the client who made the reservation
-            if id_card in file_name:
-                raise HotelManagementException("a client with specified id_card already has a reservation")
+    def checkIdCardFormats(self, id_cards: list):
+        """Checks the format and the letter of a batch of id_cards (without looking for their reservations) and
+        returns a list with, for each one in the same order, None if it is valid or else the HotelManagementException
+        that checkIdCardFormat would raise"""
+        # The id_cards of 9 characters are joined in a single string, so the format of the whole batch is checked with
+        # a single match. Only if one of them does not match they are checked one by one
+        joined_id_cards = "".join([id_card for id_card in id_cards if isinstance(id_card, str) and len(id_card) == 9])
+        if len(joined_id_cards) != 9 * len(id_cards) or not ID_CARDS_PATTERN.fullmatch(joined_id_cards):
+            return [self.checkField(self.checkIdCardFormat, id_card) for id_card in id_cards]
+        return [None if id_card[8] == ID_CARD_LETTERS[int(id_card[:8]) % 23]
+                else HotelManagementException("invalid letter for id_card") for id_card in id_cards]
+
+    def isIdCardReserved(self, id_card: str):
+        """Returns True if there is a reservation stored for the given id_card"""
+        return self.__storage.isIdCardReserved(id_card)
 
     def validatePhoneNumber(self, phone_number: str):
         """Checks if the phone_number parameter of the roomReservation function is valid, else it raises the
@@ -333,60 +807,35 @@ class HotelManager:
     def validateArrivalDate(self, arrival_date: str):
         """Checks if the arrival_date parameter of the roomReservation function is valid, else it raises the
         corresponding HotelManagementExceptions"""
+        self.checkArrivalDate(arrival_date, datetime.now().date())
+
+    def validateArrivalDates(self, arrival_dates: list):
+        """Checks a batch of arrival dates and returns a list with, for each one in the same order, None if it is valid
+        or else the HotelManagementException that validateArrivalDate would raise. The current date is only read once,
+        and every different string is only parsed once"""
+        today = datetime.now().date()
+        return [self.checkField(lambda arrival_date: self.checkArrivalDate(arrival_date, today), arrival_date)
+                for arrival_date in arrival_dates]
+
+    def checkArrivalDate(self, arrival_date: str, today: date):
+        """Checks that arrival_date is a "DD/MM/YYYY" date that is not before today, else it raises the corresponding
+        HotelManagementExceptions"""
         if not isinstance(arrival_date, str):
             raise HotelManagementException("arrival_date is not a string")
 
-        if len(arrival_date) != 10:
-            raise HotelManagementException("invalid arrival_date format \"DD/MM/YYYY\"")
-
-        # We separate each of the different parts of the date format to analyze them
-        day_string = arrival_date[:2]
-        first_slash = arrival_date[2]
-        month_string = arrival_date[3:5]
-        second_slash = arrival_date[5]
-        year_string = arrival_date[6:]
-
-        # We have this basic pattern: 2 digits - slash - 2 digits - slash - 4 digits
-        if first_slash != "/" or second_slash != "/":
-            raise HotelManagementException("invalid arrival_date format \"DD/MM/YYYY\"")
-        self.isAllDigits(day_string, "invalid arrival_date format \"DD/MM/YYYY\"")
-        self.isAllDigits(month_string, "invalid arrival_date format \"DD/MM/YYYY\"")
-        self.isAllDigits(year_string, "invalid arrival_date format \"DD/MM/YYYY\"")
-
-        # We now have to check if the date represented in the string actually corresponds to a date that exists in real
-        # life. We will need to make numeric operations and comparisons on these fields, so we transform them from
-        # string to int
-        day = int(day_string)
-        month = int(month_string)
-        year = int(year_string)
-
-        # We have 12 months in the calendar
-        if not 1 <= month <= 12:
-            raise HotelManagementException("arrival_date does not exist")
-
-        # Depending on the month of the year, and if we have a leap-year or not, the range of valid day values varies
-        # In this ordered list, we associate each index with a month and its maximum number of days
-        # (0 = January, 1 = February, 2 = March...)
-        days_list = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-        # Algorithm to calculate whether a year is a leap-year (if February has a maximum of 29 days instead of 28)
-        if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
-            days_list[1] = 29
-
-        # A day of a given valid month cannot be bigger than its associated maximum number of days
-        if day > days_list[month - 1]:
-            raise HotelManagementException("arrival_date does not exist")
+        # We have this basic pattern: 2 digits - slash - 2 digits - slash - 4 digits, and the date represented in the
+        # string must actually correspond to a date that exists in real life (a valid month, and a day that the month
+        # has in that year). The date codec checks both, and remembers the dates it has already parsed
+        try:
+            arrival = parseDate(arrival_date)
+        except DateFormatError as ex:
+            raise HotelManagementException("invalid arrival_date format \"DD/MM/YYYY\"") from ex
+        except ValueError as ex:
+            raise HotelManagementException("arrival_date does not exist") from ex
 
         # We have checked that the date exists. Now we need to figure out if it makes sense to make a reservation in
         # that date. We allow our clients to make a reservation for the same day or for any posterior days
-
-        # Algorithm to throw an exception if a client is trying to make a reservation for a date in the past, given
-        # our defined current date
-        current_date = datetime.now()
-        if year < current_date.year:
-            raise HotelManagementException("arrival_date before current date")
-        if year == current_date.year and month < current_date.month:
-            raise HotelManagementException("arrival_date before current date")
-        if year == current_date.year and month == current_date.month and day < current_date.day:
+        if arrival < today:
             raise HotelManagementException("arrival_date before current date")
 
     def validateNumDays(self, num_days: int):
@@ -401,81 +850,31 @@ class HotelManager:
     def isAllDigits(self, digit_string: str, exception_message: str):
         """Check if all the characters of a given string are digits, else a HotelManagementException is raised with a
         given message"""
-        digits_list = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
-
-        for character in digit_string:
-            if character not in digits_list:
-                raise HotelManagementException(exception_message)
+        # The set checks every character of the string in a single call
+        if not DIGITS.issuperset(digit_string):
+            raise HotelManagementException(exception_message)
 
     def getJsonDirectory(self, folder_name: str):
         """Returns the desired directory in which generated json files are stored"""
-        # We need to obtain the common parent directory of all the files of our project, so that the function can be
-        # called in any file and still return the same result
-        # We also have to take into account that this is a collaborative project, so we cannot simply put a specific
-        # absolute path, but an absolute path relative to our particular computer. The place where the project directory
-        # lies
-
-        # Absolute path of the current directory
-        current_directory = os.getcwd()
-        # We get the index of the string in which the name of our project begins
-        index = current_directory.index("G87.2024.T3.GE2")
-        # We obtain the parent directory that is common to all the project's files of our specific computer
-        project_directory = current_directory[:index]
-        # We navigate down the directory to reach the json_file directory
-        json_directory = os.path.join(project_directory,
-                                      "G87.2024.T3.GE2", "src", "main", "python", "UC3MTravel", folder_name)
-        return json_directory
-
-    def createJsonFile(self, file_name: str, folder_name: str, json_data: dict, delete_test: bool):
-        """Creates a json file named file_name in the folder folder_name and writes on it json_data"""
-        # First, we need to get the absolute path of the directory where we want to store the json file
-        json_directory = self.getJsonDirectory(folder_name)
-
-        # We save the current directory, so we can restore it later
-        original_directory = os.getcwd()
-
-        # We change the current directory to the directory where the json file will be stored to be able to save it
-        # there
-        os.chdir(json_directory)
-
-        # We open the file for writing (it is created if it does not exist) and we write the data
-        with open(file_name, "w", encoding="utf-8") as open_file:
-            open_file.write(json.dumps(json_data, indent=4))
-
-        # We need to delete the created file if it was created for testing purposes
-        #if "unittest" in original_directory and delete_test:
-
-
-        # We restore the original current directory
-        os.chdir(original_directory)
+        return self.__storage.getJsonDirectory(folder_name)
 
     def readDataFromStayJson(self, file_path: str):
-        """Reads a given stay json file and returns the value of its IdCard key and Localizer key."""
+        """Reads a given stay json file and returns a StayRequest with the value of its IdCard key and Localizer key."""
         # First, it makes sure the path for the input file has the .json extension, then it tries to open the file for
         # reading and storing its content in a variable, and throws an exception if an error occurs during the process.
         if file_path[-5:] != ".json":
             raise HotelManagementException("The file is not in JSON format")
         try:
-            with open(file_path, "r", encoding="utf-8") as open_file:
-                data = json.load(open_file)
+            with open(file_path, "rb") as open_file:
+                content = open_file.read()
         except FileNotFoundError as ex:
             raise HotelManagementException("The data file cannot be found.") from ex
-        except json.JSONDecodeError as ex:
-            raise HotelManagementException("The JSON does not have the expected structure.") from ex
 
-        # We get the value of the IdCard key and the Localizer key.
-        try:
-            json_id_card = data["IdCard"]
-            json_localizer = data["Localizer"]
-        except KeyError as ex:
-            open_file.close()
-            raise HotelManagementException("The JSON does not have the expected structure.") from ex
-        if len(json_id_card) != 9 or len(json_localizer) != 32:
+        # The json is parsed, and its IdCard key and Localizer key are checked, in a single pass
+        stay_request = STAY_REQUEST_SCHEMA.decodeJson(content)
+        if len(stay_request.id_card) != 9 or len(stay_request.localizer) != 32:
             raise HotelManagementException("The JSON data does not have valid values.")
-
-        # Close the file and return the value
-        open_file.close()
-        return json_id_card, json_localizer
+        return stay_request
 
     def readDataFromReservationJson(self, file_path: str):
         """Reads a given reservation json file and returns the value of its keys.."""
@@ -483,33 +882,12 @@ class HotelManager:
         # reading and storing its content in a variable, and throws an exception if an error occurs during the process.
         if file_path[-5:] != ".json":
             raise HotelManagementException("Wrong file or file path")
-        try:
-            with open(file_path, "r", encoding="utf-8") as open_file:
-                data = json.load(open_file)
-        except FileNotFoundError as ex:
-            raise HotelManagementException("Wrong file or file path") from ex
-        except json.JSONDecodeError as ex:
-            raise HotelManagementException("JSON Decode Error - Wrong JSON Format") from ex
+        return self.extractReservationData(readJsonFile(file_path))
 
-        try:
-            json_id_card = data["id_card"]
-            json_name_surname = data["name_surname"]
-            json_credit_card = data["credit_card"]
-            json_phone_number = data["phone_number"]
-            json_reservation_date = data["reservation_date"]
-            json_arrival_date = data["arrival_date"]
-            json_num_days = data["num_days"]
-            json_room_type = data["room_type"]
-            json_localizer = data["localizer"]
-        except KeyError as ex:
-            open_file.close()
-            raise HotelManagementException("JSON Decode Error - Invalid JSON Key") from ex
-
-        # Close the file and return the value
-        open_file.close()
-
-        return (json_id_card, json_name_surname, json_credit_card, json_phone_number, json_reservation_date,
-                json_arrival_date, json_num_days, json_room_type, json_localizer)
+    def extractReservationData(self, data: dict):
+        """Returns the value of the keys of a stored reservation, in the order of RESERVATION_SCHEMA."""
+        RESERVATION_SCHEMA.validate(data)
+        return tuple(data[key] for key in RESERVATION_SCHEMA.keys)
 
     def readDataFromProcessedStayJson(self, file_path: str):
         """Reads a given processed stay json file and returns the value of its keys."""
@@ -517,27 +895,9 @@ class HotelManager:
         # reading and storing its content in a variable, and throws an exception if an error occurs during the process.
         if file_path[-5:] != ".json":
             raise HotelManagementException("Wrong file or file path")
-        try:
-            with open(file_path, "r", encoding="utf-8") as open_file:
-                data = json.load(open_file)
-        except FileNotFoundError as ex:
-            raise HotelManagementException("Wrong file or file path") from ex
-        except json.JSONDecodeError as ex:
-            raise HotelManagementException("JSON Decode Error - Wrong JSON Format") from ex
+        return self.extractProcessedStayData(readJsonFile(file_path))
 
-        try:
-            json_alg = data["alg"]
-            json_type = data["type"]
-            json_id_card = data["idCard"]
-            json_localizer = data["localizer"]
-            json_arrival = data["arrival"]
-            json_departure = data["departure"]
-            json_room_key = data["room_key"]
-        except KeyError as ex:
-            open_file.close()
-            raise HotelManagementException("JSON Decode Error - Invalid JSON Key") from ex
-
-        # Close the file and return the value
-        open_file.close()
-
-        return json_alg, json_type, json_id_card, json_localizer, json_arrival, json_departure, json_room_key
+    def extractProcessedStayData(self, data: dict):
+        """Returns the value of the keys of a stored processed stay, in the order of PROCESSED_STAY_SCHEMA."""
+        PROCESSED_STAY_SCHEMA.validate(data)
+        return tuple(data[key] for key in PROCESSED_STAY_SCHEMA.keys)
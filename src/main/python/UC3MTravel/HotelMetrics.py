@@ -0,0 +1,142 @@
+"""HotelMetrics module"""
+import contextlib
+import functools
+import os
+import threading
+import time
+
+# Context manager returned when instrumentation is disabled, so timing a stage costs a single method call
+NULL_STAGE = contextlib.nullcontext()
+
+
+class HotelMetrics:
+    """Base metrics sink, which ignores every measure. It is the one used when instrumentation is disabled"""
+    enabled = False
+
+    def stage(self, operation: str, stage: str):  # pylint: disable=unused-argument
+        """Returns a context manager that measures the time spent in a stage of an operation"""
+        return NULL_STAGE
+
+    def count(self, operation: str, counter: str, amount: int = 1):
+        """Adds amount to a counter of an operation"""
+
+
+# Sink shared by every HotelManager created without metrics
+NO_METRICS = HotelMetrics()
+
+
+def instrumented(operation: str):
+    """Decorator for the public methods of HotelManager: measures the total time of each call as the "total" stage
+    of the given operation"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if not metrics.enabled:
+                return method(self, *args, **kwargs)
+            with metrics.stage(operation, "total"):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsAggregator(HotelMetrics):
+    """Metrics sink that aggregates in memory the number of calls, the total time and the maximum time of every stage,
+    and the value of every counter"""
+    enabled = True
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__stages = {}
+        self.__counters = {}
+
+    @contextlib.contextmanager
+    def stage(self, operation: str, stage: str):
+        """Measures the time spent in the with block. If an exception leaves the block, it is also counted as an
+        error of the stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.count(operation, stage + "_errors")
+            raise
+        finally:
+            self.recordTime(operation, stage, time.perf_counter() - start)
+
+    def recordTime(self, operation: str, stage: str, seconds: float):
+        """Adds a measured time to the stage of an operation"""
+        with self.__lock:
+            timing = self.__stages.get((operation, stage))
+            if timing is None:
+                self.__stages[(operation, stage)] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    def count(self, operation: str, counter: str, amount: int = 1):
+        """Adds amount to a counter of an operation"""
+        with self.__lock:
+            self.__counters[(operation, counter)] = self.__counters.get((operation, counter), 0) + amount
+
+    def snapshot(self):
+        """Returns a copy of the aggregated measures: {"stages": {operation: {stage: {"count", "total_seconds",
+        "max_seconds"}}}, "counters": {operation: {counter: value}}}"""
+        stages = {}
+        counters = {}
+        with self.__lock:
+            for (operation, stage), (calls, total, maximum) in self.__stages.items():
+                stages.setdefault(operation, {})[stage] = {"count": calls, "total_seconds": total,
+                                                           "max_seconds": maximum}
+            for (operation, counter), value in self.__counters.items():
+                counters.setdefault(operation, {})[counter] = value
+        return {"stages": stages, "counters": counters}
+
+    def reset(self):
+        """Discards every measure aggregated so far"""
+        with self.__lock:
+            self.__stages.clear()
+            self.__counters.clear()
+
+
+class PrometheusMetrics(MetricsAggregator):
+    """Metrics aggregator that can dump its measures to a file in the Prometheus text exposition format"""
+    def __init__(self, file_path: str, prefix: str = "uc3m_travel"):
+        super().__init__()
+        self.__file_path = file_path
+        self.__prefix = prefix
+
+    @property
+    def file_path(self):
+        """Property representing the file where the measures are dumped"""
+        return self.__file_path
+
+    def render(self):
+        """Returns the aggregated measures in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        name = self.__prefix + "_stage_seconds"
+        timings = [(f'{{operation="{operation}",stage="{stage}"}}', timing)
+                   for operation, stages in sorted(snapshot["stages"].items())
+                   for stage, timing in sorted(stages.items())]
+        # Every sample of a metric family must follow its TYPE line without samples of other families in between, so
+        # the maximums (which are a gauge family of their own) are written after all the samples of the summary
+        lines = [f"# TYPE {name} summary"]
+        for labels, timing in timings:
+            lines.append(f"{name}_count{labels} {timing['count']}")
+            lines.append(f"{name}_sum{labels} {timing['total_seconds']!r}")
+        lines.append(f"# TYPE {name}_max gauge")
+        for labels, timing in timings:
+            lines.append(f"{name}_max{labels} {timing['max_seconds']!r}")
+        name = self.__prefix + "_events_total"
+        lines.append(f"# TYPE {name} counter")
+        for operation, counters in sorted(snapshot["counters"].items()):
+            for counter, value in sorted(counters.items()):
+                lines.append(f'{name}{{operation="{operation}",counter="{counter}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Writes the measures in the file, replacing it atomically so a scraper never reads half of it"""
+        temp_file_path = f"{self.__file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file_path, "w", encoding="utf-8") as open_file:
+            open_file.write(self.render())
+        os.replace(temp_file_path, self.__file_path)
@@ -5,6 +5,10 @@ from datetime import datetime
 
 class HotelReservation:
     """ HotelReservation class"""
+    # The attributes are kept in slots instead of a __dict__, which makes every reservation smaller and faster to read
+    __slots__ = ("__credit_card", "__id_card", "__arrival_date", "__reservation_date", "__name_surname",
+                 "__phone_number", "__room_type", "__num_days", "__localizer")
+
     def __init__(self, id_card, credit_card, name_surname, phone_number, room_type, arrival_date, num_days):
         self.__credit_card = credit_card
         self.__id_card = id_card
@@ -15,6 +19,28 @@ class HotelReservation:
         self.__phone_number = phone_number
         self.__room_type = room_type
         self.__num_days = num_days
+        # The localizer is only computed the first time it is read, and again after any of its fields changes
+        self.__localizer = None
+
+    @classmethod
+    def fromJsonData(cls, data: dict):
+        """Builds the reservation stored in a parsed reservation json, keeping its reservation_date"""
+        reservation = cls.__new__(cls)
+        reservation.__credit_card = data["credit_card"]
+        reservation.__id_card = data["id_card"]
+        reservation.__arrival_date = data["arrival_date"]
+        reservation.__reservation_date = data["reservation_date"]
+        reservation.__name_surname = data["name_surname"]
+        reservation.__phone_number = data["phone_number"]
+        reservation.__room_type = data["room_type"]
+        reservation.__num_days = data["num_days"]
+        reservation.__localizer = None
+        return reservation
+
+    @classmethod
+    def fromJsonRecords(cls, records):
+        """Builds a list of reservations from an iterable of parsed reservation jsons"""
+        return [cls.fromJsonData(data) for data in records]
 
     def __str__(self):
         """return a json string with the elements required to calculate the localizer"""
@@ -39,6 +65,7 @@ class HotelReservation:
     def credit_card(self, value):
         """ setter for credit card"""
         self.__credit_card = value
+        self.__localizer = None
 
     @property
     def id_card(self):
@@ -49,6 +76,7 @@ class HotelReservation:
     def id_card(self, value):
         """ Setter of id_card"""
         self.__id_card = value
+        self.__localizer = None
 
     @property
     def arrival_date(self):
@@ -59,6 +87,7 @@ class HotelReservation:
     def arrival_date(self, value):
         """ setter for arrival_date"""
         self.__arrival_date = value
+        self.__localizer = None
 
     @property
     def reservation_date(self):
@@ -69,6 +98,7 @@ class HotelReservation:
     def reservation_date(self, value):
         """ setter for reservation_date"""
         self.__reservation_date = value
+        self.__localizer = None
 
     @property
     def name_surname(self):
@@ -79,6 +109,7 @@ class HotelReservation:
     def name_surname(self, value):
         """ Setter for name_surname"""
         self.__name_surname = value
+        self.__localizer = None
 
     @property
     def phone_number(self):
@@ -89,6 +120,7 @@ class HotelReservation:
     def phone_number(self, value):
         """ Setter for phone_number"""
         self.__phone_number = value
+        self.__localizer = None
 
     @property
     def room_type(self):
@@ -99,6 +131,7 @@ class HotelReservation:
     def room_type(self, value):
         """ setter for room_type"""
         self.__room_type = value
+        self.__localizer = None
 
     @property
     def num_days(self):
@@ -109,8 +142,11 @@ class HotelReservation:
     def num_days(self, value):
         """ Setter for num_days"""
         self.__num_days = value
+        self.__localizer = None
 
     @property
     def localizer(self):
         """Returns the md5 signature"""
-        return hashlib.md5(str(self).encode()).hexdigest()
+        if self.__localizer is None:
+            self.__localizer = hashlib.md5(str(self).encode()).hexdigest()
+        return self.__localizer
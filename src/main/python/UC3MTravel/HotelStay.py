@@ -4,6 +4,9 @@ import hashlib
 
 class HotelStay():
     """ HotelStay class."""
+    # The attributes are kept in slots instead of a __dict__, which makes every stay smaller and faster to read
+    __slots__ = ("__alg", "__type", "__idcard", "__localizer", "__arrival", "__departure", "__room_key")
+
     def __init__(self, idcard, localizer, numdays, roomtype):
         self.__alg = "SHA-256"
         self.__type = roomtype
@@ -14,7 +17,27 @@ class HotelStay():
         # timestamp is represented in seconds.miliseconds
         # to add the number of days we must express numdays in seconds
         self.__departure = self.__arrival + (numdays * 24 * 60 * 60)
-        self.__room_key = self.room_key
+        # The room key is only computed the first time it is read, and again after any of its fields changes
+        self.__room_key = None
+
+    @classmethod
+    def fromJsonData(cls, data: dict):
+        """Builds the stay stored in a parsed processed stay json, keeping its arrival and departure"""
+        stay = cls.__new__(cls)
+        stay.__alg = data["alg"]
+        stay.__type = data["type"]
+        stay.__idcard = data["idCard"]
+        stay.__localizer = data["localizer"]
+        stay.__arrival = data["arrival"]
+        stay.__departure = data["departure"]
+        # The stored room key is not trusted, it is computed again from the stored fields when it is read
+        stay.__room_key = None
+        return stay
+
+    @classmethod
+    def fromJsonRecords(cls, records):
+        """Builds a list of stays from an iterable of parsed processed stay jsons"""
+        return [cls.fromJsonData(data) for data in records]
 
     def __signature_string(self):
         """Composes the string to be used for generating the key for the room"""
@@ -44,6 +67,7 @@ class HotelStay():
     @localizer.setter
     def localizer(self, value):
         self.__localizer = value
+        self.__room_key = None
 
     @property
     def arrival(self):
@@ -53,7 +77,9 @@ class HotelStay():
     @property
     def room_key(self):
         """Returns the sha256 signature of the date"""
-        return hashlib.sha256(self.__signature_string().encode()).hexdigest()
+        if self.__room_key is None:
+            self.__room_key = hashlib.sha256(self.__signature_string().encode()).hexdigest()
+        return self.__room_key
 
     @property
     def departure(self):
@@ -63,3 +89,4 @@ class HotelStay():
     @departure.setter
     def departure(self, value):
         self.__departure = value
+        self.__room_key = None
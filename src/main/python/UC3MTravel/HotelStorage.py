@@ -0,0 +1,206 @@
+"""HotelStorage module"""
+import abc
+import contextlib
+import fcntl
+import os
+from datetime import date
+from UC3MTravel.HotelMetrics import HotelMetrics, NO_METRICS
+from UC3MTravel.OccupancyIndex import getStayDates
+
+# Environment variable that can be used to choose the directory where the json stores are kept
+STORAGE_ROOT_VARIABLE = "UC3M_TRAVEL_STORAGE_ROOT"
+# Stores kept by every storage backend
+STORES = ("reservations", "stays", "checkouts")
+
+
+def resolveStorageRoot(storage_root: str = None):
+    """Returns the absolute path of the directory in which the stores are kept. It is the given storage_root, or else
+    the directory of the UC3M_TRAVEL_STORAGE_ROOT environment variable, or else the UC3MTravel directory of the
+    project"""
+    if storage_root is None:
+        storage_root = os.environ.get(STORAGE_ROOT_VARIABLE)
+    if storage_root:
+        return os.path.abspath(storage_root)
+
+    # We need to obtain the common parent directory of all the files of our project, so that the function can be
+    # called in any file and still return the same result
+    # We also have to take into account that this is a collaborative project, so we cannot simply put a specific
+    # absolute path, but an absolute path relative to our particular computer. The place where the project directory
+    # lies
+
+    # Absolute path of the current directory
+    current_directory = os.getcwd()
+    # We get the index of the string in which the name of our project begins
+    index = current_directory.find("G87.2024.T3.GE2")
+    if index == -1:
+        # We are not running inside the project (for example, the package has been installed), so the stores are
+        # kept next to the modules of the package
+        return os.path.dirname(os.path.abspath(__file__))
+    # We obtain the parent directory that is common to all the project's files of our specific computer
+    project_directory = current_directory[:index]
+    # We navigate down the directory to reach the directory of the json stores
+    return os.path.join(project_directory, "G87.2024.T3.GE2", "src", "main", "python", "UC3MTravel")
+
+
+@contextlib.contextmanager
+def lockedFile(file_path: str, blocking: bool = True):
+    """Opens (creating it if needed) and locks file_path with flock while the block runs, so other processes using the
+    same storage root wait for it. If blocking is False and somebody else holds the lock, the block gets None instead
+    of the file descriptor"""
+    file_descriptor = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(file_descriptor, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield None
+            return
+        yield file_descriptor
+    finally:
+        # Closing the descriptor releases its lock
+        os.close(file_descriptor)
+
+
+class HotelStorage(abc.ABC):
+    """Base class of the storage backends used by HotelManager to keep reservations, processed stays and checkouts.
+    Every record is a dict with the same keys that are written in its json file. A backend must implement every
+    abstract method, or else it cannot be created"""
+    def __init__(self, storage_root: str = None):
+        # Directory that contains all the stores. It is resolved only once, and the path of every store directory is
+        # cached the first time it is used
+        self.__storage_root = resolveStorageRoot(storage_root)
+        self.__json_directories = {}
+        # Sink of the counters of the storage (files opened, bytes read...). By default instrumentation is disabled
+        self.__metrics = NO_METRICS
+
+    @property
+    def storage_root(self):
+        """Property representing the directory that contains all the stores"""
+        return self.__storage_root
+
+    @property
+    def metrics(self):
+        """Property representing the metrics sink of the storage"""
+        return self.__metrics
+
+    @metrics.setter
+    def metrics(self, value: HotelMetrics):
+        """Setter for the metrics sink"""
+        self.__metrics = value
+
+    def getJsonDirectory(self, folder_name: str):
+        """Returns the desired directory of the storage root, creating it if it does not exist yet"""
+        json_directory = self.__json_directories.get(folder_name)
+        if json_directory is None:
+            json_directory = os.path.join(self.__storage_root, folder_name)
+            os.makedirs(json_directory, exist_ok=True)
+            self.__json_directories[folder_name] = json_directory
+        return json_directory
+
+    @abc.abstractmethod
+    def isIdCardReserved(self, id_card: str):
+        """Returns True if there is a reservation stored for the given id_card"""
+
+    def findReservedIdCards(self, id_cards):
+        """Returns the set of the given id_cards that have a stored reservation"""
+        return {id_card for id_card in id_cards if self.isIdCardReserved(id_card)}
+
+    @abc.abstractmethod
+    def saveReservations(self, reservations: dict):
+        """Stores (or replaces) the given reservations, which are indexed by their id_card, updating the rooms booked
+        every night"""
+
+    def createReservations(self, reservations: dict):
+        """Stores the given reservations, which are indexed by their id_card, except the ones whose id_card already
+        has a reservation, and returns the set of those id_cards"""
+        existing_id_cards, _ = self.bookReservations(reservations)
+        return existing_id_cards
+
+    @abc.abstractmethod
+    def bookReservations(self, reservations: dict, room_capacity: dict = None):
+        """Stores the given reservations, which are indexed by their id_card, and counts the room booked by each one
+        every night of its stay in the same step, so 2 workers (or processes) can never store a reservation for the
+        same id_card, nor book more rooms than the hotel has. A reservation is not stored if its id_card already has
+        one, or if room_capacity ({room type: number of rooms}) is given and one of its nights has no free room of its
+        type. Returns the set of id_cards that already had a reservation and the set of id_cards without a free room.
+        If the write fails, only the reservations that were stored keep their rooms booked"""
+
+    @abc.abstractmethod
+    def countBookedRooms(self, room_type: str, arrival: date, num_days: int):
+        """Returns the highest number of rooms of room_type booked by the stored reservations any night of a stay of
+        num_days nights from arrival"""
+
+    @abc.abstractmethod
+    def loadReservation(self, id_card: str):
+        """Returns the stored reservation of the given id_card, or raises a HotelManagementException if it cannot be
+        read"""
+
+    @abc.abstractmethod
+    def claimIdempotencyKey(self, idempotency_key: str, claim: dict):
+        """Stores the claim of a client supplied idempotency key if nobody has claimed it yet and returns None, or
+        else returns the claim that was stored first"""
+
+    @abc.abstractmethod
+    def loadIdempotencyKey(self, idempotency_key: str):
+        """Returns the claim of an idempotency key, or None if nobody has claimed it"""
+
+    @abc.abstractmethod
+    def releaseIdempotencyKey(self, idempotency_key: str):
+        """Removes the claim of an idempotency key, so it can be used again"""
+
+    @abc.abstractmethod
+    def saveStays(self, stays: dict):
+        """Stores the given processed stays, which are indexed by their room_key"""
+
+    @abc.abstractmethod
+    def loadStay(self, room_key: str):
+        """Returns the stored processed stay of the given room_key, or raises a HotelManagementException if it does
+        not exist"""
+
+    def loadStays(self, room_keys):
+        """Returns a dict with, for each of the given room_keys, its stored processed stay or the exception raised
+        while loading it, so a room_key that cannot be loaded does not stop the rest"""
+        stays = {}
+        for room_key in room_keys:
+            try:
+                stays[room_key] = self.loadStay(room_key)
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                stays[room_key] = ex
+        return stays
+
+    def loadDepartures(self, first_departure: date, last_departure: date):
+        """Returns {room_key: stay} with the stored processed stays whose departure is between first_departure and
+        last_departure (both included). The backends keep the stays indexed by their departure date in the same write
+        that stores them, so every stay stored by any HotelManager or process is found. This default reads the whole
+        store"""
+        stays = {}
+        for room_key, stay in self.iterRecords("stays"):
+            stay_dates = getStayDates(stay) if isinstance(stay, dict) else None
+            if stay_dates is not None and first_departure <= stay_dates[2] <= last_departure:
+                stays[room_key] = stay
+        return stays
+
+    def loadCheckouts(self, room_keys):
+        """Returns the set of the given room_keys that have a stored checkout. This default reads the whole store"""
+        room_keys = set(room_keys)
+        return {room_key for room_key, _ in self.iterRecords("checkouts") if room_key in room_keys}
+
+    @abc.abstractmethod
+    def saveCheckout(self, room_key: str, checkout: dict):
+        """Stores the checkout of the given room_key"""
+
+    @abc.abstractmethod
+    def iterRecords(self, store: str):
+        """Yields the key and the record of every record of one of the STORES, without loading the whole store in
+        memory"""
+
+    def saveRecords(self, store: str, records: dict):
+        """Stores the given records of one of the STORES, which are indexed by their key"""
+        if store == "reservations":
+            self.saveReservations(records)
+        elif store == "stays":
+            self.saveStays(records)
+        elif store == "checkouts":
+            for room_key, checkout in records.items():
+                self.saveCheckout(room_key, checkout)
+        else:
+            raise ValueError("Unknown store " + store)
@@ -0,0 +1,267 @@
+"""JournalStorage module"""
+import json
+import os
+import threading
+from datetime import date
+from UC3MTravel.HotelJsonDecoder import loads
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStorage import HotelStorage
+from UC3MTravel.OccupancyIndex import getStayDates
+from UC3MTravel.RoomInventory import RoomInventory, getReservationNights
+
+# Events that can be written in the journal
+RESERVATION_EVENT = "reservation"
+STAY_EVENT = "stay"
+CHECKOUT_EVENT = "checkout"
+IDEMPOTENCY_EVENT = "idempotency"
+# Event of the lines of each store
+STORE_EVENTS = {"reservations": RESERVATION_EVENT, "stays": STAY_EVENT, "checkouts": CHECKOUT_EVENT}
+
+
+class JournalStorage(HotelStorage):
+    """Storage backend that appends every record as one compact json line to a single journal file. Each call that
+    stores records is a group commit: all its lines are written together and synced to disk once. The offset of the
+    last line of every id_card and room_key is kept in memory, and rebuilt from the journal when it is opened, and so
+    are the rooms booked every night by the reservations and the room_keys of the stays of every departure date"""
+    def __init__(self, storage_root: str = None, journal_name: str = "hotel_journal.jsonl", sync: bool = True):
+        super().__init__(storage_root)
+        os.makedirs(self.storage_root, exist_ok=True)
+        self.__journal_path = os.path.join(self.storage_root, journal_name)
+        # If sync is False the lines are left to the operating system instead of calling fsync after each commit
+        self.__sync = sync
+        # Offsets of the last line written for every key of every event
+        self.__offsets = {RESERVATION_EVENT: {}, STAY_EVENT: {}, CHECKOUT_EVENT: {}, IDEMPOTENCY_EVENT: {}}
+        # Rooms booked every night, and the nights booked by the last reservation of every id_card, so a reservation
+        # that is replaced frees its nights
+        self.__inventory = RoomInventory({})
+        self.__reservation_nights = {}
+        # {ordinal of the departure date: set of room_keys} of the stays, and the departure of every room_key
+        self.__departures = {}
+        self.__stay_departures = {}
+        self.__lock = threading.Lock()
+        # The journal is opened in binary mode so the offsets are byte positions
+        self.__journal = open(self.__journal_path, "a+b")  # pylint: disable=consider-using-with
+        try:
+            self.rebuildIndex()
+        except BaseException:
+            self.__journal.close()
+            raise
+
+    @property
+    def journal_path(self):
+        """Property representing the path of the journal file"""
+        return self.__journal_path
+
+    def close(self):
+        """Closes the journal file"""
+        with self.__lock:
+            self.__journal.close()
+
+    def rebuildIndex(self):
+        """Reads the whole journal to rebuild the offsets of every key. If the last line was not completely written
+        (for example, the process was killed in the middle of a commit), it is discarded. Any other line that cannot be
+        read raises a HotelManagementException and the journal is left untouched, so no committed line is ever lost"""
+        with self.__lock:
+            self.__journal.seek(0)
+            offset = 0
+            for line in self.__journal:
+                # Every line is written with its final new line, so only the last line can lack it, and only if its
+                # commit did not finish
+                if not line.endswith(b"\n"):
+                    self.__journal.truncate(offset)
+                    break
+                try:
+                    entry = loads(line)
+                    # A line without data removes the key (a released idempotency key)
+                    if entry["data"] is None:
+                        self.__offsets[entry["event"]].pop(entry["key"], None)
+                    else:
+                        self.__offsets[entry["event"]][entry["key"]] = offset
+                        self.trackRecord(entry["event"], entry["key"], entry["data"])
+                except (ValueError, KeyError, TypeError) as ex:
+                    raise HotelManagementException("Corrupt journal line at offset " + str(offset)) from ex
+                offset += len(line)
+
+    def isIdCardReserved(self, id_card: str):
+        """Returns True if there is a reservation in the journal for the given id_card"""
+        with self.__lock:
+            return id_card in self.__offsets[RESERVATION_EVENT]
+
+    def findReservedIdCards(self, id_cards):
+        """Returns the set of the given id_cards that have a reservation in the journal"""
+        with self.__lock:
+            return {id_card for id_card in id_cards if id_card in self.__offsets[RESERVATION_EVENT]}
+
+    def saveReservations(self, reservations: dict):
+        """Appends a line for each of the given reservations"""
+        self.appendEvents(RESERVATION_EVENT, reservations)
+
+    def bookReservations(self, reservations: dict, room_capacity: dict = None):
+        """Appends a line for each of the given reservations whose id_card does not have one yet, and which has a free
+        room every night if room_capacity is given. The journal is only shared by the threads of this process, so
+        holding the lock while checking and writing is enough"""
+        existing_id_cards = set()
+        unavailable_id_cards = set()
+        with self.__lock:
+            accepted = {}
+            try:
+                for id_card, reservation in reservations.items():
+                    if id_card in self.__offsets[RESERVATION_EVENT]:
+                        existing_id_cards.add(id_card)
+                        continue
+                    nights = getReservationNights(reservation)
+                    if room_capacity is not None and (nights is None or self.__inventory.mostBooked(*nights) >=
+                                                      room_capacity.get(nights[0], 0)):
+                        unavailable_id_cards.add(id_card)
+                        continue
+                    # The rooms are booked while the batch is checked, so the next reservations of the batch see them
+                    if nights is not None:
+                        self.__inventory.book(*nights)
+                    accepted[id_card] = reservation
+            finally:
+                # appendLines books them again once their lines are in the journal
+                for reservation in accepted.values():
+                    nights = getReservationNights(reservation)
+                    if nights is not None:
+                        self.__inventory.release(*nights)
+            self.appendLines(RESERVATION_EVENT, accepted)
+        return existing_id_cards, unavailable_id_cards
+
+    def countBookedRooms(self, room_type: str, arrival: date, num_days: int):
+        """Returns the highest number of rooms of room_type booked any night of the stay"""
+        with self.__lock:
+            return self.__inventory.mostBooked(room_type, arrival, num_days)
+
+    def trackRecord(self, event: str, key: str, data: dict):
+        """Updates the rooms booked every night with a reservation line, and the departures with a stay line. The lock
+        must be held by the caller"""
+        if event == RESERVATION_EVENT:
+            self.trackReservation(key, data)
+        elif event == STAY_EVENT:
+            self.trackStay(key, data)
+
+    def trackStay(self, room_key: str, stay: dict):
+        """Moves the room_key to the departure date of its last stay. The lock must be held by the caller"""
+        previous_departure = self.__stay_departures.pop(room_key, None)
+        if previous_departure is not None:
+            self.__departures[previous_departure].discard(room_key)
+        stay_dates = getStayDates(stay) if isinstance(stay, dict) else None
+        if stay_dates is not None:
+            departure = stay_dates[2].toordinal()
+            self.__departures.setdefault(departure, set()).add(room_key)
+            self.__stay_departures[room_key] = departure
+
+    def loadDepartures(self, first_departure: date, last_departure: date):
+        """Returns {room_key: stay} with the stays whose departure is between first_departure and last_departure,
+        reading only their lines"""
+        with self.__lock:
+            room_keys = [room_key for departure in range(first_departure.toordinal(), last_departure.toordinal() + 1)
+                         for room_key in self.__departures.get(departure, ())]
+        return {room_key: self.readEvent(STAY_EVENT, room_key) for room_key in room_keys}
+
+    def loadCheckouts(self, room_keys):
+        """Returns the set of the given room_keys that have a checkout line"""
+        with self.__lock:
+            return {room_key for room_key in room_keys if room_key in self.__offsets[CHECKOUT_EVENT]}
+
+    def trackReservation(self, id_card: str, reservation: dict):
+        """Books the nights of the last reservation of id_card, freeing the ones of the reservation it replaces. The
+        lock must be held by the caller"""
+        previous_nights = self.__reservation_nights.pop(id_card, None)
+        if previous_nights is not None:
+            self.__inventory.release(*previous_nights)
+        nights = getReservationNights(reservation)
+        if nights is not None:
+            self.__inventory.book(*nights)
+            self.__reservation_nights[id_card] = nights
+
+    def claimIdempotencyKey(self, idempotency_key: str, claim: dict):
+        """Appends a line with the claim of the idempotency key, unless the key already has a claim, which is returned
+        instead"""
+        with self.__lock:
+            offset = self.__offsets[IDEMPOTENCY_EVENT].get(idempotency_key)
+            if offset is None:
+                self.appendLines(IDEMPOTENCY_EVENT, {idempotency_key: claim})
+                return None
+            self.__journal.seek(offset)
+            line = self.__journal.readline()
+        return loads(line)["data"]
+
+    def loadIdempotencyKey(self, idempotency_key: str):
+        """Returns the last claim of the idempotency key, if it has one"""
+        return self.readEvent(IDEMPOTENCY_EVENT, idempotency_key)
+
+    def releaseIdempotencyKey(self, idempotency_key: str):
+        """Appends a line with an empty claim of the idempotency key, and forgets its offset"""
+        with self.__lock:
+            self.appendLines(IDEMPOTENCY_EVENT, {idempotency_key: None})
+            self.__offsets[IDEMPOTENCY_EVENT].pop(idempotency_key, None)
+
+    def loadReservation(self, id_card: str):
+        """Returns the last reservation of the given id_card"""
+        data = self.readEvent(RESERVATION_EVENT, id_card)
+        if data is None:
+            raise HotelManagementException("Wrong file or file path")
+        return data
+
+    def saveStays(self, stays: dict):
+        """Appends a line for each of the given processed stays"""
+        self.appendEvents(STAY_EVENT, stays)
+
+    def loadStay(self, room_key: str):
+        """Returns the last processed stay of the given room_key"""
+        data = self.readEvent(STAY_EVENT, room_key)
+        if data is None:
+            raise HotelManagementException("Room key not found in processed stays store.")
+        return data
+
+    def saveCheckout(self, room_key: str, checkout: dict):
+        """Appends a line for the checkout of the given room_key"""
+        self.appendEvents(CHECKOUT_EVENT, {room_key: checkout})
+
+    def saveRecords(self, store: str, records: dict):
+        """Appends a line for each of the given records of the store as a single commit"""
+        self.appendEvents(STORE_EVENTS[store], records)
+
+    def iterRecords(self, store: str):
+        """Yields the key and the last record of every key of the store, reading one line at a time"""
+        event = STORE_EVENTS[store]
+        with self.__lock:
+            keys = list(self.__offsets[event])
+        for key in keys:
+            yield key, self.readEvent(event, key)
+
+    def appendEvents(self, event: str, records: dict):
+        """Writes a line for every record as a single commit, and then updates the offsets"""
+        with self.__lock:
+            self.appendLines(event, records)
+
+    def appendLines(self, event: str, records: dict):
+        """Writes a line for every record as a single commit, and then updates the offsets. The lock must be held by
+        the caller"""
+        if not records:
+            return
+        lines = [json.dumps({"event": event, "key": key, "data": data}, separators=(",", ":")).encode() + b"\n"
+                 for key, data in records.items()]
+        self.__journal.seek(0, os.SEEK_END)
+        offset = self.__journal.tell()
+        self.__journal.write(b"".join(lines))
+        self.__journal.flush()
+        if self.__sync:
+            os.fsync(self.__journal.fileno())
+        # The offsets are only updated once the lines are in the journal
+        for key, line in zip(records, lines):
+            self.__offsets[event][key] = offset
+            offset += len(line)
+        for key, data in records.items():
+            self.trackRecord(event, key, data)
+
+    def readEvent(self, event: str, key: str):
+        """Returns the data of the last line written for the key, or None if there is none"""
+        with self.__lock:
+            offset = self.__offsets[event].get(key)
+            if offset is None:
+                return None
+            self.__journal.seek(offset)
+            line = self.__journal.readline()
+        return loads(line)["data"]
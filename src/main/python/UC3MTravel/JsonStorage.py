@@ -0,0 +1,498 @@
+"""JsonStorage module"""
+import contextlib
+import hashlib
+import json
+import os
+import threading
+from datetime import date, timedelta
+from UC3MTravel.HotelJsonDecoder import loads
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelMetrics import HotelMetrics, NO_METRICS
+from UC3MTravel.HotelStorage import HotelStorage, lockedFile
+from UC3MTravel.OccupancyIndex import getStayDates
+from UC3MTravel.RecordCache import RecordCache
+from UC3MTravel.RoomInventory import RoomInventory, getReservationNights
+
+# File of the storage root whose existence means that the stores use the sharded layout
+SHARDED_LAYOUT_MARKER = ".sharded_layout"
+# File of the storage root with the rooms booked every night by the reservations, and the file whose flock is held
+# while it is read or updated together with the reservation files
+BOOKED_NIGHTS_FILE = "booked_nights.json"
+BOOKED_NIGHTS_LOCK = "booked_nights.lock"
+# Folder of the storage root with a subfolder for every departure date (YYYY-MM-DD), which has an empty file named
+# after the room_key of every stay that leaves that day. The file whose existence means that the stays stored before
+# the folder existed have been added, and the file whose flock is held while they are added
+DEPARTURES_FOLDER = "departures_index"
+DEPARTURES_COMPLETE = ".complete"
+DEPARTURES_LOCK = "departures_index.lock"
+# Stores whose record files are sharded. The stays_store folder is not, as the front desk drops its files there
+SHARDED_FOLDERS = ("reservations_store", "processed_stays_store", "checkouts_store")
+# Folder of each store, and the suffix that follows the key in the name of its files
+STORE_FOLDERS = {"reservations": ("reservations_store", ".json"),
+                 "stays": ("processed_stays_store", ".json"),
+                 "checkouts": ("checkouts_store", "_checkout.json")}
+
+
+def readJsonFile(file_path: str, metrics: HotelMetrics = NO_METRICS):
+    """Opens a json file of one of the stores and returns its content"""
+    try:
+        with open(file_path, "r", encoding="utf-8") as open_file:
+            content = open_file.read()
+        metrics.count("storage", "files_opened")
+        metrics.count("storage", "bytes_read", len(content))
+        return loads(content)
+    except FileNotFoundError as ex:
+        raise HotelManagementException("Wrong file or file path") from ex
+    except json.JSONDecodeError as ex:
+        raise HotelManagementException("JSON Decode Error - Wrong JSON Format") from ex
+
+
+def getShardDirectories(file_name: str):
+    """Returns the 2 levels of subdirectories in which a record file is kept in the sharded layout: the first 2 and
+    the next 2 characters of its name (for example 12/34/12345678Z.json)"""
+    return file_name[0:2], file_name[2:4]
+
+
+def iterJsonFiles(directory: str):
+    """Yields the name and the path of every record json file of a store, in the flat layout (directly in the
+    directory) and in the sharded layout (in 2 levels of subdirectories named with 2 characters). The directory is
+    streamed, so it is never listed as a whole. Hidden files, such as temporary files, are skipped"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.name.endswith(".json") and entry.is_file():
+                yield entry.name, entry.path
+            elif len(entry.name) == 2 and entry.is_dir():
+                with os.scandir(entry.path) as shard_entries:
+                    for shard_entry in shard_entries:
+                        if len(shard_entry.name) == 2 and shard_entry.is_dir():
+                            with os.scandir(shard_entry.path) as file_entries:
+                                for file_entry in file_entries:
+                                    if not file_entry.name.startswith(".") and file_entry.name.endswith(".json"):
+                                        yield file_entry.name, file_entry.path
+
+
+class JsonStorage(HotelStorage):
+    """Storage backend that keeps every record in its own json file: reservations_store/<id_card>.json,
+    processed_stays_store/<room_key>.json and checkouts_store/<room_key>_checkout.json.
+    In the sharded layout, each file is kept 2 levels of subdirectories below (reservations_store/12/34/12345678Z.json),
+    so no directory gets millions of entries.
+    The rooms booked every night are kept in booked_nights.json, which is only read and written while holding the
+    flock of booked_nights.lock, also while the reservation files are created, so processes sharing the storage root
+    never book more rooms than the hotel has. It is rebuilt from the reservation files whenever it does not exist.
+    The stays are indexed by their departure date in departures_index, where an empty file is created for every stay
+    before its json file is written"""
+    def __init__(self, storage_root: str = None, reservation_cache_size: int = 1024, sharded: bool = None):
+        super().__init__(storage_root)
+        # The layout is chosen when the stores are created (or resharded), and is then detected from its marker
+        marker_path = os.path.join(self.storage_root, SHARDED_LAYOUT_MARKER)
+        if sharded is None:
+            sharded = os.path.isfile(marker_path)
+        elif sharded:
+            os.makedirs(self.storage_root, exist_ok=True)
+            with open(marker_path, "a", encoding="utf-8"):
+                pass
+        elif os.path.isfile(marker_path):
+            raise ValueError("The stores of " + self.storage_root + " use the sharded layout")
+        self.__sharded = sharded
+        # Shard directories that are known to exist, so they are only created once
+        self.__shard_directories = set()
+        # Most recently read reservations, so reading the same reservation again (retries of guestArrival, lookups of
+        # the front desk...) does not parse its file again while it has not changed. A size of 0 disables it
+        self.__reservation_cache = RecordCache(reservation_cache_size)
+        # Version of booked_nights.json and the rooms read from it, so it is only parsed again when another
+        # HotelManager or process has written it
+        self.__booked_nights = None
+        # Departure folders that are known to exist, so they are only created once
+        self.__departure_directories = set()
+
+    @property
+    def sharded(self):
+        """Property representing whether the stores use the sharded layout"""
+        return self.__sharded
+
+    @property
+    def reservation_cache(self):
+        """Property representing the cache of the most recently read reservations"""
+        return self.__reservation_cache
+
+    def isIdCardReserved(self, id_card: str):
+        """Returns True if there is a reservation stored in the reservations_store directory for the given id_card"""
+        # The reservation file is named after the id_card, so checking it only needs 1 stat instead of listing the whole
+        # directory. The file itself is checked every time (instead of an index kept in memory), so a reservation
+        # stored or removed by another HotelManager or process using the same storage root is always seen.
+        # The id_card must coincide exactly with the name of the file, so a file whose name only contains the id_card
+        # (for example "012345678Z.json") is not taken as a reservation of that client
+        return os.path.isfile(self.findRecordFile("reservations_store", id_card + ".json"))
+
+    def saveReservations(self, reservations: dict):
+        """Creates a json file named <id_card>.json in reservations_store for each of the given reservations, moving
+        the rooms booked by the reservations they replace to their own nights"""
+        if not reservations:
+            return
+        with self.lockBookedNights():
+            inventory = self.loadBookedNights()
+            try:
+                for id_card, reservation in reservations.items():
+                    previous_nights = self.loadReservationNights(id_card)
+                    if previous_nights is not None:
+                        inventory.release(*previous_nights)
+                    nights = getReservationNights(reservation)
+                    if nights is not None:
+                        inventory.book(*nights)
+                self.saveBookedNights(inventory)
+                # As there can only be 1 reservation per client, we use the value of the id_card to ensure the name of
+                # each generated file is unique
+                self.createJsonFiles({id_card + ".json": reservation for id_card, reservation in reservations.items()},
+                                     "reservations_store")
+            except BaseException:
+                self.dropBookedNights()
+                raise
+            finally:
+                # The old versions of the new reservations are no longer valid
+                for id_card in reservations:
+                    self.__reservation_cache.discard(id_card)
+
+    def loadReservationNights(self, id_card: str):
+        """Returns the nights booked by the stored reservation of id_card, or None if it has none or it cannot be
+        read"""
+        file_path = self.findRecordFile("reservations_store", id_card + ".json")
+        if not os.path.isfile(file_path):
+            return None
+        try:
+            return getReservationNights(readJsonFile(file_path, self.metrics))
+        except HotelManagementException:
+            return None
+
+    def bookReservations(self, reservations: dict, room_capacity: dict = None):
+        """Creates the json file of each of the given reservations only if its id_card does not have one yet, and it
+        has a free room every night if room_capacity is given. Each file is created with an exclusive link, which the
+        operating system makes atomic, and the rooms are checked and counted in booked_nights.json while holding its
+        lock, so several processes can store reservations in the same reservations_store.
+        Without room_capacity the rooms are not counted: booked_nights.json is removed instead, and counted again from
+        the reservation files the next time they are needed, so the reservations of a hotel whose capacity is not
+        checked do not read and write it every time"""
+        existing_id_cards = set()
+        unavailable_id_cards = set()
+        if not reservations:
+            return existing_id_cards, unavailable_id_cards
+        with self.lockBookedNights():
+            inventory = None
+            if room_capacity is None:
+                self.dropBookedNights()
+            else:
+                inventory = self.loadBookedNights()
+            accepted = {}
+            for id_card, reservation in reservations.items():
+                # While a flat store is being resharded, the reservation could still be in the flat directory
+                if os.path.isfile(self.findRecordFile("reservations_store", id_card + ".json")):
+                    existing_id_cards.add(id_card)
+                    continue
+                if inventory is not None:
+                    nights = getReservationNights(reservation)
+                    if nights is None or inventory.mostBooked(*nights) >= room_capacity.get(nights[0], 0):
+                        unavailable_id_cards.add(id_card)
+                        continue
+                    inventory.book(*nights)
+                accepted[id_card] = reservation
+            # The rooms are counted before the files are created, so if the process stops in between they are counted
+            # in excess, but never sold twice
+            if inventory is not None:
+                self.saveBookedNights(inventory)
+            existing_id_cards.update(self.createReservationFiles(accepted, inventory))
+        return existing_id_cards, unavailable_id_cards
+
+    def createReservationFiles(self, reservations: dict, inventory: RoomInventory = None):
+        """Creates the json files of the given reservations, whose rooms are already counted in inventory (if it is
+        given), and returns the set of id_cards whose file already existed. The rooms of the reservations whose file
+        was not created (also when a write fails) are freed again. The lock of booked_nights.json must be held by the
+        caller"""
+        existing_id_cards = set()
+        created = []
+        try:
+            for id_card, reservation in reservations.items():
+                if self.writeJsonFile(self.getRecordFilePath("reservations_store", id_card + ".json"), reservation,
+                                      exclusive=True):
+                    created.append(id_card)
+                else:
+                    existing_id_cards.add(id_card)
+        finally:
+            for id_card in created:
+                self.__reservation_cache.discard(id_card)
+            if inventory is not None and len(created) < len(reservations):
+                stored = set(created)
+                for id_card, reservation in reservations.items():
+                    nights = getReservationNights(reservation)
+                    if id_card not in stored and nights is not None:
+                        inventory.release(*nights)
+                self.saveBookedNights(inventory)
+        return existing_id_cards
+
+    def countBookedRooms(self, room_type: str, arrival: date, num_days: int):
+        """Returns the highest number of rooms of room_type booked any night of the stay, from booked_nights.json"""
+        with self.lockBookedNights():
+            return self.loadBookedNights().mostBooked(room_type, arrival, num_days)
+
+    @contextlib.contextmanager
+    def lockBookedNights(self):
+        """Holds the flock of booked_nights.json while the block runs. If the block fails, the rooms kept in memory are
+        read again from the file the next time"""
+        os.makedirs(self.storage_root, exist_ok=True)
+        with lockedFile(os.path.join(self.storage_root, BOOKED_NIGHTS_LOCK)):
+            try:
+                yield
+            except BaseException:
+                self.__booked_nights = None
+                raise
+
+    def loadBookedNights(self):
+        """Returns the RoomInventory of the rooms booked every night. It is read from booked_nights.json only if the
+        file has changed since it was last read or written, and rebuilt from the reservation files if it does not exist
+        (a store of an older version). The lock of booked_nights.json must be held by the caller"""
+        file_path = os.path.join(self.storage_root, BOOKED_NIGHTS_FILE)
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            inventory = RoomInventory({})
+            for _, reservation in self.iterRecords("reservations"):
+                nights = getReservationNights(reservation) if isinstance(reservation, dict) else None
+                if nights is not None:
+                    inventory.book(*nights)
+            self.saveBookedNights(inventory)
+            return inventory
+        version = (file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+        if self.__booked_nights is None or self.__booked_nights[0] != version:
+            self.__booked_nights = (version, RoomInventory({}, readJsonFile(file_path, self.metrics)))
+        return self.__booked_nights[1]
+
+    def dropBookedNights(self):
+        """Removes booked_nights.json, so the rooms are counted again from the reservation files the next time they
+        are needed. The lock of booked_nights.json must be held by the caller"""
+        self.__booked_nights = None
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(self.storage_root, BOOKED_NIGHTS_FILE))
+
+    def saveBookedNights(self, inventory: RoomInventory):
+        """Replaces booked_nights.json with the rooms of inventory. The lock of booked_nights.json must be held by the
+        caller"""
+        file_path = os.path.join(self.storage_root, BOOKED_NIGHTS_FILE)
+        self.writeJsonFile(file_path, inventory.booked)
+        file_stat = os.stat(file_path)
+        self.__booked_nights = ((file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size), inventory)
+
+    def claimIdempotencyKey(self, idempotency_key: str, claim: dict):
+        """Creates the json file of the claim of the idempotency key in idempotency_store, unless it already exists.
+        The file is created with an exclusive link, so only 1 process can claim a key"""
+        file_path = self.getIdempotencyFilePath(idempotency_key)
+        if self.writeJsonFile(file_path, claim, exclusive=True):
+            return None
+        return readJsonFile(file_path, self.metrics)
+
+    def loadIdempotencyKey(self, idempotency_key: str):
+        """Reads the json file of the claim of the idempotency key, if it exists"""
+        try:
+            return readJsonFile(self.getIdempotencyFilePath(idempotency_key), self.metrics)
+        except HotelManagementException:
+            return None
+
+    def releaseIdempotencyKey(self, idempotency_key: str):
+        """Removes the json file of the claim of the idempotency key"""
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.getIdempotencyFilePath(idempotency_key))
+
+    def getIdempotencyFilePath(self, idempotency_key: str):
+        """Returns the path of the json file of the claim of an idempotency key. The keys are chosen by the clients, so
+        the file is named after their SHA-256 hash instead of the key itself"""
+        file_name = hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest() + ".json"
+        return os.path.join(self.getJsonDirectory("idempotency_store"), file_name)
+
+    def loadReservation(self, id_card: str):
+        """Reads the json file of the reservation of the given id_card, or returns it from the cache if the file has
+        not changed since it was read"""
+        file_path = self.findRecordFile("reservations_store", id_card + ".json")
+        if self.__reservation_cache.max_size <= 0:
+            return readJsonFile(file_path, self.metrics)
+
+        # The file is identified by its inode, its modification time and its size, so a reservation written by
+        # another process (which always replaces the file) is read again
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError as ex:
+            self.__reservation_cache.discard(id_card)
+            raise HotelManagementException("Wrong file or file path") from ex
+        version = (file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+        reservation = self.__reservation_cache.getRecord(id_card, version)
+        if reservation is None:
+            self.metrics.count("storage", "reservation_cache_misses")
+            reservation = readJsonFile(file_path, self.metrics)
+            if not isinstance(reservation, dict):
+                return reservation
+            self.__reservation_cache.putRecord(id_card, version, reservation)
+        else:
+            self.metrics.count("storage", "reservation_cache_hits")
+        # The caller gets its own copy, so it cannot change the cached reservation
+        return dict(reservation)
+
+    def saveStays(self, stays: dict):
+        """Creates a json file named <room_key>.json in processed_stays_store for each of the given stays, after
+        adding it to the folder of its departure date"""
+        for room_key, stay in stays.items():
+            self.indexDeparture(room_key, stay)
+        self.createJsonFiles({room_key + ".json": stay for room_key, stay in stays.items()}, "processed_stays_store")
+
+    def indexDeparture(self, room_key: str, stay: dict):
+        """Creates the empty file of the room_key in the folder of the departure date of the stay. A stay whose dates
+        cannot be read is not indexed"""
+        stay_dates = getStayDates(stay) if isinstance(stay, dict) else None
+        if stay_dates is None:
+            return
+        departure_directory = os.path.join(self.getJsonDirectory(DEPARTURES_FOLDER), stay_dates[2].isoformat())
+        if departure_directory not in self.__departure_directories:
+            os.makedirs(departure_directory, exist_ok=True)
+            self.__departure_directories.add(departure_directory)
+        os.close(os.open(os.path.join(departure_directory, room_key), os.O_WRONLY | os.O_CREAT, 0o644))
+
+    def loadDepartures(self, first_departure: date, last_departure: date):
+        """Returns {room_key: stay} with the processed stays whose departure is between first_departure and
+        last_departure, listing only the folders of those days. The file of a stay is created before its json file,
+        so a file whose stay does not exist (its write failed) or leaves another day (it was replaced) is skipped"""
+        departures_directory = self.getJsonDirectory(DEPARTURES_FOLDER)
+        if not os.path.isfile(os.path.join(departures_directory, DEPARTURES_COMPLETE)):
+            self.indexStoredDepartures()
+        stays = {}
+        day = first_departure
+        while day <= last_departure:
+            departure_directory = os.path.join(departures_directory, day.isoformat())
+            room_keys = os.listdir(departure_directory) if os.path.isdir(departure_directory) else []
+            for room_key in room_keys:
+                try:
+                    stay = readJsonFile(self.getRoomKeyFilePath(room_key), self.metrics)
+                except HotelManagementException:
+                    continue
+                stay_dates = getStayDates(stay) if isinstance(stay, dict) else None
+                if stay_dates is not None and stay_dates[2] == day:
+                    stays[room_key] = stay
+            day += timedelta(days=1)
+        return stays
+
+    def indexStoredDepartures(self):
+        """Adds every stored stay to departures_index, for the stores of older versions, and then creates its
+        .complete file. The stays stored meanwhile by other processes are added by themselves"""
+        departures_directory = self.getJsonDirectory(DEPARTURES_FOLDER)
+        with lockedFile(os.path.join(self.storage_root, DEPARTURES_LOCK)):
+            complete_path = os.path.join(departures_directory, DEPARTURES_COMPLETE)
+            if os.path.isfile(complete_path):
+                return
+            for room_key, stay in self.iterRecords("stays"):
+                self.indexDeparture(room_key, stay)
+            os.close(os.open(complete_path, os.O_WRONLY | os.O_CREAT, 0o644))
+
+    def loadCheckouts(self, room_keys):
+        """Returns the set of the given room_keys that have a checkout file, checking each one with a stat"""
+        return {room_key for room_key in room_keys
+                if os.path.isfile(self.findRecordFile("checkouts_store", f"{room_key}_checkout.json"))}
+
+    def loadStay(self, room_key: str):
+        """Reads the json file of the processed stay of the given room_key"""
+        file_path = self.getRoomKeyFilePath(room_key)
+        if not os.path.exists(file_path):
+            raise HotelManagementException("Room key not found in processed stays store.")
+        with open(file_path, "r", encoding="utf-8") as file:
+            content = file.read()
+        self.metrics.count("storage", "files_opened")
+        self.metrics.count("storage", "bytes_read", len(content))
+        return loads(content)
+
+    def getRoomKeyFilePath(self, room_key: str):
+        """Retrieve the file path for the room key"""
+        # The room_key is directly used to name the stay file
+        return self.findRecordFile("processed_stays_store", f"{room_key}.json")
+
+    def saveCheckout(self, room_key: str, checkout: dict):
+        """Creates a json file named <room_key>_checkout.json in checkouts_store"""
+        self.createJsonFiles({f"{room_key}_checkout.json": checkout}, "checkouts_store")  # Naming for checkout files
+
+    def saveRecords(self, store: str, records: dict):
+        """Stores the given records of the store, creating all the checkout files in a single pass"""
+        if store == "checkouts":
+            self.createJsonFiles({f"{room_key}_checkout.json": checkout for room_key, checkout in records.items()},
+                                 "checkouts_store")
+        else:
+            super().saveRecords(store, records)
+
+    def iterRecords(self, store: str):
+        """Yields the key and the record of every json file of the folder of the store, reading one file at a time"""
+        folder_name, suffix = STORE_FOLDERS[store]
+        for file_name, file_path in iterJsonFiles(self.getJsonDirectory(folder_name)):
+            if file_name.endswith(suffix):
+                yield file_name[:-len(suffix)], readJsonFile(file_path, self.metrics)
+
+    def getRecordFilePath(self, folder_name: str, file_name: str):
+        """Returns the path in which a record file of the given store is written, creating its shard directories if
+        they do not exist yet"""
+        json_directory = self.getJsonDirectory(folder_name)
+        if not self.__sharded or folder_name not in SHARDED_FOLDERS:
+            return os.path.join(json_directory, file_name)
+        shard_directory = os.path.join(json_directory, *getShardDirectories(file_name))
+        if shard_directory not in self.__shard_directories:
+            os.makedirs(shard_directory, exist_ok=True)
+            self.__shard_directories.add(shard_directory)
+        return os.path.join(shard_directory, file_name)
+
+    def findRecordFile(self, folder_name: str, file_name: str):
+        """Returns the path from which a record file of the given store is read. While a flat store is being
+        resharded, a file that has not been moved yet is still read from the flat directory"""
+        json_directory = self.getJsonDirectory(folder_name)
+        flat_path = os.path.join(json_directory, file_name)
+        if not self.__sharded or folder_name not in SHARDED_FOLDERS:
+            return flat_path
+        file_path = os.path.join(json_directory, *getShardDirectories(file_name), file_name)
+        if not os.path.exists(file_path) and os.path.exists(flat_path):
+            return flat_path
+        return file_path
+
+    def createJsonFiles(self, json_files: dict, folder_name: str):
+        """Creates in the folder folder_name a json file for each file name of json_files, and writes on it its
+        associated data"""
+        if not json_files:
+            return
+
+        # Each file is written using its absolute path (in the directory of the store, or in its shard directory), so
+        # the current directory of the process (which is shared by all its threads) is never changed
+        for file_name, json_data in json_files.items():
+            self.writeJsonFile(self.getRecordFilePath(folder_name, file_name), json_data)
+
+    def writeJsonFile(self, file_path: str, json_data: dict, exclusive: bool = False):
+        """Writes json_data in the json file file_path. The data is first written in a temporary file of the same
+        directory that then replaces file_path, so nobody can read a half written file.
+        If exclusive is True, an existing file_path is never replaced, and False is returned instead of True"""
+        # The name of the temporary file is unique for every process and thread writing at the same time
+        directory, file_name = os.path.split(file_path)
+        temp_file_path = os.path.join(directory,
+                                      f".{file_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_file_path, "w", encoding="utf-8") as open_file:
+                json.dump(json_data, open_file, indent=4)
+                if self.metrics.enabled:
+                    self.metrics.count("storage", "files_written")
+                    self.metrics.count("storage", "bytes_written", open_file.tell())
+            if not exclusive:
+                # Replacing a file is an atomic operation, the file will either have the old content or the new one
+                os.replace(temp_file_path, file_path)
+                return True
+            # A hard link fails if file_path already exists, and creating it is also atomic, so when several processes
+            # create the same file only one of them succeeds (like opening it with O_EXCL, but without anybody being
+            # able to read it before it is completely written)
+            try:
+                os.link(temp_file_path, file_path)
+            except FileExistsError:
+                return False
+            finally:
+                os.remove(temp_file_path)
+            return True
+        except BaseException:
+            # If anything fails, the temporary file must not be left behind
+            with contextlib.suppress(OSError):
+                os.remove(temp_file_path)
+            raise
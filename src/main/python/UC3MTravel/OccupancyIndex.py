@@ -0,0 +1,91 @@
+"""OccupancyIndex module"""
+import threading
+from datetime import date, datetime, timedelta
+from UC3MTravel.DateCodec import parseDateTime
+
+# A stay lasts 10 days at most (num_days is between 1 and 10), so a guest in the hotel on a given day leaves in the
+# next 10 days
+MAX_STAY_DAYS = 10
+
+
+def getStayDate(timestamp):
+    """Returns the date of the arrival or the departure of a processed stay. guestArrival stores them as timestamps,
+    but they can also be "DD/MM/YYYY HH:MM:SS" strings. Raises ValueError, TypeError, OverflowError or OSError if it
+    is not valid"""
+    if isinstance(timestamp, str):
+        return parseDateTime(timestamp).date()
+    # The timestamp was computed from the current UTC date, so it is converted back in the same way
+    return datetime.fromtimestamp(timestamp).date()
+
+
+def getStayDates(stay: dict):
+    """Returns the room type, the arrival date and the departure date of a processed stay (the data of its json file),
+    or None if they cannot be read"""
+    try:
+        return stay["type"], getStayDate(stay["arrival"]), getStayDate(stay["departure"])
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+class OccupancyIndex:
+    """In memory index of processed stays, grouped by departure date and room type, and of the stays that have
+    already checked out. HotelManager fills it with the stays that the storage finds by their departure date, so it
+    lists the departures of a day and counts the occupied rooms of a day in a time that depends on the number of stays
+    of those days, not on the size of the stores"""
+    def __init__(self):
+        # {departure date: {room type: {room_key: stay}}}, where every stay is a dict with its room_key, idCard,
+        # type, arrival date, departure date and whether it has checked out
+        self.__departures = {}
+        # {room_key: stay}, to find the stay of a checkout
+        self.__stays = {}
+        self.__lock = threading.Lock()
+
+    def addStay(self, room_key: str, id_card: str, room_type: str, arrival: date, departure: date):
+        """Adds (or replaces) a processed stay"""
+        with self.__lock:
+            previous_stay = self.__stays.get(room_key)
+            checked_out = False
+            if previous_stay is not None:
+                checked_out = previous_stay["checked_out"]
+                self.__departures[previous_stay["departure"]][previous_stay["type"]].pop(room_key, None)
+            stay = {"room_key": room_key, "idCard": id_card, "type": room_type, "arrival": arrival,
+                    "departure": departure, "checked_out": checked_out}
+            self.__stays[room_key] = stay
+            self.__departures.setdefault(departure, {}).setdefault(room_type, {})[room_key] = stay
+
+    def addCheckout(self, room_key: str):
+        """Marks the stay of room_key as checked out. Returns False if the stay is not in the index"""
+        with self.__lock:
+            stay = self.__stays.get(room_key)
+            if stay is None:
+                return False
+            stay["checked_out"] = True
+            return True
+
+    def departures(self, day: date, room_type: str = None):
+        """Returns a copy of the stays whose departure is on the given day (only of room_type, if it is given), ordered
+        by their room_key"""
+        with self.__lock:
+            room_types = self.__departures.get(day, {})
+            if room_type is not None:
+                stays = list(room_types.get(room_type, {}).values())
+            else:
+                stays = [stay for room_type_stays in room_types.values() for stay in room_type_stays.values()]
+            stays = [dict(stay) for stay in stays]
+        return sorted(stays, key=lambda stay: stay["room_key"])
+
+    def occupancy(self, day: date):
+        """Returns the number of rooms of each type occupied on the given day: the stays that arrived that day or
+        before, leave after that day and have not checked out"""
+        occupied = {}
+        with self.__lock:
+            for days in range(1, MAX_STAY_DAYS + 1):
+                for room_type, stays in self.__departures.get(day + timedelta(days=days), {}).items():
+                    for stay in stays.values():
+                        if stay["arrival"] <= day and not stay["checked_out"]:
+                            occupied[room_type] = occupied.get(room_type, 0) + 1
+        return occupied
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__stays)
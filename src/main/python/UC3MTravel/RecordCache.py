@@ -0,0 +1,72 @@
+"""RecordCache module"""
+import threading
+from collections import OrderedDict
+
+
+class RecordCache:
+    """Bounded cache of decoded records that discards the least recently used one when it is full. Every record is
+    kept with the version of the file it was read from (for example its modification time), so a record is only
+    returned while its file has not changed"""
+    def __init__(self, max_size: int):
+        self.__max_size = max_size
+        # Records ordered from the least to the most recently used: {key: (version, record)}
+        self.__records = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+
+    @property
+    def max_size(self):
+        """Property representing the maximum number of records kept"""
+        return self.__max_size
+
+    def getRecord(self, key, version):
+        """Returns the record of key if it was read from the given version of its file, or None"""
+        with self.__lock:
+            entry = self.__records.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+            if entry[0] != version:
+                # The file has changed since the record was read
+                del self.__records[key]
+                self.__invalidations += 1
+                self.__misses += 1
+                return None
+            self.__records.move_to_end(key)
+            self.__hits += 1
+            return entry[1]
+
+    def putRecord(self, key, version, record):
+        """Keeps the record of key, read from the given version of its file"""
+        if self.__max_size <= 0:
+            return
+        with self.__lock:
+            self.__records[key] = (version, record)
+            self.__records.move_to_end(key)
+            if len(self.__records) > self.__max_size:
+                self.__records.popitem(last=False)
+                self.__evictions += 1
+
+    def discard(self, key):
+        """Forgets the record of key, because its file has been written"""
+        with self.__lock:
+            if self.__records.pop(key, None) is not None:
+                self.__invalidations += 1
+
+    def clear(self):
+        """Forgets every record"""
+        with self.__lock:
+            self.__records.clear()
+
+    def stats(self):
+        """Returns the number of records kept, and of hits, misses, evictions and invalidations so far"""
+        with self.__lock:
+            return {"size": len(self.__records),
+                    "max_size": self.__max_size,
+                    "hits": self.__hits,
+                    "misses": self.__misses,
+                    "evictions": self.__evictions,
+                    "invalidations": self.__invalidations}
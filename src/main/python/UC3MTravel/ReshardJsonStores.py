@@ -0,0 +1,72 @@
+"""ReshardJsonStores module
+
+Moves the record files of the flat json stores of a storage root to the sharded layout of JsonStorage, in place.
+The files are moved one by one while the directories are streamed, so the memory used does not depend on the size of
+the stores. Moving a file is atomic, so the migration can be stopped at any moment and resumed by running it again.
+
+Usage:
+    python -m UC3MTravel.ReshardJsonStores [--storage-root DIRECTORY] [--report-every N]
+"""
+import argparse
+import os
+import sys
+import time
+from UC3MTravel.HotelStorage import resolveStorageRoot
+from UC3MTravel.JsonStorage import JsonStorage, SHARDED_FOLDERS, getShardDirectories
+
+
+def reshardStore(json_directory: str, report=None, report_every: int = 10000):
+    """Moves every record file of the flat directory json_directory to its shard directory. Returns the number of
+    files moved. report is called with the number of files moved so far every report_every files"""
+    moved = 0
+    # Moving files while the directory is scanned can make the scan skip some of them, so the directory is scanned
+    # again until there is nothing left to move
+    moved_in_scan = True
+    while moved_in_scan:
+        moved_in_scan = False
+        with os.scandir(json_directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                shard_directory = os.path.join(json_directory, *getShardDirectories(entry.name))
+                os.makedirs(shard_directory, exist_ok=True)
+                file_path = os.path.join(shard_directory, entry.name)
+                if os.path.exists(file_path):
+                    # The record has already been written again in the sharded layout, so the flat file is older
+                    os.remove(entry.path)
+                else:
+                    os.replace(entry.path, file_path)
+                moved += 1
+                moved_in_scan = True
+                if report is not None and moved % report_every == 0:
+                    report(moved)
+    return moved
+
+
+def reshardStores(storage_root: str = None, report=None, report_every: int = 10000):
+    """Moves every store of the storage root to the sharded layout. Returns the number of files moved of each store"""
+    # The stores are marked as sharded before moving anything, so a JsonStorage opened during the migration already
+    # writes in the sharded layout, and reads the files that have not been moved yet from the flat directory
+    storage = JsonStorage(resolveStorageRoot(storage_root), sharded=True)
+    return {folder_name: reshardStore(storage.getJsonDirectory(folder_name), report, report_every)
+            for folder_name in SHARDED_FOLDERS}
+
+
+def main(argv=None):
+    """Reshards the stores of the storage root given in the command line, reporting its progress"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage-root", help="directory of the stores (the default storage root by default)")
+    parser.add_argument("--report-every", type=int, default=10000, help="files moved between progress reports")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def report(moved: int):
+        print(f"{moved} files moved ({moved / (time.perf_counter() - start):.0f} files/s)", file=sys.stderr)
+
+    for folder_name, moved in reshardStores(args.storage_root, report, args.report_every).items():
+        print(f"{folder_name}: {moved} files moved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""RoomInventory module"""
+import threading
+from datetime import date
+from UC3MTravel.DateCodec import parseDate
+from UC3MTravel.HotelManagementException import HotelManagementException
+
+
+def getReservationNights(reservation: dict):
+    """Returns the room type, the arrival date and the number of nights booked by a stored reservation (the data of
+    its json file), or None if they cannot be read"""
+    try:
+        num_days = reservation["num_days"]
+        if not isinstance(num_days, int) or isinstance(num_days, bool) or num_days < 1:
+            return None
+        return reservation["room_type"], parseDate(reservation["arrival_date"]), num_days
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RoomInventory:
+    """Number of rooms of each room type and number of them booked every night. A reservation of num_days nights
+    from its arrival date books one room of its type every one of those nights, so checking or updating the
+    availability of a reservation takes num_days steps, whatever the number of reservations"""
+    def __init__(self, capacity: dict, booked: dict = None):
+        # {room type: number of rooms}
+        self.__capacity = dict(capacity)
+        # {room type: {ordinal of the night: rooms booked}}. Only the nights with bookings are kept
+        self.__booked = {room_type: {} for room_type in self.__capacity}
+        for room_type, nights in (booked or {}).items():
+            self.__booked[room_type] = {int(night): rooms for night, rooms in nights.items()}
+            self.__capacity.setdefault(room_type, 0)
+        # Checking and booking the nights of a reservation must be done as a single step
+        self.__lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        """Property representing the number of rooms of each room type"""
+        return dict(self.__capacity)
+
+    @property
+    def booked(self):
+        """Property representing the rooms booked every night of each room type, {room type: {ordinal: rooms}}"""
+        with self.__lock:
+            return {room_type: dict(nights) for room_type, nights in self.__booked.items() if nights}
+
+    def mostBooked(self, room_type: str, arrival: date, num_days: int):
+        """Returns the highest number of rooms of room_type booked any night of a stay of num_days nights from
+        arrival"""
+        first_night = arrival.toordinal()
+        with self.__lock:
+            booked = self.__booked.get(room_type, {})
+            return max(booked.get(night, 0) for night in range(first_night, first_night + num_days))
+
+    def available(self, room_type: str, arrival: date, num_days: int):
+        """Returns the number of rooms of room_type that are free every night of a stay of num_days nights from
+        arrival"""
+        with self.__lock:
+            return self.countAvailable(room_type, arrival.toordinal(), num_days)
+
+    def countAvailable(self, room_type: str, first_night: int, num_days: int):
+        """Returns the rooms of room_type free every night from first_night. The lock must be held by the caller"""
+        booked = self.__booked.get(room_type)
+        if booked is None:
+            return 0
+        most_booked = max(booked.get(night, 0) for night in range(first_night, first_night + num_days))
+        return max(0, self.__capacity[room_type] - most_booked)
+
+    def reserve(self, room_type: str, arrival: date, num_days: int):
+        """Books a room of room_type every night of the stay, or raises a HotelManagementException if a night has
+        no free rooms"""
+        first_night = arrival.toordinal()
+        with self.__lock:
+            if self.countAvailable(room_type, first_night, num_days) == 0:
+                raise HotelManagementException("room_type is not available for the given dates")
+            self.addNights(room_type, first_night, num_days, 1)
+
+    def book(self, room_type: str, arrival: date, num_days: int):
+        """Books a room of room_type every night of the stay without checking the capacity, for the reservations that
+        already exist"""
+        with self.__lock:
+            self.__booked.setdefault(room_type, {})
+            self.__capacity.setdefault(room_type, 0)
+            self.addNights(room_type, arrival.toordinal(), num_days, 1)
+
+    def release(self, room_type: str, arrival: date, num_days: int):
+        """Frees the room booked by a stay, for example when it could not be stored"""
+        with self.__lock:
+            self.addNights(room_type, arrival.toordinal(), num_days, -1)
+
+    def addNights(self, room_type: str, first_night: int, num_days: int, rooms: int):
+        """Adds rooms to the booked rooms of room_type every night of the stay. The lock must be held by the
+        caller"""
+        booked = self.__booked.setdefault(room_type, {})
+        for night in range(first_night, first_night + num_days):
+            count = booked.get(night, 0) + rooms
+            if count > 0:
+                booked[night] = count
+            else:
+                booked.pop(night, None)
@@ -0,0 +1,317 @@
+"""SqliteStorage module"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import date
+from UC3MTravel.HotelJsonDecoder import loads
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStorage import HotelStorage
+from UC3MTravel.OccupancyIndex import getStayDates
+from UC3MTravel.RoomInventory import getReservationNights
+
+
+# Table of each store and the column of its key
+STORE_TABLES = {"reservations": ("reservations", "id_card"),
+                "stays": ("stays", "room_key"),
+                "checkouts": ("checkouts", "room_key")}
+# Rows read at a time when a whole table is iterated
+PAGE_SIZE = 1000
+# Keys looked up by a single query, below the limit of parameters of a SQLite statement
+LOOKUP_SIZE = 500
+
+
+class SqliteStorage(HotelStorage):
+    """Storage backend that keeps all the records in an embedded SQLite database of the storage root. The id_card,
+    localizer and room_key of the records are indexed columns, so every lookup is a single indexed query. The rooms
+    booked every night are kept in the booked_nights table, which is updated in the same transaction as the
+    reservations, and the departure date and room type of every stay are indexed columns of its row"""
+    def __init__(self, storage_root: str = None, database_name: str = "hotel_store.db"):
+        super().__init__(storage_root)
+        os.makedirs(self.storage_root, exist_ok=True)
+        self.__database_path = os.path.join(self.storage_root, database_name)
+        # The connection is shared by all the threads of the HotelManager, so every use of it is protected by a lock
+        self.__connection = sqlite3.connect(self.__database_path, check_same_thread=False)
+        self.__lock = threading.Lock()
+        with self.__lock, self.__connection:
+            self.__connection.executescript("""
+                CREATE TABLE IF NOT EXISTS reservations (
+                    id_card TEXT PRIMARY KEY,
+                    localizer TEXT NOT NULL,
+                    data TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS reservations_localizer ON reservations (localizer);
+                CREATE TABLE IF NOT EXISTS stays (
+                    room_key TEXT PRIMARY KEY,
+                    id_card TEXT NOT NULL,
+                    localizer TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    room_type TEXT,
+                    arrival_date INTEGER,
+                    departure_date INTEGER);
+                CREATE INDEX IF NOT EXISTS stays_id_card ON stays (id_card);
+                CREATE INDEX IF NOT EXISTS stays_localizer ON stays (localizer);
+                CREATE TABLE IF NOT EXISTS checkouts (
+                    room_key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    idempotency_key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL);
+                """)
+            # A database of an older version already has reservations, so when booked_nights is created their rooms
+            # are counted in the same transaction (which another process cannot run at the same time)
+            self.__connection.execute("BEGIN IMMEDIATE")
+            if self.__connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                         "AND name = 'booked_nights'").fetchone() is None:
+                self.__connection.execute("""
+                    CREATE TABLE booked_nights (
+                        room_type TEXT NOT NULL,
+                        night INTEGER NOT NULL,
+                        rooms INTEGER NOT NULL,
+                        PRIMARY KEY (room_type, night))""")
+                for (data,) in self.__connection.execute("SELECT data FROM reservations").fetchall():
+                    self.addBookedNights(loads(data), 1)
+            # The stays of an older version have no dates, so they are filled in when the columns are added
+            stay_columns = [row[1] for row in self.__connection.execute("PRAGMA table_info(stays)").fetchall()]
+            if "departure_date" not in stay_columns:
+                for column in ["room_type TEXT", "arrival_date INTEGER", "departure_date INTEGER"]:
+                    self.__connection.execute("ALTER TABLE stays ADD COLUMN " + column)
+                rows = self.__connection.execute("SELECT room_key, data FROM stays").fetchall()
+                self.__connection.executemany(
+                    "UPDATE stays SET room_type = ?, arrival_date = ?, departure_date = ? WHERE room_key = ?",
+                    [self.getStayColumns(loads(data)) + (room_key,) for room_key, data in rows])
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS stays_departure ON stays (departure_date, room_type)")
+
+    @property
+    def database_path(self):
+        """Property representing the path of the SQLite database"""
+        return self.__database_path
+
+    def close(self):
+        """Closes the connection to the database"""
+        with self.__lock:
+            self.__connection.close()
+
+    def isIdCardReserved(self, id_card: str):
+        """Returns True if there is a row in the reservations table for the given id_card"""
+        return self.fetchData("SELECT data FROM reservations WHERE id_card = ?", id_card) is not None
+
+    def findReservedIdCards(self, id_cards):
+        """Returns the set of the given id_cards that have a row in the reservations table, looking them up with a
+        query for every LOOKUP_SIZE id_cards"""
+        id_cards = list(dict.fromkeys(id_cards))
+        reserved_id_cards = set()
+        for start in range(0, len(id_cards), LOOKUP_SIZE):
+            chunk = id_cards[start:start + LOOKUP_SIZE]
+            query = f"SELECT id_card FROM reservations WHERE id_card IN ({', '.join('?' * len(chunk))})"
+            with self.__lock:
+                reserved_id_cards.update(id_card for (id_card,) in self.__connection.execute(query, chunk).fetchall())
+        return reserved_id_cards
+
+    def saveReservations(self, reservations: dict):
+        """Inserts (or replaces) the given reservations in a single transaction, moving the rooms booked by the
+        reservations they replace to their own nights"""
+        if not reservations:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.execute("BEGIN IMMEDIATE")
+            for id_card, reservation in reservations.items():
+                row = self.__connection.execute("SELECT data FROM reservations WHERE id_card = ?",
+                                                (id_card,)).fetchone()
+                if row is not None:
+                    self.addBookedNights(loads(row[0]), -1)
+                self.__connection.execute(
+                    "INSERT OR REPLACE INTO reservations (id_card, localizer, data) VALUES (?, ?, ?)",
+                    (id_card, reservation["localizer"], json.dumps(reservation)))
+                self.addBookedNights(reservation, 1)
+
+    def bookReservations(self, reservations: dict, room_capacity: dict = None):
+        """Inserts the given reservations whose id_card does not have a row yet, and which have a free room every night
+        if room_capacity is given, and adds their rooms to booked_nights, all in a single transaction. The transaction
+        takes the write lock of the database before reading anything, so another process using the same database
+        cannot book the same rooms in the meantime"""
+        existing_id_cards = set()
+        unavailable_id_cards = set()
+        if not reservations:
+            return existing_id_cards, unavailable_id_cards
+        with self.__lock, self.__connection:
+            self.__connection.execute("BEGIN IMMEDIATE")
+            for id_card, reservation in reservations.items():
+                if self.__connection.execute("SELECT 1 FROM reservations WHERE id_card = ?",
+                                             (id_card,)).fetchone() is not None:
+                    existing_id_cards.add(id_card)
+                    continue
+                nights = getReservationNights(reservation)
+                if room_capacity is not None and (nights is None or self.queryBookedRooms(*nights) >=
+                                                  room_capacity.get(nights[0], 0)):
+                    unavailable_id_cards.add(id_card)
+                    continue
+                self.__connection.execute("INSERT INTO reservations (id_card, localizer, data) VALUES (?, ?, ?)",
+                                          (id_card, reservation["localizer"], json.dumps(reservation)))
+                self.addBookedNights(reservation, 1)
+        return existing_id_cards, unavailable_id_cards
+
+    def countBookedRooms(self, room_type: str, arrival: date, num_days: int):
+        """Returns the highest number of rooms of room_type booked any night of the stay, with a single query over the
+        primary key of booked_nights"""
+        with self.__lock:
+            return self.queryBookedRooms(room_type, arrival, num_days)
+
+    def queryBookedRooms(self, room_type: str, arrival: date, num_days: int):
+        """Returns the highest number of rooms of room_type booked any night of the stay. The lock must be held by the
+        caller"""
+        first_night = arrival.toordinal()
+        row = self.__connection.execute(
+            "SELECT MAX(rooms) FROM booked_nights WHERE room_type = ? AND night >= ? AND night < ?",
+            (room_type, first_night, first_night + num_days)).fetchone()
+        return row[0] or 0
+
+    def addBookedNights(self, reservation: dict, rooms: int):
+        """Adds rooms to the rooms booked every night of the stay of the reservation (or removes them, if rooms is
+        negative). A reservation whose stay cannot be read does not book anything. The lock must be held by the
+        caller, inside a transaction"""
+        nights = getReservationNights(reservation)
+        if nights is None:
+            return
+        room_type, arrival, num_days = nights
+        first_night = arrival.toordinal()
+        self.__connection.executemany(
+            "INSERT INTO booked_nights (room_type, night, rooms) VALUES (?, ?, ?) "
+            "ON CONFLICT (room_type, night) DO UPDATE SET rooms = rooms + excluded.rooms",
+            [(room_type, night, rooms) for night in range(first_night, first_night + num_days)])
+        if rooms < 0:
+            self.__connection.execute("DELETE FROM booked_nights WHERE room_type = ? AND night >= ? AND night < ? "
+                                      "AND rooms <= 0", (room_type, first_night, first_night + num_days))
+
+    def claimIdempotencyKey(self, idempotency_key: str, claim: dict):
+        """Inserts the claim of the idempotency key unless it already has a row, which is returned instead"""
+        with self.__lock, self.__connection:
+            cursor = self.__connection.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (idempotency_key, data) VALUES (?, ?)",
+                (idempotency_key, json.dumps(claim)))
+            if cursor.rowcount == 1:
+                return None
+            row = self.__connection.execute("SELECT data FROM idempotency_keys WHERE idempotency_key = ?",
+                                            (idempotency_key,)).fetchone()
+        return loads(row[0])
+
+    def loadIdempotencyKey(self, idempotency_key: str):
+        """Returns the claim of the row of the idempotency key, if there is one"""
+        data = self.fetchData("SELECT data FROM idempotency_keys WHERE idempotency_key = ?", idempotency_key)
+        return None if data is None else loads(data)
+
+    def releaseIdempotencyKey(self, idempotency_key: str):
+        """Deletes the row of the claim of the idempotency key"""
+        self.executeMany("DELETE FROM idempotency_keys WHERE idempotency_key = ?", [(idempotency_key,)])
+
+    def loadReservation(self, id_card: str):
+        """Returns the reservation of the given id_card"""
+        data = self.fetchData("SELECT data FROM reservations WHERE id_card = ?", id_card)
+        if data is None:
+            raise HotelManagementException("Wrong file or file path")
+        return loads(data)
+
+    def saveStays(self, stays: dict):
+        """Inserts (or replaces) the given processed stays in a single transaction, with their room type and dates in
+        their own columns"""
+        rows = [(room_key, stay["idCard"], stay["localizer"], json.dumps(stay)) + self.getStayColumns(stay)
+                for room_key, stay in stays.items()]
+        self.executeMany("INSERT OR REPLACE INTO stays (room_key, id_card, localizer, data, room_type, arrival_date, "
+                         "departure_date) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def getStayColumns(self, stay: dict):
+        """Returns the room type and the ordinals of the arrival and departure dates of a processed stay, which are
+        NULL if they cannot be read"""
+        stay_dates = getStayDates(stay)
+        if stay_dates is None:
+            return None, None, None
+        room_type, arrival, departure = stay_dates
+        return room_type, arrival.toordinal(), departure.toordinal()
+
+    def loadDepartures(self, first_departure: date, last_departure: date):
+        """Returns {room_key: stay} with the processed stays whose departure is between first_departure and
+        last_departure, with a single query over the index of their departure date"""
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT room_key, data FROM stays WHERE departure_date >= ? AND departure_date <= ?",
+                (first_departure.toordinal(), last_departure.toordinal())).fetchall()
+        return {room_key: loads(data) for room_key, data in rows}
+
+    def loadCheckouts(self, room_keys):
+        """Returns the set of the given room_keys that have a row in the checkouts table, looking them up with a query
+        for every LOOKUP_SIZE room_keys"""
+        room_keys = list(dict.fromkeys(room_keys))
+        checked_out = set()
+        for start in range(0, len(room_keys), LOOKUP_SIZE):
+            chunk = room_keys[start:start + LOOKUP_SIZE]
+            query = f"SELECT room_key FROM checkouts WHERE room_key IN ({', '.join('?' * len(chunk))})"
+            with self.__lock:
+                checked_out.update(room_key for (room_key,) in self.__connection.execute(query, chunk).fetchall())
+        return checked_out
+
+    def loadStay(self, room_key: str):
+        """Returns the processed stay of the given room_key"""
+        data = self.fetchData("SELECT data FROM stays WHERE room_key = ?", room_key)
+        if data is None:
+            raise HotelManagementException("Room key not found in processed stays store.")
+        return loads(data)
+
+    def loadStays(self, room_keys):
+        """Returns the processed stay of each of the given room_keys (or the exception of the ones that cannot be
+        loaded), looking them up with a query for every LOOKUP_SIZE room_keys"""
+        room_keys = list(dict.fromkeys(room_keys))
+        rows = {}
+        for start in range(0, len(room_keys), LOOKUP_SIZE):
+            chunk = room_keys[start:start + LOOKUP_SIZE]
+            query = f"SELECT room_key, data FROM stays WHERE room_key IN ({', '.join('?' * len(chunk))})"
+            with self.__lock:
+                rows.update(self.__connection.execute(query, chunk).fetchall())
+        stays = {}
+        for room_key in room_keys:
+            try:
+                if room_key not in rows:
+                    raise HotelManagementException("Room key not found in processed stays store.")
+                stays[room_key] = loads(rows[room_key])
+            except (HotelManagementException, ValueError) as ex:
+                stays[room_key] = ex
+        return stays
+
+    def saveCheckout(self, room_key: str, checkout: dict):
+        """Inserts (or replaces) the checkout of the given room_key"""
+        self.executeMany("INSERT OR REPLACE INTO checkouts (room_key, data) VALUES (?, ?)",
+                         [(room_key, json.dumps(checkout))])
+
+    def saveRecords(self, store: str, records: dict):
+        """Stores the given records of the store in a single transaction"""
+        if store == "checkouts":
+            self.executeMany("INSERT OR REPLACE INTO checkouts (room_key, data) VALUES (?, ?)",
+                             [(room_key, json.dumps(checkout)) for room_key, checkout in records.items()])
+        else:
+            super().saveRecords(store, records)
+
+    def iterRecords(self, store: str):
+        """Yields the key and the record of every row of the table of the store, reading it in pages ordered by their
+        key so the lock is never held for the whole table"""
+        table, key_column = STORE_TABLES[store]
+        query = f"SELECT {key_column}, data FROM {table} WHERE {key_column} > ? ORDER BY {key_column} LIMIT ?"
+        last_key = ""
+        while True:
+            with self.__lock:
+                rows = self.__connection.execute(query, (last_key, PAGE_SIZE)).fetchall()
+            for key, data in rows:
+                yield key, loads(data)
+            if len(rows) < PAGE_SIZE:
+                return
+            last_key = rows[-1][0]
+
+    def fetchData(self, query: str, key: str):
+        """Runs a query over an indexed key and returns the data column of the first row, or None if there is none"""
+        with self.__lock:
+            row = self.__connection.execute(query, (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def executeMany(self, statement: str, rows: list):
+        """Runs the statement for every row inside a single transaction"""
+        if not rows:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.executemany(statement, rows)
@@ -0,0 +1,232 @@
+"""StayWriteBuffer module"""
+import atexit
+import json
+import threading
+import time
+import weakref
+from UC3MTravel.HotelMetrics import HotelMetrics, NO_METRICS
+from UC3MTravel.HotelStorage import HotelStorage
+from UC3MTravel.WriteAheadLog import WriteAheadLog
+
+# Folder of the storage root with the write ahead log segments of the stays that have not been stored yet
+WAL_FOLDER = "stays_wal"
+
+# Buffers that have not been closed yet. It only keeps weak references, so a buffer (and its storage) is released as
+# soon as its HotelManager is dropped, and a single exit handler closes the ones that are still alive
+OPEN_BUFFERS = weakref.WeakSet()
+
+
+def closeOpenBuffers():
+    """Stores the buffered stays of every buffer that is still open when the interpreter exits"""
+    for stay_buffer in list(OPEN_BUFFERS):
+        stay_buffer.close()
+
+
+atexit.register(closeOpenBuffers)
+
+
+def storeAbandoned(storage: HotelStorage, pending: dict, wal: WriteAheadLog):
+    """Finalizer of a buffer that is dropped without being closed: stores its buffered stays and closes its log. If
+    they cannot be stored, the segments are kept and the next buffer created on the storage root stores them"""
+    if wal.closed:
+        return
+    try:
+        if pending:
+            storage.saveStays(dict(pending))
+    except BaseException:
+        wal.close(remove_segments=False)
+        raise
+    wal.close()
+
+
+def runFlusher(buffer_reference, condition: threading.Condition, flush_interval: float):
+    """Body of the background thread of a buffer: flushes it every flush_interval seconds, or as soon as it is full,
+    until the buffer is closed. After a failed flush it always waits flush_interval seconds before trying again.
+    The thread only keeps a weak reference to the buffer while it waits, so it also ends when the buffer is dropped
+    without being closed (its stays are then stored by its finalizer)"""
+    failed = False
+    while True:
+        deadline = time.monotonic() + flush_interval
+        with condition:
+            # The condition is also notified when other things happen (a flush ends...), so it is waited again until
+            # the deadline unless the buffer gets full
+            while True:
+                stay_buffer = buffer_reference()
+                if stay_buffer is None or stay_buffer.closed:
+                    return
+                if not stay_buffer.waitsForFlush(failed):
+                    break
+                del stay_buffer
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                condition.wait(remaining)
+        stay_buffer = buffer_reference()
+        if stay_buffer is None:
+            return
+        try:
+            stay_buffer.flush()
+            failed = False
+        except Exception:  # pylint: disable=broad-exception-caught
+            # The stays stay in the buffer and in their segments, so they are stored by the next flush
+            stay_buffer.metrics.count("write_behind", "flush_errors")
+            failed = True
+        del stay_buffer
+
+
+def wakeFlusher(condition: threading.Condition):
+    """Wakes the flusher of a buffer that has been dropped, so its thread ends"""
+    with condition:
+        condition.notify_all()
+
+
+class StayWriteBuffer:
+    """Write-behind buffer of processed stays. A stay is appended as a json line to a write ahead log segment and kept
+    in memory, so guestArrival can return its room_key without waiting for the storage, and a background thread
+    stores all the buffered stays with a single saveStays every flush_interval seconds, or as soon as there are
+    max_unflushed of them. Adding a stay when the buffer is full waits for the flush, so the unflushed stays never
+    exceed max_unflushed.
+    Several buffers can share a storage root, as each one writes its own segments. A buffer that is dropped without
+    being closed stores its stays when it is garbage collected. The segments of a buffer whose process ended before
+    storing them (or whose last flush failed) are stored by the next buffer created on the storage root"""
+    def __init__(self, storage: HotelStorage, flush_interval: float = 1.0, max_unflushed: int = 1000,
+                 sync: bool = False, metrics: HotelMetrics = NO_METRICS):
+        if flush_interval <= 0 or max_unflushed < 1:
+            raise ValueError("flush_interval and max_unflushed must be positive")
+        self.__storage = storage
+        self.__flush_interval = flush_interval
+        self.__max_unflushed = max_unflushed
+        self.__metrics = metrics
+        # {room_key: stay} of the stays that have not been stored yet, in the order they were added
+        self.__pending = {}
+        self.__condition = threading.Condition()
+        # Set while the flusher is storing stays that are no longer in a segment that can be written
+        self.__flushing = False
+        self.__closed = False
+        # If sync is False the lines are left to the operating system (like the json files of the stores), else
+        # every stay is synced to disk before its room_key is returned
+        self.__wal = WriteAheadLog(storage.getJsonDirectory(WAL_FOLDER), sync)
+        try:
+            recovered = self.__wal.recoverAbandoned(storage.saveStays)
+        except BaseException:
+            self.__wal.close()
+            raise
+        if recovered:
+            self.__metrics.count("write_behind", "recovered", recovered)
+
+        condition = self.__condition
+        self.__flusher = threading.Thread(target=runFlusher,
+                                          args=(weakref.ref(self, lambda _: wakeFlusher(condition)), condition,
+                                                flush_interval),
+                                          name="StayWriteBuffer", daemon=True)
+        self.__flusher.start()
+        # The buffered stays are stored when the interpreter exits even if close is not called, and when the buffer is
+        # garbage collected (the finalizer does not keep the buffer alive, only its stays and its log)
+        OPEN_BUFFERS.add(self)
+        weakref.finalize(self, storeAbandoned, storage, self.__pending, self.__wal).atexit = False
+
+    @property
+    def flush_interval(self):
+        """Property representing the seconds between 2 flushes"""
+        return self.__flush_interval
+
+    @property
+    def max_unflushed(self):
+        """Property representing the maximum number of stays that can be waiting to be stored"""
+        return self.__max_unflushed
+
+    @property
+    def closed(self):
+        """Property representing whether the buffer has been closed"""
+        return self.__closed
+
+    @property
+    def metrics(self):
+        """Property representing the metrics sink of the buffer"""
+        return self.__metrics
+
+    @property
+    def wal(self):
+        """Property representing the write ahead log of the buffer"""
+        return self.__wal
+
+    def __len__(self):
+        with self.__condition:
+            return len(self.__pending)
+
+    def waitsForFlush(self, failed: bool):
+        """Returns True while the flusher has to wait for the end of its interval: the last flush failed, or the buffer
+        is not full. The condition must be held by the caller"""
+        return failed or len(self.__pending) < self.__max_unflushed
+
+    def addStay(self, room_key: str, stay: dict):
+        """Appends the stay to the current segment and buffers it until the next flush"""
+        line = json.dumps({"key": room_key, "data": stay}, separators=(",", ":")).encode() + b"\n"
+        with self.__condition:
+            # If the buffer is full (the flusher was woken up by the stay that filled it), the stay waits until there
+            # is room for it
+            if len(self.__pending) >= self.__max_unflushed:
+                self.__metrics.count("write_behind", "full_waits")
+            while len(self.__pending) >= self.__max_unflushed and not self.__closed:
+                self.__condition.wait()
+            if self.__closed:
+                raise ValueError("The stay write buffer is closed")
+            self.__wal.append(line)
+            self.__pending[room_key] = stay
+            if len(self.__pending) >= self.__max_unflushed:
+                self.__condition.notify_all()
+
+    def getStay(self, room_key: str):
+        """Returns the buffered stay of the room_key, or None if it is not waiting to be stored"""
+        with self.__condition:
+            return self.__pending.get(room_key)
+
+    def items(self):
+        """Returns a list with the (room_key, stay) pairs of the buffered stays"""
+        with self.__condition:
+            return list(self.__pending.items())
+
+    def flush(self):
+        """Stores every buffered stay with a single saveStays, and then removes the segments in which they were"""
+        with self.__condition:
+            # Only 1 flush runs at a time
+            while self.__flushing:
+                self.__condition.wait()
+            if not self.__pending:
+                return
+            self.__flushing = True
+            stays = dict(self.__pending)
+            # The next stays are appended to a new segment, so the flushed ones can be removed as a whole
+            flushed_segments = self.__wal.rotate(open_next=not self.__closed)
+        try:
+            with self.__metrics.stage("write_behind", "flush"):
+                self.__storage.saveStays(stays)
+        except BaseException:
+            with self.__condition:
+                self.__wal.restore(flushed_segments)
+                self.__flushing = False
+                self.__condition.notify_all()
+            raise
+        self.__wal.removeSegments(flushed_segments)
+        with self.__condition:
+            # A stay added again while it was being stored is kept for the next flush
+            for room_key, stay in stays.items():
+                if self.__pending.get(room_key) is stay:
+                    del self.__pending[room_key]
+            self.__flushing = False
+            self.__condition.notify_all()
+        self.__metrics.count("write_behind", "flushed", len(stays))
+
+    def close(self):
+        """Stops the flusher and stores the stays that are still buffered. It can be called more than once"""
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__condition.notify_all()
+        OPEN_BUFFERS.discard(self)
+        self.__flusher.join()
+        self.flush()
+        with self.__condition:
+            # Every stay has been stored, so the segments that are left are empty
+            self.__wal.close()
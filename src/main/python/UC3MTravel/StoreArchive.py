@@ -0,0 +1,136 @@
+"""StoreArchive module
+
+Exports the reservations, processed stays and checkouts of a storage backend to a single archive, and imports them
+back. The archive is a JSON Lines file (compressed with gzip if its name ends with .gz) with one compact line per
+record: {"store": "reservations", "key": "12345678Z", "data": {...}}. The records are streamed one at a time in both
+directions, so the memory used does not depend on the size of the stores.
+
+Usage:
+    python -m UC3MTravel.StoreArchive export backup.jsonl.gz [--storage-root DIRECTORY] [--storage json]
+    python -m UC3MTravel.StoreArchive import backup.jsonl.gz [--storage-root DIRECTORY] [--storage sqlite]
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from UC3MTravel.HotelJsonDecoder import loads
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStorage import HotelStorage, STORES
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+STORAGES = {"json": JsonStorage, "sqlite": SqliteStorage, "journal": JournalStorage}
+
+
+def openArchive(archive_path: str, mode: str):
+    """Opens the archive for reading ("r") or writing ("w") as text, compressed if its name ends with .gz"""
+    if archive_path.endswith(".gz"):
+        return gzip.open(archive_path, mode + "t", encoding="utf-8")
+    return open(archive_path, mode, encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def iterArchiveLines(storage: HotelStorage, stores: tuple):
+    """Yields the line of the archive of every record of the given stores"""
+    for store in stores:
+        for key, data in storage.iterRecords(store):
+            yield json.dumps({"store": store, "key": key, "data": data}, separators=(",", ":")) + "\n"
+
+
+def iterArchiveRecords(archive_file):
+    """Yields the store, the key and the data of every line of an archive"""
+    for line_number, line in enumerate(archive_file, 1):
+        try:
+            entry = loads(line)
+            yield entry["store"], entry["key"], entry["data"]
+        except (ValueError, KeyError, TypeError) as ex:
+            raise HotelManagementException(f"Invalid archive line {line_number}") from ex
+
+
+def makeReport(counts: dict, seconds: float):
+    """Returns the number of records of every store, and the total records per second"""
+    records = sum(counts.values())
+    return {"records": records,
+            "stores": counts,
+            "seconds": seconds,
+            "records_per_second": records / seconds if seconds else None}
+
+
+def exportStores(storage: HotelStorage, archive_path: str, stores: tuple = STORES, progress=None,
+                 progress_every: int = 100000):
+    """Writes every record of the given stores of storage to the archive. progress is called with the number of
+    records written so far every progress_every records. Returns the report of the export"""
+    counts = dict.fromkeys(stores, 0)
+    start = time.perf_counter()
+    written = 0
+    with openArchive(archive_path, "w") as archive_file:
+        for store in stores:
+            for line in iterArchiveLines(storage, (store,)):
+                archive_file.write(line)
+                counts[store] += 1
+                written += 1
+                if progress is not None and written % progress_every == 0:
+                    progress(written)
+    return makeReport(counts, time.perf_counter() - start)
+
+
+def importStores(storage: HotelStorage, archive_path: str, batch_size: int = 1000, progress=None,
+                 progress_every: int = 100000):
+    """Stores every record of the archive in storage, writing them in batches of batch_size records of the same
+    store. progress is called with the number of records stored so far every progress_every records. Returns the
+    report of the import"""
+    counts = {}
+    start = time.perf_counter()
+    stored = 0
+    batch_store = None
+    batch = {}
+    with openArchive(archive_path, "r") as archive_file:
+        for store, key, data in iterArchiveRecords(archive_file):
+            if store not in STORES:
+                raise HotelManagementException("Unknown store " + str(store) + " in the archive")
+            # A batch only has records of one store, and it is written once it is full or the store changes
+            if batch and (store != batch_store or len(batch) >= batch_size):
+                storage.saveRecords(batch_store, batch)
+                batch = {}
+            batch_store = store
+            batch[key] = data
+            counts[store] = counts.get(store, 0) + 1
+            stored += 1
+            if progress is not None and stored % progress_every == 0:
+                progress(stored)
+    if batch:
+        storage.saveRecords(batch_store, batch)
+    return makeReport(counts, time.perf_counter() - start)
+
+
+def main(argv=None):
+    """Exports or imports the stores given in the command line, reporting its progress"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("archive", help="JSON Lines archive (.jsonl, or .jsonl.gz to compress it)")
+    parser.add_argument("--storage-root", help="directory of the stores (the default storage root by default)")
+    parser.add_argument("--storage", choices=sorted(STORAGES), default="json", help="storage backend")
+    parser.add_argument("--stores", nargs="+", choices=STORES, default=list(STORES), help="stores to export")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records written at a time when importing")
+    args = parser.parse_args(argv)
+
+    storage = STORAGES[args.storage](args.storage_root)
+    start = time.perf_counter()
+
+    def progress(records: int):
+        print(f"{records} records ({records / (time.perf_counter() - start):.0f} records/s)", file=sys.stderr)
+
+    try:
+        if args.action == "export":
+            report = exportStores(storage, args.archive, tuple(args.stores), progress)
+        else:
+            report = importStores(storage, args.archive, args.batch_size, progress)
+    finally:
+        if hasattr(storage, "close"):
+            storage.close()
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
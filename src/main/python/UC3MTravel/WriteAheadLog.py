@@ -0,0 +1,169 @@
+"""WriteAheadLog module"""
+import contextlib
+import fcntl
+import os
+import uuid
+from UC3MTravel.HotelJsonDecoder import loads
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStorage import lockedFile
+
+SEGMENT_SUFFIX = ".wal"
+LOCK_SUFFIX = ".lock"
+# Every file of a log starts with this prefix and the name of its owner: stays.<owner>.<number>.wal and
+# stays.<owner>.lock. The segments of older versions, stays.<number>.wal, have no owner
+FILE_PREFIX = "stays."
+# Lock of the whole folder, held while a log is created and while the logs of other owners are recovered
+FOLDER_LOCK_NAME = "recovery.lock"
+
+
+def readSegments(segment_paths: list):
+    """Returns {key: data} with the entries of the given segments of a log, in order. Only the last line of the last
+    segment can be discarded, if it was not completely written. Any other line that cannot be read raises a
+    HotelManagementException"""
+    entries = {}
+    for segment_path in segment_paths:
+        with open(segment_path, "rb") as segment:
+            for line in segment:
+                # Only the segment that was being written can end with an incomplete line
+                if not line.endswith(b"\n") and segment_path == segment_paths[-1]:
+                    break
+                try:
+                    entry = loads(line)
+                    entries[entry["key"]] = entry["data"]
+                except (ValueError, KeyError, TypeError) as ex:
+                    raise HotelManagementException("Corrupt write ahead log segment " +
+                                                   os.path.basename(segment_path)) from ex
+    return entries
+
+
+class WriteAheadLog:
+    """Write ahead log of a StayWriteBuffer, made of segments to which json lines are appended. Every log has its own
+    owner name, and holds the flock of its lock file until it is closed, so several logs (of the same process or of
+    different ones) can share a folder: a log only recovers the segments of owners whose lock is free, because their
+    process ended or their log was dropped without removing its segments"""
+    def __init__(self, directory: str, sync: bool = False):
+        self.__directory = directory
+        # If sync is False the lines are left to the operating system, else every line is synced to disk before
+        # append returns
+        self.__sync = sync
+        self.__owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # Segments whose entries have not been stored yet, and the one that is being written
+        self.__unflushed_segments = []
+        self.__segment_number = 0
+        self.__segment = None
+        self.__lock_descriptor = None
+        # The lock of the owner is taken under the folder lock, so a log that is recovering never sees the lock file
+        # of a new log before it is locked
+        with lockedFile(os.path.join(directory, FOLDER_LOCK_NAME)):
+            lock_descriptor = os.open(self.getFilePath(LOCK_SUFFIX), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(lock_descriptor, fcntl.LOCK_EX)
+        self.__lock_descriptor = lock_descriptor
+        self.openSegment()
+
+    @property
+    def owner(self):
+        """Property representing the name of the owner of the segments of the log"""
+        return self.__owner
+
+    @property
+    def closed(self):
+        """Property representing whether the log has been closed"""
+        return self.__lock_descriptor is None
+
+    def getFilePath(self, suffix: str):
+        """Returns the path of the file of the log with the given suffix"""
+        return os.path.join(self.__directory, FILE_PREFIX + self.__owner + suffix)
+
+    def openSegment(self):
+        """Starts a new segment, to which the next lines are appended"""
+        self.__segment_number += 1
+        segment_path = self.getFilePath(f".{self.__segment_number:012d}{SEGMENT_SUFFIX}")
+        self.__segment = open(segment_path, "ab")  # pylint: disable=consider-using-with
+        self.__unflushed_segments.append(segment_path)
+
+    def append(self, line: bytes):
+        """Appends a complete json line to the current segment"""
+        self.__segment.write(line)
+        self.__segment.flush()
+        if self.__sync:
+            os.fsync(self.__segment.fileno())
+
+    def rotate(self, open_next: bool = True):
+        """Closes the current segment and returns the list of the segments written so far, whose lines are going to be
+        stored. The next lines are appended to a new segment, which is only opened if open_next is True"""
+        self.__segment.close()
+        flushed_segments = self.__unflushed_segments
+        self.__unflushed_segments = []
+        if open_next:
+            self.openSegment()
+        return flushed_segments
+
+    def restore(self, segment_paths: list):
+        """Gives back the segments returned by rotate whose lines could not be stored"""
+        self.__unflushed_segments[:0] = segment_paths
+
+    def removeSegments(self, segment_paths: list):
+        """Removes the segments returned by rotate, once their lines have been stored"""
+        for segment_path in segment_paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(segment_path)
+
+    def recoverAbandoned(self, store_entries):
+        """Calls store_entries with {key: data} of the segments left by the owners whose lock is free, and then
+        removes their segments and lock files. If store_entries fails, or a segment is corrupt, every file is kept.
+        Returns the number of entries stored"""
+        with lockedFile(os.path.join(self.__directory, FOLDER_LOCK_NAME)):
+            segments, lock_names = self.listOwners()
+            entries = {}
+            abandoned_files = []
+            with contextlib.ExitStack() as owner_locks:
+                for owner in sorted(set(segments) | set(lock_names)):
+                    if owner == self.__owner:
+                        continue
+                    if owner in lock_names:
+                        lock_path = os.path.join(self.__directory, lock_names[owner])
+                        # The lock is free once the owner has closed it or its process has ended
+                        if owner_locks.enter_context(lockedFile(lock_path, blocking=False)) is None:
+                            continue
+                        abandoned_files.append(lock_path)
+                    owner_segments = [os.path.join(self.__directory, name) for name in sorted(segments.get(owner, []))]
+                    entries.update(readSegments(owner_segments))
+                    abandoned_files[:0] = owner_segments
+                if entries:
+                    store_entries(entries)
+                # The segments are removed before the lock files, so a segment never loses the lock of its owner
+                self.removeSegments(abandoned_files)
+        return len(entries)
+
+    def listOwners(self):
+        """Returns {owner: [segment names]} and {owner: lock file name} of the files of the folder. The segments of
+        older versions are returned under the owner "", which has no lock file"""
+        segments = {}
+        lock_names = {}
+        for file_name in os.listdir(self.__directory):
+            if not file_name.startswith(FILE_PREFIX):
+                continue
+            if file_name.endswith(SEGMENT_SUFFIX):
+                parts = file_name[len(FILE_PREFIX):-len(SEGMENT_SUFFIX)].split(".")
+                segments.setdefault(parts[0] if len(parts) == 2 else "", []).append(file_name)
+            elif file_name.endswith(LOCK_SUFFIX):
+                lock_names[file_name[len(FILE_PREFIX):-len(LOCK_SUFFIX)]] = file_name
+        return segments, lock_names
+
+    def close(self, remove_segments: bool = True):
+        """Closes the log and releases the lock of its owner. If remove_segments is True its segments and its lock file
+        are removed, as every line has been stored, else they are kept for the next log that recovers them. It can be
+        called more than once"""
+        if self.__lock_descriptor is None:
+            return
+        self.__segment.close()
+        if remove_segments:
+            # The files are removed under the folder lock, so a log that is recovering never lists a segment that
+            # disappears before it reads it
+            with lockedFile(os.path.join(self.__directory, FOLDER_LOCK_NAME)):
+                self.removeSegments(self.__unflushed_segments + [self.getFilePath(LOCK_SUFFIX)])
+                self.__unflushed_segments = []
+                os.close(self.__lock_descriptor)
+        else:
+            os.close(self.__lock_descriptor)
+        self.__lock_descriptor = None
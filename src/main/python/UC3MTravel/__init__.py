@@ -1,3 +1,56 @@
-from UC3MTravel.HotelReservation import HotelReservation
-from UC3MTravel.HotelManager import HotelManager
-from UC3MTravel.HotelManagementException import HotelManagementException
+"""UC3MTravel package. Its classes are only imported the first time they are used (PEP 562), so importing the package
+(for example, to read its version or to run a small command) does not import every module of the HotelManager"""
+import importlib
+import sys
+from types import ModuleType
+
+# Module that defines each of the classes exported by the package
+LAZY_ATTRIBUTES = {
+    "HotelReservation": "UC3MTravel.HotelReservation",
+    "HotelManager": "UC3MTravel.HotelManager",
+    "AsyncHotelManager": "UC3MTravel.AsyncHotelManager",
+    "HotelManagementException": "UC3MTravel.HotelManagementException",
+    "HotelMetrics": "UC3MTravel.HotelMetrics",
+    "MetricsAggregator": "UC3MTravel.HotelMetrics",
+    "PrometheusMetrics": "UC3MTravel.HotelMetrics",
+    "HotelStorage": "UC3MTravel.HotelStorage",
+    "JsonStorage": "UC3MTravel.JsonStorage",
+    "JournalStorage": "UC3MTravel.JournalStorage",
+    "SqliteStorage": "UC3MTravel.SqliteStorage",
+    "RecordCache": "UC3MTravel.RecordCache",
+    "RoomInventory": "UC3MTravel.RoomInventory",
+    "StayWriteBuffer": "UC3MTravel.StayWriteBuffer",
+    "WriteAheadLog": "UC3MTravel.WriteAheadLog",
+}
+
+__all__ = list(LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    """Imports the module of an exported class the first time the class is used, and keeps it in the package so the
+    next uses do not get here"""
+    module_name = LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES))
+
+
+class LazyPackage(ModuleType):  # pylint: disable=too-few-public-methods
+    """Type of the package module. Importing a submodule binds it to the package under its own name, which is also the
+    name of the class it defines, so the class is bound instead (as it was when the package imported every class).
+    Without it, once any module imports for example UC3MTravel.JsonStorage (as HotelManager does), __getattr__ is no
+    longer called for JsonStorage and "from UC3MTravel import JsonStorage" returns the module instead of the class"""
+    def __setattr__(self, name: str, value):
+        if isinstance(value, ModuleType) and LAZY_ATTRIBUTES.get(name) == value.__name__ and \
+                hasattr(value, name):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = LazyPackage
@@ -0,0 +1,137 @@
+""" Module that tests the AsyncHotelManager class"""
+from unittest import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from freezegun import freeze_time
+from UC3MTravel.AsyncHotelManager import AsyncHotelManager
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JsonStorage import JsonStorage
+
+
+class BlockingStorage(JsonStorage):
+    """Json storage whose creations of reservations wait until they are allowed, and which counts how many of them are
+    running at the same time"""
+    def __init__(self, storage_root: str):
+        super().__init__(storage_root)
+        self.allowed = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def bookReservations(self, reservations: dict, room_capacity: dict = None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.started.release()
+        self.allowed.wait()
+        try:
+            return super().bookReservations(reservations, room_capacity)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestAsyncHotelManager(TestCase):
+    """Test cases for the AsyncHotelManager class"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def reservation(id_card: str, name_surname: str = "John Smith"):
+        """Returns the parameters of a valid reservation of the given client"""
+        return {"credit_card": "5105105105105100",
+                "name_surname": name_surname,
+                "id_card": id_card,
+                "phone_number": "612345789",
+                "room_type": "single",
+                "arrival_date": "01/07/2024",
+                "num_days": 2}
+
+    def test_async_hotel_manager01(self):
+        """Test 1: a reservation, its arrival and its checkout give the same results as HotelManager"""
+        async def run():
+            async with AsyncHotelManager(storage_root=self.temp_dir.name) as hotel_manager:
+                with freeze_time("2024-07-01"):
+                    localizer = await hotel_manager.roomReservation(**self.reservation("12345678Z"))
+                    stay_file_path = os.path.join(hotel_manager.hotel_manager.getJsonDirectory("stays_store"),
+                                                  "arrival.json")
+                    with open(stay_file_path, "w", encoding="utf-8") as stay_file:
+                        json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+                    room_key = await hotel_manager.guestArrival("arrival.json")
+                with freeze_time("2024-07-03"):
+                    checked_out = await hotel_manager.guest_checkout(room_key)
+            return localizer, room_key, checked_out
+
+        localizer, room_key, checked_out = asyncio.run(run())
+        with tempfile.TemporaryDirectory() as storage_root, freeze_time("2024-07-01"):
+            self.assertEqual(localizer,
+                             HotelManager(storage_root=storage_root).roomReservation(**self.reservation("12345678Z")))
+        self.assertEqual(len(room_key), 64)
+        self.assertTrue(checked_out)
+
+    def test_async_hotel_manager02(self):
+        """Test 2: the HotelManagementExceptions of the validations are raised by the awaited call"""
+        async def run():
+            async with AsyncHotelManager(storage_root=self.temp_dir.name) as hotel_manager:
+                with freeze_time("2024-07-01"):
+                    await hotel_manager.roomReservation(**self.reservation("12345678A"))
+
+        with self.assertRaises(HotelManagementException) as cm:
+            asyncio.run(run())
+        self.assertEqual(cm.exception.message, "invalid letter for id_card")
+
+    def test_async_hotel_manager03(self):
+        """Test 3: no more than max_pending calls are in the pool at the same time, and the rest wait for a slot"""
+        storage = BlockingStorage(self.temp_dir.name)
+        id_cards = ["12345678Z", "87654321X", "00000001R", "00000002W", "00000003A"]
+
+        async def run():
+            async with AsyncHotelManager(storage=storage, max_workers=4, max_pending=2) as hotel_manager:
+                with freeze_time("2024-07-01"):
+                    tasks = [asyncio.create_task(hotel_manager.roomReservation(**self.reservation(id_card)))
+                             for id_card in id_cards]
+                    # The first 2 calls reach the storage, and the other ones have to wait
+                    await asyncio.get_running_loop().run_in_executor(None, storage.started.acquire)
+                    await asyncio.get_running_loop().run_in_executor(None, storage.started.acquire)
+                    self.assertEqual(storage.running, 2)
+                    storage.allowed.set()
+                    return await asyncio.gather(*tasks)
+
+        localizers = asyncio.run(run())
+        self.assertEqual(len(localizers), len(id_cards))
+        self.assertEqual(storage.max_running, 2)
+        for id_card in id_cards:
+            self.assertTrue(storage.isIdCardReserved(id_card))
+
+    def test_async_hotel_manager04(self):
+        """Test 4: a call cancelled while it waits for a slot is never run, and the slots are freed"""
+        storage = BlockingStorage(self.temp_dir.name)
+
+        async def run():
+            async with AsyncHotelManager(storage=storage, max_pending=1) as hotel_manager:
+                with freeze_time("2024-07-01"):
+                    first = asyncio.create_task(hotel_manager.roomReservation(**self.reservation("12345678Z")))
+                    await asyncio.get_running_loop().run_in_executor(None, storage.started.acquire)
+                    second = asyncio.create_task(hotel_manager.roomReservation(**self.reservation("87654321X")))
+                    await asyncio.sleep(0)
+                    second.cancel()
+                    storage.allowed.set()
+                    await first
+                    with self.assertRaises(asyncio.CancelledError):
+                        await second
+                    # The slot of the first call is free again
+                    return await hotel_manager.roomReservation(**self.reservation("00000001R"))
+
+        self.assertEqual(len(asyncio.run(run())), 32)
+        self.assertTrue(storage.isIdCardReserved("12345678Z"))
+        self.assertFalse(storage.isIdCardReserved("87654321X"))
+        self.assertTrue(storage.isIdCardReserved("00000001R"))
@@ -0,0 +1,56 @@
+""" Module that tests roomReservation() called from several threads at the same time"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from datetime import datetime
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+
+LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+class TestConcurrentReservation(TestCase):
+    """Stress tests of a thread pool of HotelManager workers sharing the same stores"""
+    NUM_THREADS = 8
+    NUM_RESERVATIONS = 400
+
+    def setUp(self):
+        self.json_dir = HotelManager().getJsonDirectory("reservations_store")
+        # Valid id_cards that are not used by any other test
+        self.id_cards = [f"{number:08d}{LETTERS[number % 23]}"
+                         for number in range(90000000, 90000000 + self.NUM_RESERVATIONS)]
+
+    def tearDown(self):
+        for id_card in self.id_cards:
+            file_path = os.path.join(self.json_dir, id_card + ".json")
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    @staticmethod
+    def reserve(id_cards):
+        """Worker of the thread pool: makes a reservation for every given id_card with its own HotelManager"""
+        worker = HotelManager()
+        return [worker.roomReservation(credit_card="5105105105105100",
+                                       name_surname="John Smith",
+                                       id_card=id_card,
+                                       phone_number="612345789",
+                                       room_type="single",
+                                       arrival_date="01/07/2024",
+                                       num_days=1) for id_card in id_cards]
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_concurrent_reservation01(self):
+        """Test 1: every reservation made by the thread pool is stored complete and the current directory is kept"""
+        original_directory = os.getcwd()
+        chunks = [self.id_cards[i::self.NUM_THREADS] for i in range(self.NUM_THREADS)]
+        with ThreadPoolExecutor(max_workers=self.NUM_THREADS) as executor:
+            localizers = [localizer for chunk in executor.map(self.reserve, chunks) for localizer in chunk]
+
+        self.assertEqual(os.getcwd(), original_directory)
+        self.assertEqual(len(localizers), self.NUM_RESERVATIONS)
+        for id_card in self.id_cards:
+            with open(os.path.join(self.json_dir, id_card + ".json"), "r", encoding="utf-8") as open_file:
+                self.assertEqual(json.load(open_file)["id_card"], id_card)
+        # No temporary file is left behind
+        self.assertFalse([file_name for file_name in os.listdir(self.json_dir) if file_name.endswith(".tmp")])
@@ -0,0 +1,67 @@
+""" Module that tests the "DD/MM/YYYY" date codec"""
+from unittest import TestCase
+from datetime import date, datetime
+from freezegun import freeze_time
+from UC3MTravel.DateCodec import DateFormatError, clearMemo, dateTimestamp, formatDate, parseDate, parseDateTime
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+
+
+class TestDateCodec(TestCase):
+    """Test cases for the functions of DateCodec and the dates checked by HotelManager"""
+    def setUp(self):
+        clearMemo()
+
+    def test_date_codec01(self):
+        """Test 1: the dates, timestamps and datetimes are the ones of strptime"""
+        for text in ["01/07/2024", "29/02/2024", "31/12/1999", "01/01/2100"]:
+            self.assertEqual(parseDate(text), datetime.strptime(text, "%d/%m/%Y").date())
+            self.assertEqual(dateTimestamp(text), datetime.timestamp(datetime.strptime(text, "%d/%m/%Y")))
+            self.assertEqual(formatDate(parseDate(text)), text)
+        self.assertEqual(parseDateTime("07/01/2024 12:34:56"), datetime(2024, 1, 7, 12, 34, 56))
+        self.assertEqual(formatDate(date(2024, 7, 3)), "03/07/2024")
+
+    def test_date_codec02(self):
+        """Test 2: a string without the format raises a DateFormatError, and a date that does not exist a ValueError"""
+        for text in ["1/07/2024", "01-07-2024", "01/07/024", "01/07/20245", "A1/07/2024", "01/0٧/2024",
+                     "+1/07/2024", " 1/07/2024", ""]:
+            with self.assertRaises(DateFormatError):
+                parseDate(text)
+        for text in ["00/07/2024", "32/07/2024", "29/02/2023", "01/13/2024", "01/00/2024", "01/01/0000"]:
+            with self.assertRaises(ValueError) as cm:
+                parseDate(text)
+            self.assertNotIsInstance(cm.exception, DateFormatError)
+        for text in ["07/01/2024 24:00:00", "07/01/2024 12:00", "07/01/2024T12:00:00", "07/01/2024 1a:00:00"]:
+            with self.assertRaises(ValueError):
+                parseDateTime(text)
+        with self.assertRaises(TypeError):
+            parseDate(None)
+
+    def test_date_codec03(self):
+        """Test 3: the result of a string is remembered"""
+        parseDate("01/07/2024")
+        parseDate("01/07/2024")
+        dateTimestamp("01/07/2024")
+        self.assertEqual(parseDate.cache_info().hits, 1)
+        self.assertEqual(parseDate.cache_info().misses, 1)
+        self.assertEqual(dateTimestamp.cache_info().misses, 1)
+        clearMemo()
+        self.assertEqual(parseDate.cache_info().currsize, 0)
+
+    @freeze_time("2024-07-01")
+    def test_date_codec04(self):
+        """Test 4: roomReservation rejects a day 00 as a date that does not exist, and the reports accept the same
+        dates"""
+        hotel_manager = HotelManager()
+        with self.assertRaises(HotelManagementException) as cm:
+            hotel_manager.validateArrivalDate("00/07/2024")
+        self.assertEqual(cm.exception.message, "arrival_date does not exist")
+        with self.assertRaises(HotelManagementException) as cm:
+            hotel_manager.validateArrivalDate("30/06/2024")
+        self.assertEqual(cm.exception.message, "arrival_date before current date")
+        hotel_manager.validateArrivalDate("01/07/2024")
+        self.assertEqual(hotel_manager.parseReportDate("01/07/2024"), date(2024, 7, 1))
+        self.assertEqual(hotel_manager.getDepartureDate("02/07/2024 11:00:00"), date(2024, 7, 2))
+        with self.assertRaises(HotelManagementException) as cm:
+            hotel_manager.getDepartureDate("02/07/2024")
+        self.assertEqual(cm.exception.message, "Departure date is not valid.")
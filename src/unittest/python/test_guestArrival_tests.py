@@ -1,5 +1,7 @@
 """ Module that tests the guestArrival() function"""
+import json
 import os.path
+import tempfile
 from unittest import TestCase
 from datetime import datetime
 from freezegun import freeze_time
@@ -600,3 +602,22 @@ class TestGuestArrival(TestCase):
             file_path = os.path.join("guestArrival_tests_JSON", "guestArrival_test73.json")
             self.my_hotel_manager.guestArrival(file_path)
         self.assertEqual(ex.exception.message, "The JSON data does not have valid values.")
+
+    def testGuestArrival74(self):
+        """ TC74: The guest arrives later on the arrival day than the moment the reservation was stored"""
+        with tempfile.TemporaryDirectory() as storage_root:
+            hotel_manager = HotelManager(storage_root=storage_root)
+            with freeze_time("2024-07-01 00:00:00"):
+                localizer = hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                          name_surname="John Smith",
+                                                          id_card="12345678Z",
+                                                          phone_number="612345789",
+                                                          room_type="single",
+                                                          arrival_date="01/07/2024",
+                                                          num_days=1)
+            stay_file_path = os.path.join(hotel_manager.getJsonDirectory("stays_store"), "arrival.json")
+            with open(stay_file_path, "w", encoding="utf-8") as stay_file:
+                json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+            with freeze_time("2024-07-01 10:30:00"):
+                room_value = hotel_manager.guestArrival("arrival.json")
+            self.assertEqual(len(room_value), 64)
@@ -0,0 +1,82 @@
+""" Module that tests the guestArrivals() function"""
+from unittest import TestCase
+from datetime import datetime
+import json
+import os
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStay import HotelStay
+
+
+class TestGuestArrivals(TestCase):
+    """Test cases for guestArrivals (Function 2 for a batch of stay files)"""
+    def setUp(self):
+        # Each test uses its own stores, so the stays of one test are not seen by the others
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.my_hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        self.stays_dir = self.my_hotel_manager.getJsonDirectory("stays_store")
+        os.makedirs(os.path.join(self.stays_dir, "kiosk"))
+
+        # The reservations are made the same day of the arrival
+        with freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y")):
+            self.localizers = {}
+            for id_card, name_surname in [("12345678Z", "John Smith"), ("87654321X", "John Jack Smith")]:
+                self.localizers[id_card] = self.my_hotel_manager.roomReservation(
+                    "5105105105105100", name_surname, id_card, "612345789", "single", "01/07/2024", 1)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def writeStayFile(self, file_name: str, id_card: str, localizer: str):
+        """Writes a stay file in the kiosk directory of the stays_store folder"""
+        with open(os.path.join(self.stays_dir, "kiosk", file_name), "w", encoding="utf-8") as stay_file:
+            json.dump({"Localizer": localizer, "IdCard": id_card}, stay_file)
+
+    def writeStayFiles(self):
+        """Writes a stay file for each reservation, and 2 invalid ones"""
+        self.writeStayFile("stay1.json", "12345678Z", self.localizers["12345678Z"])
+        self.writeStayFile("stay2.json", "87654321X", self.localizers["87654321X"])
+        self.writeStayFile("stay3.json", "12345678Z", "0" * 32)
+        with open(os.path.join(self.stays_dir, "kiosk", "stay4.json"), "w", encoding="utf-8") as stay_file:
+            stay_file.write("{\"Localizer\": ")
+
+    def checkArrivals(self, arrivals: dict):
+        """Checks that every valid stay file obtains the room_key of its stored stay, and that every invalid one obtains
+        its exception"""
+        kiosk_dir = os.path.join("kiosk", "stay")
+        self.assertEqual(list(arrivals), [kiosk_dir + "1.json", kiosk_dir + "2.json", kiosk_dir + "3.json",
+                                          kiosk_dir + "4.json"])
+        self.assertIsInstance(arrivals[kiosk_dir + "3.json"], HotelManagementException)
+        self.assertEqual(arrivals[kiosk_dir + "3.json"].message, "The JSON data does not have valid values.")
+        self.assertEqual(arrivals[kiosk_dir + "4.json"].message, "The JSON does not have the expected structure.")
+        # Each processed stay is stored, and its room_key is the one of its data
+        for file_name, id_card in [("1.json", "12345678Z"), ("2.json", "87654321X")]:
+            stay = HotelStay.fromJsonData(self.my_hotel_manager.storage.loadStay(arrivals[kiosk_dir + file_name]))
+            self.assertEqual(stay.id_card, id_card)
+            self.assertEqual(stay.room_key, arrivals[kiosk_dir + file_name])
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_guest_arrivals01(self):
+        """Test 1: every stay file of a directory is processed by a pool of threads"""
+        self.writeStayFiles()
+        self.checkArrivals(self.my_hotel_manager.guestArrivals("kiosk", max_workers=4))
+
+    def test_guest_arrivals02(self):
+        """Test 2: every stay file of a directory is processed by a pool of processes"""
+        self.writeStayFiles()
+        self.checkArrivals(self.my_hotel_manager.guestArrivals("kiosk", max_workers=2, use_processes=True))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_guest_arrivals03(self):
+        """Test 3: only the stay files that match the glob pattern are processed"""
+        self.writeStayFiles()
+        arrivals = self.my_hotel_manager.guestArrivals(os.path.join("kiosk", "stay[12].json"))
+        self.assertEqual(sorted(arrivals), [os.path.join("kiosk", "stay1.json"), os.path.join("kiosk", "stay2.json")])
+        for room_key in arrivals.values():
+            self.assertEqual(len(room_key), 64)
+
+    def test_guest_arrivals04(self):
+        """Test 4: a directory without stay files does not process anything"""
+        self.assertEqual(self.my_hotel_manager.guestArrivals("kiosk"), {})
@@ -1,22 +1,34 @@
+import json
 import os
+import tempfile
 from unittest import TestCase, mock
 from freezegun import freeze_time
 from datetime import datetime
-from src.main.python.UC3MTravel.HotelManager import HotelManager
-from src.main.python.UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+
+# guestArrival signs the stays with SHA-256, so the room keys are 64 hexadecimal characters long
+ROOM_KEY = "400f35f55fc2be1b5022aec0e2509cd53ca6cd9017e6e5da4cfe375d18758617"
+OTHER_ROOM_KEY = "5a3bd11c6e2cd0a7f2b0c3b8a1e8f9d4c6b7a2e1f0d9c8b7a6e5f4d3c2b1a0f9"
+
 
 class TestGuestCheckout(TestCase):
 
     def setUp(self):
-        self.hotel_manager = HotelManager()
+        # Every test works on its own empty store, in which the processed stays are written by saveStay
+        self.storage_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage_root.cleanup)
+        self.hotel_manager = HotelManager(storage_root=self.storage_root.name)
+
+    def saveStay(self, room_key: str, departure):
+        """Stores a processed stay with the given departure, as guestArrival does"""
+        self.hotel_manager.storage.saveStays({room_key: {"departure": departure}})
 
     @freeze_time("2024-01-07")
     def test_guest_checkout_valid(self):
         """ TC1: Valid checkout with correct room key and departure date"""
-        room_key = "400f35f55fc2be1b5022aec0e2509cd53ca6cd9017e6e5da4cfe375d18758617"
-        with mock.patch("os.path.exists", return_value=True), \
-            mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "07/01/2024 12:00:00"}')):
-            self.assertTrue(self.hotel_manager.guest_checkout(room_key))
+        self.saveStay(ROOM_KEY, "07/01/2024 12:00:00")
+        self.assertTrue(self.hotel_manager.guest_checkout(ROOM_KEY))
 
     @freeze_time("2024-01-07")
     def test_guest_checkout_invalid_room_key_format(self):
@@ -29,80 +41,89 @@ class TestGuestCheckout(TestCase):
     @freeze_time("2024-01-07")
     def test_guest_checkout_room_key_not_found(self):
         """ TC3: Room key not found in processed stays store"""
-        room_key = "400f35f55fc2be1b5022aec0e2509cd53ca6cd9017e6e5da4cfe375d18758617"
-        with mock.patch("os.path.exists", return_value=False):
-            with self.assertRaises(HotelManagementException) as context:
-                self.hotel_manager.guest_checkout(room_key)
+        with self.assertRaises(HotelManagementException) as context:
+            self.hotel_manager.guest_checkout(ROOM_KEY)
         self.assertEqual(str(context.exception), "Room key not found in processed stays store.")
 
     @freeze_time("2024-01-08")
     def test_guest_checkout_invalid_departure_date(self):
         """ TC4: Invalid departure date (not today)"""
-        room_key = "400f35f55fc2be1b5022aec0e2509cd53ca6cd9017e6e5da4cfe375d18758617"
-        with mock.patch("os.path.exists", return_value=True), \
-             mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "07/01/2024 12:00:00"}')):
-            with self.assertRaises(HotelManagementException) as context:
-                self.hotel_manager.guest_checkout(room_key)
+        self.saveStay(ROOM_KEY, "07/01/2024 12:00:00")
+        with self.assertRaises(HotelManagementException) as context:
+            self.hotel_manager.guest_checkout(ROOM_KEY)
         self.assertEqual(str(context.exception), "Departure date is not valid.")
 
     @freeze_time("2024-01-07")
     def test_guest_checkout_room_key_data_mismatch(self):
         """ TC5: Room key exists but data mismatch"""
-        room_key = "valid_md5_but_mismatch_data"
-        with mock.patch("os.path.exists", return_value=True), \
-                mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "06/01/2024 12:00:00"}')):
-            with self.assertRaises(HotelManagementException) as context:
-                self.hotel_manager.guest_checkout(room_key)
+        self.saveStay(ROOM_KEY, "06/01/2024 12:00:00")
+        with self.assertRaises(HotelManagementException) as context:
+            self.hotel_manager.guest_checkout(ROOM_KEY)
         self.assertIn("Departure date is not valid.", str(context.exception))
 
     @freeze_time("2024-01-07")
     def test_guest_checkout_file_read_exception(self):
         """ TC6: Exception raised due to inability to read the stay file"""
-        room_key = "valid_md5_hash_causes_read_exception"
-        with mock.patch("os.path.exists", return_value=True), \
-                mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "07/01/2024 12:00:00"}')) as mock_file:
-            mock_file.side_effect = Exception("Read error")
+        self.saveStay(ROOM_KEY, "07/01/2024 12:00:00")
+        with mock.patch("builtins.open", side_effect=Exception("Read error")):
             with self.assertRaises(Exception) as context:
-                self.hotel_manager.guest_checkout(room_key)
+                self.hotel_manager.guest_checkout(ROOM_KEY)
         self.assertEqual("Read error", str(context.exception))
 
     @freeze_time("2024-01-07")
     def test_guest_checkout_file_write_exception(self):
         """ TC7: Exception raised due to inability to write to the checkout file"""
-        room_key = "valid_md5_hash_causes_write_exception"
-        with mock.patch("os.path.exists", return_value=True), \
-                mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "07/01/2024 12:00:00"}')):
-            with mock.patch("json.dump") as mock_json_dump:
-                mock_json_dump.side_effect = Exception("Write error")
-                with self.assertRaises(Exception) as context:
-                    self.hotel_manager.saveDepartureData(room_key, {"departure_date": "07/01/2024"})
+        with mock.patch("json.dump") as mock_json_dump:
+            mock_json_dump.side_effect = Exception("Write error")
+            with self.assertRaises(Exception) as context:
+                self.hotel_manager.saveDepartureData(ROOM_KEY, {"departure_date": "07/01/2024"})
         self.assertEqual("Write error", str(context.exception))
+        # The checkout is not left half written
+        self.assertEqual(os.listdir(self.hotel_manager.getJsonDirectory("checkouts_store")), [])
 
     @freeze_time("2024-01-07")
     def test_room_key_format_specificity_invalid(self):
-        """ TC12: Room key is a valid MD5 hash but does not correspond to any booking in the system"""
-        room_key = "valid_md5_no_booking"
-        with mock.patch("os.path.exists", return_value=False):
-            with self.assertRaises(HotelManagementException) as context:
-                self.hotel_manager.guest_checkout(room_key)
+        """ TC12: Room key is a valid SHA-256 hash but does not correspond to any booking in the system"""
+        self.saveStay(ROOM_KEY, "07/01/2024 12:00:00")
+        with self.assertRaises(HotelManagementException) as context:
+            self.hotel_manager.guest_checkout(OTHER_ROOM_KEY)
         self.assertIn("Room key not found in processed stays store", str(context.exception))
 
     @freeze_time("2024-01-07")
     def test_departure_date_format_invalid(self):
         """ TC13: Departure date is incorrectly formatted"""
-        room_key = "valid_md5_incorrect_date_format"
-        with mock.patch("os.path.exists", return_value=True), \
-                mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "07-01-2024"}')):
-            with self.assertRaises(HotelManagementException) as context:
-                self.hotel_manager.guest_checkout(room_key)
+        self.saveStay(ROOM_KEY, "07-01-2024")
+        with self.assertRaises(HotelManagementException) as context:
+            self.hotel_manager.guest_checkout(ROOM_KEY)
         self.assertIn("Departure date is not valid.", str(context.exception))
 
     @freeze_time("2024-01-07")
     def test_guest_checkout_departure_date_in_past(self):
         """ TC14: Departure date is in the past"""
-        room_key = "valid_md5_with_past_departure"
-        with mock.patch("os.path.exists", return_value=True), \
-                mock.patch("builtins.open", mock.mock_open(read_data='{"departure": "06/01/2024 00:00:00"}')):
-            with self.assertRaises(HotelManagementException) as context:
-                self.hotel_manager.guest_checkout(room_key)
-        self.assertIn("Departure date is in past.", str(context.exception))
\ No newline at end of file
+        self.saveStay(ROOM_KEY, datetime(2024, 1, 6).timestamp())
+        with self.assertRaises(HotelManagementException) as context:
+            self.hotel_manager.guest_checkout(ROOM_KEY)
+        self.assertIn("Departure date is not valid.", str(context.exception))
+
+    def test_guest_checkout_stay_processed_by_guest_arrival(self):
+        """ TC15: Checkout on the departure day of a stay processed by guestArrival"""
+        with tempfile.TemporaryDirectory() as storage_root:
+            hotel_manager = HotelManager(storage_root=storage_root)
+            with freeze_time("2024-07-01"):
+                localizer = hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                          name_surname="John Smith",
+                                                          id_card="12345678Z",
+                                                          phone_number="612345789",
+                                                          room_type="single",
+                                                          arrival_date="01/07/2024",
+                                                          num_days=2)
+                stay_file_path = os.path.join(hotel_manager.getJsonDirectory("stays_store"), "arrival.json")
+                with open(stay_file_path, "w", encoding="utf-8") as stay_file:
+                    json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+                room_key = hotel_manager.guestArrival("arrival.json")
+            with freeze_time("2024-07-03"):
+                self.assertTrue(hotel_manager.guest_checkout(room_key))
+            checkout_path = os.path.join(hotel_manager.getJsonDirectory("checkouts_store"),
+                                         room_key + "_checkout.json")
+            with open(checkout_path, "r", encoding="utf-8") as checkout_file:
+                self.assertEqual(json.load(checkout_file)["departure_date"], "03/07/2024")
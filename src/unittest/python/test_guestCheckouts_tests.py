@@ -0,0 +1,112 @@
+""" Module that tests the guest_checkouts() function"""
+from unittest import TestCase
+from unittest.mock import patch
+from datetime import datetime
+import json
+import os
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelMetrics import MetricsAggregator
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+
+class TestGuestCheckouts(TestCase):
+    """Test cases for guest_checkouts (Function 3 for a batch of room keys)"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def arrive(hotel_manager: HotelManager, stays: list):
+        """Makes a reservation for each (id_card, num_days) of stays and processes its arrival on 01/07/2024, returning
+        the room_key of each id_card"""
+        room_keys = {}
+        with freeze_time("2024-07-01"):
+            for id_card, num_days in stays:
+                localizer = hotel_manager.roomReservation("5105105105105100", "John Smith", id_card, "612345789",
+                                                          "single", "01/07/2024", num_days)
+                with open(os.path.join(hotel_manager.getJsonDirectory("stays_store"), "arrival.json"), "w",
+                          encoding="utf-8") as stay_file:
+                    json.dump({"Localizer": localizer, "IdCard": id_card}, stay_file)
+                room_keys[id_card] = hotel_manager.guestArrival("arrival.json")
+        return room_keys
+
+    def test_guest_checkouts01(self):
+        """Test 1: every room_key obtains its own outcome, and the valid ones are checked out"""
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        room_keys = self.arrive(hotel_manager, [("12345678Z", 2), ("87654321X", 2), ("00000001R", 3)])
+        with freeze_time("2024-07-03 11:00:00"):
+            outcomes = hotel_manager.guest_checkouts([room_keys["12345678Z"], "1234", "a" * 64, room_keys["00000001R"],
+                                                      room_keys["87654321X"], room_keys["12345678Z"]])
+        self.assertEqual(list(outcomes), [room_keys["12345678Z"], "1234", "a" * 64, room_keys["00000001R"],
+                                          room_keys["87654321X"]])
+        self.assertTrue(outcomes[room_keys["12345678Z"]])
+        self.assertTrue(outcomes[room_keys["87654321X"]])
+        self.assertEqual(outcomes["1234"].message, "Invalid room key format.")
+        self.assertEqual(outcomes["a" * 64].message, "Room key not found in processed stays store.")
+        self.assertEqual(outcomes[room_keys["00000001R"]].message, "Departure date is not valid.")
+        for id_card in ["12345678Z", "87654321X"]:
+            with open(os.path.join(hotel_manager.getJsonDirectory("checkouts_store"),
+                                   room_keys[id_card] + "_checkout.json"), "r", encoding="utf-8") as checkout_file:
+                self.assertEqual(json.load(checkout_file), {"room_key": room_keys[id_card],
+                                                            "departure_date": "03/07/2024"})
+        self.assertEqual(hotel_manager.occupancyOn("02/07/2024"), {"single": 1})
+
+    def test_guest_checkouts02(self):
+        """Test 2: the checkouts of a batch are written in a single commit, and the outcomes are counted"""
+        metrics = MetricsAggregator()
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, metrics=metrics)
+        room_keys = self.arrive(hotel_manager, [("12345678Z", 1), ("87654321X", 1)])
+        with freeze_time("2024-07-02"), patch.object(hotel_manager.storage, "saveRecords",
+                                                     wraps=hotel_manager.storage.saveRecords) as save_records:
+            outcomes = hotel_manager.guest_checkouts(list(room_keys.values()) + ["b" * 64])
+        save_records.assert_called_once()
+        self.assertEqual(list(save_records.call_args.args[1]), list(room_keys.values()))
+        self.assertEqual(list(outcomes.values())[:2], [True, True])
+        self.assertEqual(metrics.snapshot()["counters"]["guest_checkouts"], {"accepted": 2, "rejected": 1})
+
+    def test_guest_checkouts03(self):
+        """Test 3: the stays of the sqlite storage are looked up in batches, and departures stored as
+        "DD/MM/YYYY HH:MM:SS" strings are also accepted"""
+        storage = SqliteStorage(self.temp_dir.name)
+        hotel_manager = HotelManager(storage=storage)
+        departure = datetime.timestamp(datetime(2024, 7, 2, 12))
+        stays = {f"{number:064x}": {"idCard": "12345678Z", "localizer": "0" * 32, "departure": departure}
+                 for number in range(1200)}
+        stays["f" * 64] = {"idCard": "12345678Z", "localizer": "0" * 32, "departure": "02/07/2024 12:00:00"}
+        stays["e" * 64] = {"idCard": "12345678Z", "localizer": "0" * 32, "departure": "2024-07-02"}
+        storage.saveStays(stays)
+        with freeze_time("2024-07-02"):
+            outcomes = hotel_manager.guest_checkouts(list(stays) + ["d" * 64])
+        self.assertEqual(sum(1 for outcome in outcomes.values() if outcome is True), 1201)
+        self.assertEqual(outcomes["e" * 64].message, "Departure date is not valid.")
+        self.assertEqual(outcomes["d" * 64].message, "Room key not found in processed stays store.")
+        self.assertEqual(sum(1 for _ in storage.iterRecords("checkouts")), 1201)
+        storage.close()
+
+    def test_guest_checkouts04(self):
+        """Test 4: in write-behind mode the stays that have not been stored yet are also checked out"""
+        with HotelManager(storage_root=self.temp_dir.name, write_behind=True, flush_interval=60) as hotel_manager:
+            room_keys = self.arrive(hotel_manager, [("12345678Z", 1)])
+            with freeze_time("2024-07-02"):
+                outcomes = hotel_manager.guest_checkouts([room_keys["12345678Z"]])
+            self.assertEqual(outcomes, {room_keys["12345678Z"]: True})
+            self.assertEqual(len(hotel_manager.stay_buffer), 1)
+        # Closing the HotelManager stores the stay
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        self.assertEqual(hotel_manager.storage.loadStay(room_keys["12345678Z"])["idCard"], "12345678Z")
+
+    def test_guest_checkouts05(self):
+        """Test 5: a room_key that is not a string, even an unhashable one, is rejected without stopping the rest"""
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        room_keys = self.arrive(hotel_manager, [("12345678Z", 1)])
+        with freeze_time("2024-07-02"):
+            outcomes = hotel_manager.guest_checkouts([["x"], None, ("a" * 64,), room_keys["12345678Z"], ["x"]])
+        self.assertEqual(list(outcomes), ["['x']", None, ("a" * 64,), room_keys["12345678Z"]])
+        for room_key in ["['x']", None, ("a" * 64,)]:
+            self.assertEqual(outcomes[room_key].message, "Invalid room key format.")
+        self.assertTrue(outcomes[room_keys["12345678Z"]])
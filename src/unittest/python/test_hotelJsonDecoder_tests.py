@@ -0,0 +1,66 @@
+""" Module that tests the json schemas of HotelJsonDecoder"""
+from unittest import TestCase
+import json
+from UC3MTravel.HotelJsonDecoder import PROCESSED_STAY_SCHEMA, RESERVATION_SCHEMA, STAY_REQUEST_SCHEMA, StayRequest
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelReservation import HotelReservation
+from UC3MTravel.HotelStay import HotelStay
+
+
+class TestHotelJsonDecoder(TestCase):
+    """Test cases for the decoding of the json records"""
+    RESERVATION = {"id_card": "12345678Z",
+                   "name_surname": "John Smith",
+                   "credit_card": "5105105105105100",
+                   "phone_number": "612345789",
+                   "reservation_date": 1719792000.0,
+                   "arrival_date": "01/07/2024",
+                   "num_days": 1,
+                   "room_type": "single",
+                   "localizer": "385148f30bfe0c80599f7c844216578a"}
+
+    def test_hotel_json_decoder01(self):
+        """Test 1: a stay file is parsed and decoded into a StayRequest"""
+        stay_request = STAY_REQUEST_SCHEMA.decodeJson(
+            b'{"Localizer": "385148f30bfe0c80599f7c844216578a", "IdCard": "12345678Z"}')
+        self.assertEqual(stay_request, StayRequest("12345678Z", "385148f30bfe0c80599f7c844216578a"))
+
+    def test_hotel_json_decoder02(self):
+        """Test 2: a document that is not valid json, is not an object or misses a key has a wrong structure, and a
+        value of another type is not valid"""
+        for content in ['{"Localizer": ', '["12345678Z"]', '{"IdCard": "12345678Z"}']:
+            with self.assertRaises(HotelManagementException) as cm:
+                STAY_REQUEST_SCHEMA.decodeJson(content)
+            self.assertEqual(cm.exception.message, "The JSON does not have the expected structure.")
+        with self.assertRaises(HotelManagementException) as cm:
+            STAY_REQUEST_SCHEMA.decodeJson('{"Localizer": "385148f30bfe0c80599f7c844216578a", "IdCard": 123456789}')
+        self.assertEqual(cm.exception.message, "The JSON data does not have valid values.")
+
+    def test_hotel_json_decoder03(self):
+        """Test 3: a stored reservation is decoded into a HotelReservation with the stored localizer"""
+        reservation = RESERVATION_SCHEMA.decode(json.loads(json.dumps(self.RESERVATION)))
+        self.assertIsInstance(reservation, HotelReservation)
+        self.assertEqual(reservation.reservation_date, 1719792000.0)
+        self.assertEqual(reservation.localizer, "385148f30bfe0c80599f7c844216578a")
+
+    def test_hotel_json_decoder04(self):
+        """Test 4: a stored reservation without a key, or with a value of another type, is rejected"""
+        for key, value in [("num_days", "1"), ("num_days", True), ("reservation_date", "01/07/2024"),
+                           ("room_type", None)]:
+            with self.assertRaises(HotelManagementException) as cm:
+                RESERVATION_SCHEMA.decode(dict(self.RESERVATION, **{key: value}))
+            self.assertEqual(cm.exception.message, "JSON Decode Error - Invalid JSON Value")
+        data = dict(self.RESERVATION)
+        del data["localizer"]
+        with self.assertRaises(HotelManagementException) as cm:
+            RESERVATION_SCHEMA.decode(data)
+        self.assertEqual(cm.exception.message, "JSON Decode Error - Invalid JSON Key")
+
+    def test_hotel_json_decoder05(self):
+        """Test 5: a stored processed stay is decoded into a HotelStay whose room_key is computed again"""
+        stay = HotelStay("12345678Z", "385148f30bfe0c80599f7c844216578a", 1, "single")
+        data = {"alg": "SHA-256", "type": stay.type, "idCard": stay.id_card, "localizer": stay.localizer,
+                "arrival": stay.arrival, "departure": stay.departure, "room_key": "0" * 64}
+        decoded_stay = PROCESSED_STAY_SCHEMA.decode(data)
+        self.assertIsInstance(decoded_stay, HotelStay)
+        self.assertEqual(decoded_stay.room_key, stay.room_key)
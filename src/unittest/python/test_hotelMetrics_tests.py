@@ -0,0 +1,96 @@
+""" Module that tests the instrumentation of the HotelManager operations"""
+import json
+import os
+import tempfile
+from unittest import TestCase
+from datetime import datetime
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelMetrics import MetricsAggregator, PrometheusMetrics, NO_METRICS
+
+
+class TestHotelMetrics(TestCase):
+    """Test cases for the metrics sinks of HotelManager"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def reserve(self, hotel_manager: HotelManager, credit_card: str = "5105105105105100"):
+        """Makes a reservation with the given HotelManager"""
+        return hotel_manager.roomReservation(credit_card=credit_card,
+                                             name_surname="John Smith",
+                                             id_card="12345678Z",
+                                             phone_number="612345789",
+                                             room_type="single",
+                                             arrival_date="01/07/2024",
+                                             num_days=1)
+
+    def test_hotel_metrics01(self):
+        """Test 1: instrumentation is disabled by default"""
+        self.assertIs(HotelManager(storage_root=self.temp_dir.name).metrics, NO_METRICS)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_hotel_metrics02(self):
+        """Test 2: the stages and the storage counters of roomReservation and guestArrival are aggregated"""
+        metrics = MetricsAggregator()
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, metrics=metrics)
+        localizer = self.reserve(hotel_manager)
+        stay_file_path = os.path.join(hotel_manager.getJsonDirectory("stays_store"), "arrival.json")
+        with open(stay_file_path, "w", encoding="utf-8") as stay_file:
+            json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+        hotel_manager.guestArrival("arrival.json")
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(set(snapshot["stages"]["roomReservation"]), {"total", "validation", "localizer", "write"})
+        self.assertEqual(set(snapshot["stages"]["guestArrival"]),
+                         {"total", "read_stay", "read_reservation", "localizer", "room_key", "write"})
+        self.assertEqual(snapshot["stages"]["guestArrival"]["total"]["count"], 1)
+        self.assertEqual(snapshot["counters"]["storage"]["files_written"], 2)
+        self.assertEqual(snapshot["counters"]["storage"]["files_opened"], 1)
+        self.assertGreater(snapshot["counters"]["storage"]["bytes_read"], 0)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_hotel_metrics03(self):
+        """Test 3: an operation that raises an exception is counted as an error"""
+        metrics = MetricsAggregator()
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, metrics=metrics)
+        with self.assertRaises(HotelManagementException):
+            self.reserve(hotel_manager, credit_card="5105105105105101")
+        counters = metrics.snapshot()["counters"]["roomReservation"]
+        self.assertEqual(counters["total_errors"], 1)
+        self.assertEqual(counters["validation_errors"], 1)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_hotel_metrics04(self):
+        """Test 4: the measures are dumped in the Prometheus text format"""
+        metrics_path = os.path.join(self.temp_dir.name, "metrics.prom")
+        metrics = PrometheusMetrics(metrics_path)
+        self.reserve(HotelManager(storage_root=self.temp_dir.name, metrics=metrics))
+        metrics.dump()
+        with open(metrics_path, "r", encoding="utf-8") as metrics_file:
+            lines = metrics_file.read().splitlines()
+        self.assertIn('uc3m_travel_stage_seconds_count{operation="roomReservation",stage="total"} 1', lines)
+        self.assertIn('uc3m_travel_events_total{operation="storage",counter="files_written"} 1', lines)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_hotel_metrics05(self):
+        """Test 5: every sample follows the TYPE line of its own metric family, and each family is written once"""
+        metrics = PrometheusMetrics(os.path.join(self.temp_dir.name, "metrics.prom"))
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, metrics=metrics)
+        self.reserve(hotel_manager)
+        with self.assertRaises(HotelManagementException):
+            self.reserve(hotel_manager)
+        families = []
+        suffixes = {"summary": ("_count", "_sum"), "gauge": ("",), "counter": ("",)}
+        for line in metrics.render().splitlines():
+            if line.startswith("# TYPE "):
+                _, _, family, metric_type = line.split(" ")
+                families.append(family)
+                continue
+            sample_name = line[:line.index("{")]
+            self.assertIn(sample_name, [families[-1] + suffix for suffix in suffixes[metric_type]])
+        self.assertEqual(families, ["uc3m_travel_stage_seconds", "uc3m_travel_stage_seconds_max",
+                                    "uc3m_travel_events_total"])
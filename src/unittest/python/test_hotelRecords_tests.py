@@ -0,0 +1,56 @@
+""" Module that tests the HotelReservation and HotelStay records"""
+from unittest import TestCase
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelReservation import HotelReservation
+from UC3MTravel.HotelStay import HotelStay
+
+
+class TestHotelRecords(TestCase):
+    """Test cases for the records built from the stored jsons"""
+    def setUp(self):
+        self.my_hotel_manager = HotelManager()
+
+    def test_hotel_records01(self):
+        """Test 1: a reservation built from its stored json has the stored localizer"""
+        data = self.my_hotel_manager.storage.loadReservation("00000000T")
+        reservation = HotelReservation.fromJsonData(data)
+        self.assertEqual(reservation.localizer, "cdaeb5334e828615221afb3f4aed4607")
+        self.assertEqual(reservation.reservation_date, 1719792000.0)
+        self.assertFalse(hasattr(reservation, "__dict__"))
+
+    def test_hotel_records02(self):
+        """Test 2: a stay built from its stored json has the stored room_key"""
+        room_key = "9f75f184df311e0c5ab5595ab4f66ec6021eda13b1c2db1ab5e337cb7992b832"
+        stays = HotelStay.fromJsonRecords([self.my_hotel_manager.storage.loadStay(room_key)])
+        self.assertEqual(stays[0].room_key, room_key)
+        self.assertEqual(stays[0].departure, 1719878400.0)
+        self.assertFalse(hasattr(stays[0], "__dict__"))
+
+    def test_hotel_records03(self):
+        """Test 3: the attributes of the records cannot be created outside of their slots"""
+        reservation = HotelReservation("12345678Z", "5105105105105100", "John Smith", "612345789", "single",
+                                       "01/07/2024", 1)
+        with self.assertRaises(AttributeError):
+            reservation.extra = "value"  # pylint: disable=assigning-non-slot
+
+    def test_hotel_records04(self):
+        """Test 4: the localizer is computed once and again after a field of the reservation changes"""
+        reservation = HotelReservation.fromJsonData(self.my_hotel_manager.storage.loadReservation("00000000T"))
+        localizer = reservation.localizer
+        self.assertIs(reservation.localizer, localizer)
+        reservation.num_days = 2
+        self.assertNotEqual(reservation.localizer, localizer)
+        reservation.num_days = 1
+        self.assertEqual(reservation.localizer, localizer)
+
+    def test_hotel_records05(self):
+        """Test 5: the room key is computed once and again after the departure or the localizer changes"""
+        room_key = "9f75f184df311e0c5ab5595ab4f66ec6021eda13b1c2db1ab5e337cb7992b832"
+        stay = HotelStay.fromJsonData(self.my_hotel_manager.storage.loadStay(room_key))
+        self.assertIs(stay.room_key, stay.room_key)
+        stay.departure = stay.departure + 24 * 60 * 60
+        self.assertNotEqual(stay.room_key, room_key)
+        stay.departure = 1719878400.0
+        self.assertEqual(stay.room_key, room_key)
+        stay.localizer = "385148f30bfe0c80599f7c844216578a"
+        self.assertNotEqual(stay.room_key, room_key)
@@ -0,0 +1,107 @@
+""" Module that tests HotelManager using the journal storage backend"""
+import json
+import os
+import tempfile
+from unittest import TestCase
+from datetime import datetime
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JournalStorage import JournalStorage
+
+
+class TestJournalStorage(TestCase):
+    """Test cases for roomReservation and guestArrival backed by JournalStorage"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage = JournalStorage(self.temp_dir.name)
+        self.my_hotel_manager = HotelManager(storage=self.storage)
+
+    def tearDown(self):
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def reservation(id_card: str):
+        """Returns a valid reservation record for the given client"""
+        return {"credit_card": "5105105105105100",
+                "name_surname": "John Smith",
+                "id_card": id_card,
+                "phone_number": "612345789",
+                "room_type": "single",
+                "arrival_date": "01/07/2024",
+                "num_days": 1}
+
+    def reopen(self):
+        """Closes the journal and opens it again, so the offsets are rebuilt from the file"""
+        self.storage.close()
+        self.storage = JournalStorage(self.temp_dir.name)
+        self.my_hotel_manager = HotelManager(storage=self.storage)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_journal_storage01(self):
+        """Test 1: a batch of reservations is appended as one compact line per reservation"""
+        self.my_hotel_manager.roomReservations([self.reservation("12345678Z"), self.reservation("87654321X")])
+        with open(self.storage.journal_path, "r", encoding="utf-8") as journal:
+            lines = journal.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])["event"], "reservation")
+        self.assertEqual(json.loads(lines[1])["key"], "87654321X")
+        self.assertNotIn(": ", lines[0])
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_journal_storage02(self):
+        """Test 2: the reservations are found again after the journal is reopened"""
+        localizer = self.my_hotel_manager.roomReservation(**self.reservation("12345678Z"))
+        self.reopen()
+        self.assertEqual(self.storage.loadReservation("12345678Z")["localizer"], localizer)
+        with self.assertRaises(HotelManagementException) as ex:
+            self.my_hotel_manager.roomReservation(**self.reservation("12345678Z"))
+        self.assertEqual(ex.exception.message, "a client with specified id_card already has a reservation")
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_journal_storage03(self):
+        """Test 3: guestArrival reads the reservation and appends the processed stay"""
+        localizer = self.my_hotel_manager.roomReservation(**self.reservation("12345678Z"))
+        stay_file_path = os.path.join(self.my_hotel_manager.getJsonDirectory("stays_store"), "arrival.json")
+        with open(stay_file_path, "w", encoding="utf-8") as stay_file:
+            json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+
+        room_key = self.my_hotel_manager.guestArrival("arrival.json")
+        self.reopen()
+        self.assertEqual(self.storage.loadStay(room_key)["localizer"], localizer)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_journal_storage04(self):
+        """Test 4: an incomplete last line is discarded when the journal is reopened"""
+        self.my_hotel_manager.roomReservation(**self.reservation("12345678Z"))
+        with open(self.storage.journal_path, "ab") as journal:
+            journal.write(b'{"event":"reservation","key":"87654321X","da')
+        self.reopen()
+        self.assertTrue(self.storage.isIdCardReserved("12345678Z"))
+        self.assertFalse(self.storage.isIdCardReserved("87654321X"))
+        self.my_hotel_manager.roomReservation(**self.reservation("87654321X"))
+        self.reopen()
+        self.assertTrue(self.storage.isIdCardReserved("87654321X"))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_journal_storage05(self):
+        """Test 5: a corrupt line in the middle of the journal raises an exception instead of discarding the lines that
+        follow it"""
+        self.my_hotel_manager.roomReservations([self.reservation("12345678Z"), self.reservation("87654321X"),
+                                                self.reservation("00000000T")])
+        self.storage.close()
+        with open(self.storage.journal_path, "rb") as journal:
+            lines = journal.readlines()
+        for corrupt_line in [lines[1].replace(b'"reservation"', b'"unknown"'), b'["not", "an", "object"]\n',
+                             b'{"event":"reservation"\n']:
+            content = lines[0] + corrupt_line + lines[2]
+            with open(self.storage.journal_path, "wb") as journal:
+                journal.write(content)
+            with self.assertRaises(HotelManagementException) as ex:
+                JournalStorage(self.temp_dir.name)
+            self.assertEqual(ex.exception.message, "Corrupt journal line at offset " + str(len(lines[0])))
+            with open(self.storage.journal_path, "rb") as journal:
+                self.assertEqual(journal.read(), content)
+        # The storage opened by setUp is closed again by tearDown
+        self.storage = JournalStorage(self.temp_dir.name, journal_name="other_journal.jsonl")
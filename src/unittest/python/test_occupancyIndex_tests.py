@@ -0,0 +1,119 @@
+""" Module that tests the departures and occupancy reports of HotelManager"""
+from unittest import TestCase
+from datetime import date
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+
+class TestOccupancyIndex(TestCase):
+    """Test cases for departuresOn and occupancyOn"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.my_hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        self.room_keys = {}
+        # 2 clients arrive on 01/07/2024: a single room for 2 days and a double room for 1 day
+        with freeze_time("2024-07-01"):
+            for id_card, room_type, num_days in [("12345678Z", "single", 2), ("87654321X", "double", 1)]:
+                localizer = self.my_hotel_manager.roomReservation("5105105105105100", "John Smith", id_card,
+                                                                  "612345789", room_type, "01/07/2024", num_days)
+                with open(os.path.join(self.my_hotel_manager.getJsonDirectory("stays_store"), "arrival.json"), "w",
+                          encoding="utf-8") as stay_file:
+                    json.dump({"Localizer": localizer, "IdCard": id_card}, stay_file)
+                self.room_keys[id_card] = self.my_hotel_manager.guestArrival("arrival.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_occupancy_index01(self):
+        """Test 1: the departures of a day are the stays that leave that day"""
+        departures = self.my_hotel_manager.departuresOn("03/07/2024")
+        self.assertEqual([stay["room_key"] for stay in departures], [self.room_keys["12345678Z"]])
+        self.assertEqual(departures[0]["type"], "single")
+        self.assertFalse(departures[0]["checked_out"])
+        self.assertEqual([stay["idCard"] for stay in self.my_hotel_manager.departuresOn("02/07/2024")],
+                         ["87654321X"])
+        self.assertEqual(self.my_hotel_manager.departuresOn("04/07/2024"), [])
+
+    def test_occupancy_index02(self):
+        """Test 2: the occupied rooms of a day are the stays that have arrived and have not left yet"""
+        self.assertEqual(self.my_hotel_manager.occupancyOn("01/07/2024"), {"single": 1, "double": 1})
+        self.assertEqual(self.my_hotel_manager.occupancyOn("02/07/2024"), {"single": 1})
+        self.assertEqual(self.my_hotel_manager.occupancyOn("30/06/2024"), {})
+        with freeze_time("2024-07-01"):
+            self.assertEqual(self.my_hotel_manager.occupancyOn(), {"single": 1, "double": 1})
+
+    def test_occupancy_index03(self):
+        """Test 3: a checkout is found by the reports, and another HotelManager of the same stores finds the same
+        stays"""
+        self.my_hotel_manager.occupancyOn("01/07/2024")
+        with freeze_time("2024-07-02"):
+            self.my_hotel_manager.guest_checkout(self.room_keys["87654321X"])
+        self.assertTrue(self.my_hotel_manager.departuresOn("02/07/2024")[0]["checked_out"])
+        self.assertEqual(self.my_hotel_manager.occupancyOn("01/07/2024"), {"single": 1})
+
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        self.assertEqual(hotel_manager.occupancyOn("01/07/2024"), {"single": 1})
+        self.assertEqual(hotel_manager.departuresOn("02/07/2024"), self.my_hotel_manager.departuresOn("02/07/2024"))
+
+    def test_occupancy_index04(self):
+        """Test 4: a day that is not a "DD/MM/YYYY" date is rejected"""
+        for day in ["2024-07-01", "32/07/2024", None]:
+            with self.assertRaises(HotelManagementException) as cm:
+                self.my_hotel_manager.departuresOn(day)
+            self.assertEqual(cm.exception.message, "invalid date format \"DD/MM/YYYY\"")
+
+    def test_occupancy_index05(self):
+        """Test 5: the stays and checkouts written by another HotelManager after the reports were loaded are found,
+        with every storage"""
+        self.assertEqual(self.my_hotel_manager.occupancyOn("01/07/2024"), {"single": 1, "double": 1})
+        stay = self.my_hotel_manager.storage.loadStay(self.room_keys["12345678Z"])
+        for storage_name in ["json", "sqlite", "journal"]:
+            storage_root = os.path.join(self.temp_dir.name, storage_name)
+            storage = {"json": JsonStorage, "sqlite": SqliteStorage, "journal": JournalStorage}[storage_name](
+                storage_root)
+            hotel_manager = HotelManager(storage=storage)
+            self.assertEqual(hotel_manager.occupancyOn("01/07/2024"), {})
+            other_storage = storage if storage_name == "journal" else type(storage)(storage_root)
+            other_storage.saveStays({stay["room_key"]: stay})
+            self.assertEqual(hotel_manager.occupancyOn("01/07/2024"), {"single": 1})
+            self.assertEqual([departure["room_key"] for departure in hotel_manager.departuresOn("03/07/2024")],
+                             [stay["room_key"]])
+            other_storage.saveCheckout(stay["room_key"], {"room_key": stay["room_key"],
+                                                          "departure_date": "03/07/2024"})
+            self.assertEqual(hotel_manager.occupancyOn("01/07/2024"), {})
+            self.assertTrue(hotel_manager.departuresOn("03/07/2024")[0]["checked_out"])
+            if storage_name != "json":
+                for open_storage in {storage, other_storage}:
+                    open_storage.close()
+
+    def test_occupancy_index06(self):
+        """Test 6: the stays stored before the stores indexed them by their departure date are indexed when the
+        stores are opened or first queried"""
+        stay = self.my_hotel_manager.storage.loadStay(self.room_keys["12345678Z"])
+        database_path = os.path.join(self.temp_dir.name, "sqlite", "hotel_store.db")
+        os.makedirs(os.path.dirname(database_path))
+        with sqlite3.connect(database_path) as connection:
+            connection.execute("CREATE TABLE stays (room_key TEXT PRIMARY KEY, id_card TEXT NOT NULL, "
+                               "localizer TEXT NOT NULL, data TEXT NOT NULL)")
+            connection.execute("INSERT INTO stays VALUES (?, ?, ?, ?)",
+                               (stay["room_key"], stay["idCard"], stay["localizer"], json.dumps(stay)))
+        connection.close()
+        storage = SqliteStorage(os.path.dirname(database_path))
+        self.assertEqual(list(storage.loadDepartures(date(2024, 7, 3), date(2024, 7, 3))), [stay["room_key"]])
+        storage.close()
+
+        shutil.rmtree(self.my_hotel_manager.getJsonDirectory("departures_index"))
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        self.assertEqual(hotel_manager.occupancyOn("01/07/2024"), {"single": 1, "double": 1})
+        self.assertEqual(sorted(os.listdir(hotel_manager.getJsonDirectory("departures_index"))),
+                         [".complete", "2024-07-02", "2024-07-03"])
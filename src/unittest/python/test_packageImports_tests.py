@@ -0,0 +1,84 @@
+""" Module that tests the lazy imports of the UC3MTravel package"""
+from unittest import TestCase
+import os
+import subprocess
+import sys
+import UC3MTravel
+
+
+def runPython(code: str, *options: str):
+    """Runs code in a new interpreter that can import the UC3MTravel package, and returns its standard output and
+    standard error"""
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(UC3MTravel.__file__)))
+    result = subprocess.run([sys.executable, *options, "-c", code], env=environment, capture_output=True, text=True,
+                            check=True)
+    return result.stdout, result.stderr
+
+
+def parseImportTimes(output: str):
+    """Returns {module: cumulative microseconds} from the output of -X importtime"""
+    import_times = {}
+    for line in output.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+class TestPackageImports(TestCase):
+    """Test cases for the lazy attributes of the UC3MTravel package"""
+    def test_package_imports01(self):
+        """Test 1: importing the package does not import any of its modules, nor the modules they use"""
+        output, _ = runPython("import sys\n"
+                              "before = set(sys.modules)\n"
+                              "import UC3MTravel\n"
+                              "print(*sorted(set(sys.modules) - before))")
+        imported = output.split()
+        self.assertIn("UC3MTravel", imported)
+        self.assertEqual([module for module in imported if module.startswith("UC3MTravel.")], [])
+        for module in ["json", "sqlite3", "threading", "concurrent.futures", "hashlib"]:
+            self.assertNotIn(module, imported)
+
+    def test_package_imports02(self):
+        """Test 2: measured with -X importtime, importing the package costs a small part of importing the
+        HotelManager"""
+        _, output = runPython("import UC3MTravel\nimport UC3MTravel.HotelManager", "-X", "importtime")
+        import_times = parseImportTimes(output)
+        self.assertIn("UC3MTravel.HotelManager", import_times)
+        self.assertLess(import_times["UC3MTravel"], import_times["UC3MTravel.HotelManager"] / 10)
+
+    def test_package_imports03(self):
+        """Test 3: every exported class is imported the first time it is used"""
+        output, _ = runPython("import sys\n"
+                              "import UC3MTravel\n"
+                              "print(UC3MTravel.RoomInventory.__name__, 'UC3MTravel.RoomInventory' in sys.modules,\n"
+                              "      'UC3MTravel.HotelManager' in sys.modules)")
+        self.assertEqual(output.split(), ["RoomInventory", "True", "False"])
+        for name in UC3MTravel.__all__:
+            value = getattr(UC3MTravel, name)
+            self.assertEqual(value.__name__, name)
+            self.assertIs(value, getattr(sys.modules[UC3MTravel.LAZY_ATTRIBUTES[name]], name))
+        self.assertTrue(set(UC3MTravel.__all__) <= set(dir(UC3MTravel)))
+        with self.assertRaises(AttributeError):
+            UC3MTravel.HotelManagerr  # pylint: disable=pointless-statement,no-member
+
+    def test_package_imports04(self):
+        """Test 4: importing a module of the package first does not hide its class"""
+        output, _ = runPython("import UC3MTravel.JsonStorage\n"
+                              "from UC3MTravel import JsonStorage, HotelJsonDecoder\n"
+                              "print(UC3MTravel.JsonStorage is JsonStorage, isinstance(JsonStorage, type),\n"
+                              "      HotelJsonDecoder.__name__)")
+        self.assertEqual(output.split(), ["True", "True", "UC3MTravel.HotelJsonDecoder"])
+
+    def test_package_imports05(self):
+        """Test 5: the classes are still exported after the HotelManager has imported their modules"""
+        output, _ = runPython("import UC3MTravel\n"
+                              "from UC3MTravel.HotelManager import HotelManager\n"
+                              "import UC3MTravel.JsonStorage\n"
+                              "from UC3MTravel import JsonStorage, RoomInventory\n"
+                              "print(isinstance(UC3MTravel.JsonStorage, type), JsonStorage.__module__,\n"
+                              "      isinstance(RoomInventory, type), type(UC3MTravel).__name__)")
+        self.assertEqual(output.split(), ["True", "UC3MTravel.JsonStorage", "True", "LazyPackage"])
@@ -0,0 +1,64 @@
+""" Module that tests the cache of reservations of JsonStorage"""
+from unittest import TestCase
+import tempfile
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.RecordCache import RecordCache
+
+
+class TestReservationCache(TestCase):
+    """Test cases for RecordCache and the reservations cached by JsonStorage"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage = JsonStorage(self.temp_dir.name, reservation_cache_size=2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def reservation(id_card: str, num_days: int = 1):
+        """Returns a stored reservation of the given client"""
+        return {"id_card": id_card, "name_surname": "John Smith", "credit_card": "5105105105105100",
+                "phone_number": "612345789", "reservation_date": 1719792000.0, "arrival_date": "01/07/2024",
+                "num_days": num_days, "room_type": "single", "localizer": "385148f30bfe0c80599f7c844216578a"}
+
+    def test_reservation_cache01(self):
+        """Test 1: the least recently used record is discarded when the cache is full"""
+        cache = RecordCache(2)
+        cache.putRecord("a", 1, "A")
+        cache.putRecord("b", 1, "B")
+        self.assertEqual(cache.getRecord("a", 1), "A")
+        cache.putRecord("c", 1, "C")
+        self.assertIsNone(cache.getRecord("b", 1))
+        self.assertEqual(cache.getRecord("c", 1), "C")
+        # A record read from another version of its file is not returned
+        self.assertIsNone(cache.getRecord("a", 2))
+        self.assertEqual(cache.stats(), {"size": 1, "max_size": 2, "hits": 2, "misses": 2, "evictions": 1,
+                                         "invalidations": 1})
+
+    def test_reservation_cache02(self):
+        """Test 2: a reservation read again is returned from the cache, as a copy"""
+        self.storage.saveReservations({"12345678Z": self.reservation("12345678Z")})
+        first = self.storage.loadReservation("12345678Z")
+        first["num_days"] = 5
+        self.assertEqual(self.storage.loadReservation("12345678Z"), self.reservation("12345678Z"))
+        stats = self.storage.reservation_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_reservation_cache03(self):
+        """Test 3: a reservation written through the storage, or by somebody else, is read again"""
+        self.storage.saveReservations({"12345678Z": self.reservation("12345678Z")})
+        self.storage.loadReservation("12345678Z")
+        self.storage.saveReservations({"12345678Z": self.reservation("12345678Z", 2)})
+        self.assertEqual(self.storage.loadReservation("12345678Z")["num_days"], 2)
+        # Another storage over the same directory replaces the file
+        JsonStorage(self.temp_dir.name).saveReservations({"12345678Z": self.reservation("12345678Z", 3)})
+        self.assertEqual(self.storage.loadReservation("12345678Z")["num_days"], 3)
+        self.assertEqual(self.storage.reservation_cache.stats()["hits"], 0)
+
+    def test_reservation_cache04(self):
+        """Test 4: a cache of size 0 does not keep any reservation"""
+        storage = JsonStorage(self.temp_dir.name, reservation_cache_size=0)
+        storage.saveReservations({"12345678Z": self.reservation("12345678Z")})
+        self.assertEqual(storage.loadReservation("12345678Z"), self.reservation("12345678Z"))
+        self.assertEqual(storage.loadReservation("12345678Z"), self.reservation("12345678Z"))
+        self.assertEqual(storage.reservation_cache.stats()["size"], 0)
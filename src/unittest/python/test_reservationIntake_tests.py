@@ -0,0 +1,216 @@
+""" Module that tests the reservation intake of several workers and processes over the same stores"""
+from unittest import TestCase
+from unittest.mock import patch
+import multiprocessing
+import os
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager, ID_CARD_LETTERS
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+# Number of intake processes of the stress tests, and of clients all of them try to reserve
+PROCESSES = 4
+CLIENTS = 25
+
+
+def makeIdCard(number: int):
+    """Returns a valid id_card for the given number"""
+    return f"{number:08d}" + ID_CARD_LETTERS[number % 23]
+
+
+def reserveIdCards(storage_root: str, id_cards: list, use_keys: bool, barrier, results):
+    """Intake process: waits for the rest of the processes and then makes a reservation for every id_card, putting
+    in results the localizer or the error message of each of them"""
+    hotel_manager = HotelManager(storage_root=storage_root)
+    barrier.wait()
+    outcomes = {}
+    for id_card in id_cards:
+        try:
+            outcomes[id_card] = hotel_manager.roomReservation("5105105105105100", "John Smith", id_card, "612345789",
+                                                              "single", "01/07/2099", 2,
+                                                              idempotency_key="key-" + id_card if use_keys else None)
+        except HotelManagementException as ex:
+            outcomes[id_card] = ex.message
+    results.put(outcomes)
+
+
+class TestReservationIntake(TestCase):
+    """Test cases for the reservations made at the same time by several workers"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.my_hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def runIntakeProcesses(self, use_keys: bool):
+        """Runs PROCESSES intake processes that reserve the same CLIENTS id_cards, and returns their outcomes"""
+        id_cards = [makeIdCard(number) for number in range(CLIENTS)]
+        barrier = multiprocessing.Barrier(PROCESSES)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=reserveIdCards,
+                                             args=(self.temp_dir.name, id_cards, use_keys, barrier, results))
+                     for _ in range(PROCESSES)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        return id_cards, outcomes
+
+    def test_reservation_intake01(self):
+        """Test 1: every storage only creates the reservations whose id_card does not have one yet"""
+        storages = [JsonStorage(os.path.join(self.temp_dir.name, "json")),
+                    JsonStorage(os.path.join(self.temp_dir.name, "sharded"), sharded=True),
+                    SqliteStorage(os.path.join(self.temp_dir.name, "sqlite")),
+                    JournalStorage(os.path.join(self.temp_dir.name, "journal"))]
+        for storage in storages:
+            self.assertEqual(storage.createReservations({"12345678Z": {"localizer": "a"}}), set())
+            self.assertEqual(storage.createReservations({"12345678Z": {"localizer": "b"},
+                                                         "87654321X": {"localizer": "c"}}), {"12345678Z"})
+            self.assertEqual(storage.loadReservation("12345678Z"), {"localizer": "a"})
+            self.assertTrue(storage.isIdCardReserved("87654321X"))
+
+            self.assertIsNone(storage.claimIdempotencyKey("key", {"id_card": "12345678Z"}))
+            self.assertEqual(storage.claimIdempotencyKey("key", {"id_card": "87654321X"}), {"id_card": "12345678Z"})
+            storage.releaseIdempotencyKey("key")
+            self.assertIsNone(storage.loadIdempotencyKey("key"))
+        storages[2].close()
+        storages[3].close()
+        self.assertIsNone(JournalStorage(os.path.join(self.temp_dir.name, "journal")).loadIdempotencyKey("key"))
+
+    @freeze_time("2024-07-01")
+    def test_reservation_intake02(self):
+        """Test 2: retrying a reservation with the same idempotency_key returns the same localizer, and the key cannot
+        be used for another client"""
+        parameters = ("5105105105105100", "John Smith", "12345678Z", "612345789", "single", "01/07/2024", 2)
+        localizer = self.my_hotel_manager.roomReservation(*parameters, idempotency_key="request-1")
+        with freeze_time("2024-07-01 00:00:05"):
+            self.assertEqual(self.my_hotel_manager.roomReservation(*parameters, idempotency_key="request-1"),
+                             localizer)
+        with self.assertRaises(HotelManagementException) as cm:
+            self.my_hotel_manager.roomReservation(*parameters, idempotency_key="request-2")
+        self.assertEqual(cm.exception.message, "a client with specified id_card already has a reservation")
+        # The failed request does not keep its key
+        self.assertIsNone(self.my_hotel_manager.storage.loadIdempotencyKey("request-2"))
+        with self.assertRaises(HotelManagementException) as cm:
+            self.my_hotel_manager.roomReservation("5105105105105100", "John Smith", "87654321X", "612345789",
+                                                  "single", "01/07/2024", 2, idempotency_key="request-1")
+        self.assertEqual(cm.exception.message, "idempotency_key already used for another reservation")
+
+    @freeze_time("2024-07-01")
+    def test_reservation_intake03(self):
+        """Test 3: a request whose idempotency_key is claimed without its reservation by a request that has not stored
+        it yet is rejected, and the batches do not store an id_card reserved by another worker since it was
+        validated"""
+        self.my_hotel_manager.storage.claimIdempotencyKey("request-1", {"id_card": "12345678Z", "localizer": "a"})
+        with self.assertRaises(HotelManagementException) as cm:
+            self.my_hotel_manager.roomReservation("5105105105105100", "John Smith", "12345678Z", "612345789",
+                                                  "single", "01/07/2024", 2, idempotency_key="request-1")
+        self.assertEqual(cm.exception.message, "a reservation with the same idempotency_key is in progress")
+
+        # The id_cards are reserved after the other worker has validated them, so its validation accepts them, but
+        # their reservations cannot be created again
+        other_hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        for id_card in ["87654321X", "00000001R"]:
+            self.my_hotel_manager.roomReservation("5105105105105100", "John Smith", id_card, "612345789", "single",
+                                                  "01/07/2024", 2)
+        validated_storage = patch.object(other_hotel_manager.storage, "isIdCardReserved", return_value=False)
+        with validated_storage:
+            values = other_hotel_manager.roomReservations([
+                {"credit_card": "5105105105105100", "name_surname": "John Smith", "id_card": "87654321X",
+                 "phone_number": "612345789", "room_type": "double", "arrival_date": "01/07/2024", "num_days": 1},
+                {"credit_card": "5105105105105100", "name_surname": "John Smith", "id_card": "00000002W",
+                 "phone_number": "612345789", "room_type": "double", "arrival_date": "01/07/2024", "num_days": 1}])
+            with self.assertRaises(HotelManagementException) as cm:
+                other_hotel_manager.roomReservation("5105105105105100", "John Smith", "00000001R", "612345789",
+                                                    "double", "01/07/2024", 1)
+        self.assertEqual(values[0].message, "a client with specified id_card already has a reservation")
+        self.assertEqual(len(values[1]), 32)
+        self.assertEqual(cm.exception.message, "a client with specified id_card already has a reservation")
+        self.assertEqual(self.my_hotel_manager.storage.loadReservation("00000001R")["room_type"], "single")
+
+    def test_reservation_intake04(self):
+        """Test 4: several intake processes reserving the same clients at the same time store exactly 1 reservation
+        per client"""
+        id_cards, outcomes = self.runIntakeProcesses(use_keys=False)
+        for id_card in id_cards:
+            localizers = [outcome[id_card] for outcome in outcomes if len(outcome[id_card]) == 32]
+            self.assertEqual(len(localizers), 1)
+            self.assertEqual(self.my_hotel_manager.storage.loadReservation(id_card)["localizer"], localizers[0])
+        self.assertEqual(len(os.listdir(self.my_hotel_manager.getJsonDirectory("reservations_store"))), CLIENTS)
+
+    def test_reservation_intake05(self):
+        """Test 5: several intake processes retrying the same requests with idempotency keys all get the localizer of
+        the only reservation stored"""
+        id_cards, outcomes = self.runIntakeProcesses(use_keys=True)
+        for id_card in id_cards:
+            localizer = self.my_hotel_manager.storage.loadReservation(id_card)["localizer"]
+            for outcome in outcomes:
+                self.assertEqual(outcome[id_card], localizer)
+            self.assertEqual(self.my_hotel_manager.roomReservation("5105105105105100", "John Smith", id_card,
+                                                                   "612345789", "single", "01/07/2099", 2,
+                                                                   idempotency_key="key-" + id_card), localizer)
+        self.assertEqual(len(os.listdir(self.my_hotel_manager.getJsonDirectory("reservations_store"))), CLIENTS)
+
+    @freeze_time("2024-07-01")
+    def test_reservation_intake06(self):
+        """Test 6: a request whose worker stopped after claiming its idempotency_key is stored by a retry, which books
+        its rooms"""
+        parameters = ("5105105105105100", "John Smith", "12345678Z", "612345789", "single", "01/07/2024", 2)
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, room_capacity={"single": 3})
+        # The worker is killed while storing the reservation, so it neither stores it nor releases the key
+        with patch.object(hotel_manager.storage, "bookReservations", side_effect=KeyboardInterrupt), \
+                patch.object(hotel_manager.storage, "releaseIdempotencyKey"):
+            with self.assertRaises(KeyboardInterrupt):
+                hotel_manager.roomReservation(*parameters, idempotency_key="request-1")
+        claim = hotel_manager.storage.loadIdempotencyKey("request-1")
+        self.assertFalse(hotel_manager.storage.isIdCardReserved("12345678Z"))
+
+        retry_hotel_manager = HotelManager(storage_root=self.temp_dir.name, room_capacity={"single": 3})
+        with freeze_time("2024-07-01 00:10:00"):
+            localizer = retry_hotel_manager.roomReservation(*parameters, idempotency_key="request-1")
+        self.assertEqual(localizer, claim["localizer"])
+        self.assertEqual(retry_hotel_manager.storage.loadReservation("12345678Z"), claim["reservation"])
+        self.assertEqual(retry_hotel_manager.roomAvailability("single", "01/07/2024", 2), 2)
+        self.assertEqual(retry_hotel_manager.roomReservation(*parameters, idempotency_key="request-1"), localizer)
+        self.assertEqual(retry_hotel_manager.roomAvailability("single", "01/07/2024", 2), 2)
+
+    @freeze_time("2024-07-01")
+    def test_reservation_intake07(self):
+        """Test 7: no room is booked by a request whose idempotency_key is claimed by another client while it is
+        validated, and the rooms are only booked once when a retry stores the reservation before the first request"""
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, room_capacity={"single": 4})
+        for id_card in ["87654321X", "00000001R"]:
+            hotel_manager.roomReservation("5105105105105100", "John Smith", id_card, "612345789", "single",
+                                          "01/07/2024", 2)
+        self.assertEqual(hotel_manager.roomAvailability("single", "01/07/2024", 2), 2)
+        hotel_manager.storage.claimIdempotencyKey("request-1", {"id_card": "00000002W", "localizer": "a"})
+        # The key is claimed after the request has checked it
+        with patch.object(hotel_manager.storage, "loadIdempotencyKey", return_value=None):
+            with self.assertRaises(HotelManagementException) as cm:
+                hotel_manager.roomReservation("5105105105105100", "John Smith", "12345678Z", "612345789", "single",
+                                              "01/07/2024", 2, idempotency_key="request-1")
+        self.assertEqual(cm.exception.message, "idempotency_key already used for another reservation")
+        self.assertEqual(hotel_manager.roomAvailability("single", "01/07/2024", 2), 2)
+
+        # A retry stores the reservation of the claim while the first request is about to store it
+        parameters = ("5105105105105100", "John Smith", "12345678Z", "612345789", "single", "01/07/2024", 2)
+        book_reservations = hotel_manager.storage.bookReservations
+
+        def retryFirst(reservations, room_capacity=None):
+            with patch.object(hotel_manager.storage, "bookReservations", book_reservations):
+                self.assertEqual(hotel_manager.roomReservation(*parameters, idempotency_key="request-2"),
+                                 reservations["12345678Z"]["localizer"])
+            return book_reservations(reservations, room_capacity)
+        with patch.object(hotel_manager.storage, "bookReservations", side_effect=retryFirst):
+            localizer = hotel_manager.roomReservation(*parameters, idempotency_key="request-2")
+        self.assertEqual(hotel_manager.storage.loadReservation("12345678Z")["localizer"], localizer)
+        self.assertEqual(hotel_manager.roomAvailability("single", "01/07/2024", 2), 1)
+        self.assertEqual(HotelManager(storage_root=self.temp_dir.name,
+                                      room_capacity={"single": 4}).roomAvailability("single", "01/07/2024", 2), 1)
@@ -0,0 +1,185 @@
+""" Module that tests the capacity checks of roomReservation"""
+from unittest import TestCase
+from unittest.mock import patch
+from datetime import date
+import multiprocessing
+import os
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager, ID_CARD_LETTERS
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.RoomInventory import RoomInventory
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+# Number of intake processes of the stress test, clients each of them tries to reserve, and rooms of the hotel
+PROCESSES = 4
+CLIENTS = 5
+ROOMS = 6
+
+
+def openHotelManager(storage_root: str, backend: str):
+    """Returns a HotelManager with ROOMS single rooms over the given backend of the storage root"""
+    storage = SqliteStorage(storage_root) if backend == "sqlite" else None
+    return HotelManager(storage_root=storage_root, storage=storage, room_capacity={"single": ROOMS})
+
+
+def reserveRooms(storage_root: str, backend: str, first_client: int, barrier, results):
+    """Intake process: waits for the rest of the processes and then reserves a single room for each of its CLIENTS
+    clients, putting in results how many of them were accepted"""
+    hotel_manager = openHotelManager(storage_root, backend)
+    barrier.wait()
+    accepted = 0
+    for number in range(first_client, first_client + CLIENTS):
+        try:
+            hotel_manager.roomReservation("5105105105105100", "John Smith",
+                                          f"{number:08d}" + ID_CARD_LETTERS[number % 23], "612345789", "single",
+                                          "01/07/2099", 2)
+            accepted += 1
+        except HotelManagementException:
+            pass
+    results.put(accepted)
+
+
+class TestRoomInventory(TestCase):
+    """Test cases for RoomInventory and the availability of rooms of HotelManager"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.capacity = {"single": 1, "double": 2, "suite": 1}
+        self.my_hotel_manager = HotelManager(storage_root=self.temp_dir.name, room_capacity=self.capacity)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def reservation(id_card: str, room_type: str, arrival_date: str, num_days: int):
+        """Returns the parameters of a valid reservation"""
+        return {"credit_card": "5105105105105100", "name_surname": "John Smith", "id_card": id_card,
+                "phone_number": "612345789", "room_type": room_type, "arrival_date": arrival_date,
+                "num_days": num_days}
+
+    def test_room_inventory01(self):
+        """Test 1: a room can only be booked while it is free every night of the stay"""
+        inventory = RoomInventory({"double": 2})
+        inventory.reserve("double", date(2024, 7, 1), 3)
+        inventory.reserve("double", date(2024, 7, 3), 2)
+        self.assertEqual(inventory.available("double", date(2024, 7, 1), 2), 1)
+        self.assertEqual(inventory.available("double", date(2024, 7, 2), 2), 0)
+        with self.assertRaises(HotelManagementException) as cm:
+            inventory.reserve("double", date(2024, 7, 2), 5)
+        self.assertEqual(cm.exception.message, "room_type is not available for the given dates")
+        inventory.release("double", date(2024, 7, 1), 3)
+        self.assertEqual(inventory.available("double", date(2024, 7, 2), 2), 1)
+        self.assertEqual(inventory.available("suite", date(2024, 7, 1), 1), 0)
+
+    @freeze_time("2024-07-01")
+    def test_room_inventory02(self):
+        """Test 2: roomReservation rejects a reservation when every room of its type is booked one of its nights"""
+        self.my_hotel_manager.roomReservation(**self.reservation("12345678Z", "single", "01/07/2024", 3))
+        with self.assertRaises(HotelManagementException) as cm:
+            self.my_hotel_manager.roomReservation(**self.reservation("87654321X", "single", "03/07/2024", 1))
+        self.assertEqual(cm.exception.message, "room_type is not available for the given dates")
+        self.assertFalse(self.my_hotel_manager.storage.isIdCardReserved("87654321X"))
+        self.my_hotel_manager.roomReservation(**self.reservation("87654321X", "single", "04/07/2024", 1))
+        self.assertEqual(self.my_hotel_manager.roomAvailability("double", "01/07/2024", 10), 2)
+        self.assertEqual(self.my_hotel_manager.roomAvailability("single", "02/07/2024", 1), 0)
+
+    @freeze_time("2024-07-01")
+    def test_room_inventory03(self):
+        """Test 3: the rooms booked by the stored reservations are loaded, and a HotelManager without capacity does
+        not check it"""
+        self.my_hotel_manager.roomReservation(**self.reservation("12345678Z", "suite", "05/07/2024", 2))
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name, room_capacity=self.capacity)
+        self.assertEqual(hotel_manager.roomAvailability("suite", "06/07/2024", 1), 0)
+        self.assertEqual(hotel_manager.roomAvailability("suite", "07/07/2024", 1), 1)
+        hotel_manager = HotelManager(storage_root=self.temp_dir.name)
+        self.assertIsNone(hotel_manager.roomAvailability("suite", "06/07/2024", 1))
+        hotel_manager.roomReservation(**self.reservation("87654321X", "suite", "06/07/2024", 1))
+
+    @freeze_time("2024-07-01")
+    def test_room_inventory04(self):
+        """Test 4: in a batch, the reservations without a free room are rejected, and when the storage fails in the
+        middle of a batch only the rooms of the reservations it stored stay booked"""
+        values = self.my_hotel_manager.roomReservations([
+            self.reservation("12345678Z", "double", "01/07/2024", 2),
+            self.reservation("87654321X", "double", "02/07/2024", 2),
+            self.reservation("00000001R", "double", "02/07/2024", 1)])
+        self.assertEqual(len(values[0]), 32)
+        self.assertEqual(len(values[1]), 32)
+        self.assertEqual(values[2].message, "room_type is not available for the given dates")
+
+        # The file of the second reservation cannot be written, so only the room of the first one stays booked
+        write_json_file = self.my_hotel_manager.storage.writeJsonFile
+
+        def failSecond(file_path: str, json_data: dict, exclusive: bool = False):
+            if file_path.endswith("00000003A.json"):
+                raise OSError("disk full")
+            return write_json_file(file_path, json_data, exclusive)
+        with patch.object(self.my_hotel_manager.storage, "writeJsonFile", side_effect=failSecond):
+            with self.assertRaises(OSError):
+                self.my_hotel_manager.roomReservations([self.reservation("00000002W", "single", "10/07/2024", 1),
+                                                        self.reservation("00000003A", "suite", "10/07/2024", 1)])
+        self.assertTrue(self.my_hotel_manager.storage.isIdCardReserved("00000002W"))
+        self.assertFalse(self.my_hotel_manager.storage.isIdCardReserved("00000003A"))
+        self.assertEqual(self.my_hotel_manager.roomAvailability("single", "10/07/2024", 1), 0)
+        self.assertEqual(self.my_hotel_manager.roomAvailability("suite", "10/07/2024", 1), 1)
+
+    @freeze_time("2024-07-01")
+    def test_room_inventory05(self):
+        """Test 5: no room is booked by the first records of a batch when a later record fails with an exception that
+        is not a HotelManagementException"""
+        with patch.object(self.my_hotel_manager.storage, "isIdCardReserved", side_effect=[False, OSError("I/O error")]):
+            with self.assertRaises(OSError):
+                self.my_hotel_manager.roomReservations([self.reservation("12345678Z", "double", "01/07/2024", 2),
+                                                        self.reservation("87654321X", "suite", "01/07/2024", 1)])
+        self.assertEqual(self.my_hotel_manager.roomAvailability("double", "01/07/2024", 2), 2)
+        self.assertFalse(self.my_hotel_manager.storage.isIdCardReserved("12345678Z"))
+
+    @freeze_time("2024-07-01")
+    def test_room_inventory06(self):
+        """Test 6: the rooms are counted by the storage, so 2 HotelManagers over the same stores never book more rooms
+        than the hotel has, and the journal counts them again when it is opened"""
+        for backend in ["json", "sqlite"]:
+            storage_root = os.path.join(self.temp_dir.name, backend)
+            first_manager = openHotelManager(storage_root, backend)
+            second_manager = openHotelManager(storage_root, backend)
+            self.assertEqual(second_manager.roomAvailability("single", "01/07/2024", 2), ROOMS)
+            for number in range(ROOMS - 1):
+                first_manager.roomReservation(**self.reservation(f"{number:08d}" + ID_CARD_LETTERS[number % 23],
+                                                                 "single", "01/07/2024", 2))
+            self.assertEqual(second_manager.roomAvailability("single", "02/07/2024", 1), 1)
+            second_manager.roomReservation(**self.reservation("12345678Z", "single", "02/07/2024", 3))
+            with self.assertRaises(HotelManagementException) as cm:
+                first_manager.roomReservation(**self.reservation("87654321X", "single", "01/07/2024", 2))
+            self.assertEqual(cm.exception.message, "room_type is not available for the given dates")
+            self.assertEqual(first_manager.roomAvailability("single", "03/07/2024", 1), ROOMS - 1)
+
+        journal_root = os.path.join(self.temp_dir.name, "journal")
+        hotel_manager = HotelManager(storage=JournalStorage(journal_root), room_capacity=self.capacity)
+        hotel_manager.roomReservation(**self.reservation("12345678Z", "suite", "05/07/2024", 2))
+        hotel_manager.storage.close()
+        hotel_manager = HotelManager(storage=JournalStorage(journal_root), room_capacity=self.capacity)
+        self.assertEqual(hotel_manager.roomAvailability("suite", "06/07/2024", 1), 0)
+        hotel_manager.storage.close()
+
+    def test_room_inventory07(self):
+        """Test 7: several intake processes reserving rooms at the same time never book more rooms than the hotel has,
+        with the json files and with SQLite"""
+        for backend in ["json", "sqlite"]:
+            storage_root = os.path.join(self.temp_dir.name, backend)
+            barrier = multiprocessing.Barrier(PROCESSES)
+            results = multiprocessing.Queue()
+            processes = [multiprocessing.Process(target=reserveRooms,
+                                                 args=(storage_root, backend, index * CLIENTS, barrier, results))
+                         for index in range(PROCESSES)]
+            for process in processes:
+                process.start()
+            accepted = sum(results.get(timeout=60) for _ in processes)
+            for process in processes:
+                process.join()
+                self.assertEqual(process.exitcode, 0)
+            self.assertEqual(accepted, ROOMS)
+            hotel_manager = openHotelManager(storage_root, backend)
+            self.assertEqual(hotel_manager.roomAvailability("single", "01/07/2099", 2), 0)
+            self.assertEqual(sum(1 for _ in hotel_manager.storage.iterRecords("reservations")), ROOMS)
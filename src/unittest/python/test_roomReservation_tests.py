@@ -787,3 +787,83 @@ class TestRoomReservation(TestCase):
                                                   arrival_date="01/07/2024",
                                                   num_days=11)
         self.assertEqual(ex.exception.message, "num_days must be between 1 and 10")
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservation58(self):
+        """Test 58: the same HotelManager rejects a second reservation of a client it has just stored"""
+        self.my_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                              name_surname="John Smith",
+                                              id_card="12345678Z",
+                                              phone_number="612345789",
+                                              room_type="single",
+                                              arrival_date="01/07/2024",
+                                              num_days=1)
+        with self.assertRaises(HotelManagementException) as ex:
+            self.my_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                  name_surname="John Smith",
+                                                  id_card="12345678Z",
+                                                  phone_number="612345789",
+                                                  room_type="single",
+                                                  arrival_date="01/07/2024",
+                                                  num_days=1)
+        self.assertEqual(ex.exception.message, "a client with specified id_card already has a reservation")
+        json_dir = self.my_hotel_manager.getJsonDirectory("reservations_store")
+        os.remove(os.path.join(json_dir, "12345678Z.json"))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservation59(self):
+        """Test 59: a stored file whose name only contains the id_card is not a reservation of that client"""
+        json_dir = self.my_hotel_manager.getJsonDirectory("reservations_store")
+        other_file_path = os.path.join(json_dir, "012345678Z.json")
+        with open(other_file_path, "w", encoding="utf-8") as other_file:
+            other_file.write("{}")
+        try:
+            value = self.my_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                          name_surname="John Smith",
+                                                          id_card="12345678Z",
+                                                          phone_number="612345789",
+                                                          room_type="single",
+                                                          arrival_date="01/07/2024",
+                                                          num_days=1)
+            self.assertEqual(value, "385148f30bfe0c80599f7c844216578a")
+            os.remove(os.path.join(json_dir, "12345678Z.json"))
+        finally:
+            os.remove(other_file_path)
+
+    def test_room_reservation60(self):
+        """Test 60: a batch of credit cards obtains the same result as validating them one by one"""
+        values = self.my_hotel_manager.validateCreditCards(["5105105105105100", "5105105105105101",
+                                                            "A105105105105100", "510510510510510", 5105105105105100])
+        self.assertIsNone(values[0])
+        self.assertEqual(values[1].message, "credit_card does not follow the Luhn algorithm")
+        self.assertEqual(values[2].message, "credit_card must have 16 digits")
+        self.assertEqual(values[3].message, "credit_card is not 16 characters long")
+        self.assertEqual(values[4].message, "credit_card is not a string")
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservation61(self):
+        """Test 61: a reservation stored by another HotelManager of the same stores after this one has checked the
+        id_card is seen by this one"""
+        other_hotel_manager = HotelManager()
+        self.assertFalse(self.my_hotel_manager.isIdCardReserved("12345678Z"))
+        other_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                            name_surname="John Smith",
+                                            id_card="12345678Z",
+                                            phone_number="612345789",
+                                            room_type="single",
+                                            arrival_date="01/07/2024",
+                                            num_days=1)
+        try:
+            self.assertTrue(self.my_hotel_manager.isIdCardReserved("12345678Z"))
+            with self.assertRaises(HotelManagementException) as ex:
+                self.my_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                      name_surname="John Smith",
+                                                      id_card="12345678Z",
+                                                      phone_number="612345789",
+                                                      room_type="single",
+                                                      arrival_date="01/07/2024",
+                                                      num_days=1)
+            self.assertEqual(ex.exception.message, "a client with specified id_card already has a reservation")
+        finally:
+            json_dir = self.my_hotel_manager.getJsonDirectory("reservations_store")
+            os.remove(os.path.join(json_dir, "12345678Z.json"))
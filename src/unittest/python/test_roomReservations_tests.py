@@ -0,0 +1,125 @@
+""" Module that tests the roomReservations() function"""
+from unittest import TestCase
+from unittest.mock import patch
+from datetime import datetime
+import os
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+
+class TestRoomReservations(TestCase):
+    """Test cases for roomReservations (Function 1 for a batch of reservations)"""
+    def setUp(self):
+        self.my_hotel_manager = HotelManager()
+        self.json_dir = self.my_hotel_manager.getJsonDirectory("reservations_store")
+
+    @staticmethod
+    def reservation(id_card: str, name_surname: str = "John Smith", credit_card: str = "5105105105105100"):
+        """Returns a valid reservation record for the given client"""
+        return {"credit_card": credit_card,
+                "name_surname": name_surname,
+                "id_card": id_card,
+                "phone_number": "612345789",
+                "room_type": "single",
+                "arrival_date": "01/07/2024",
+                "num_days": 1}
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservations01(self):
+        """Test 1: every valid record obtains the same localizer as roomReservation and its json file"""
+        values = self.my_hotel_manager.roomReservations([self.reservation("12345678Z"),
+                                                         self.reservation("87654321X", "John Jack Smith")])
+        self.assertEqual(values[0], "385148f30bfe0c80599f7c844216578a")
+        self.assertEqual(len(values[1]), 32)
+        for filename in ["12345678Z.json", "87654321X.json"]:
+            processed_json_path = os.path.join(self.json_dir, filename)
+            self.assertTrue(os.path.isfile(processed_json_path))
+            os.remove(processed_json_path)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservations02(self):
+        """Test 2: an invalid record is rejected with its exception without affecting the rest of the batch"""
+        values = self.my_hotel_manager.roomReservations([self.reservation("12345678Z", credit_card="5105105105105101"),
+                                                         self.reservation("87654321X")])
+        self.assertIsInstance(values[0], HotelManagementException)
+        self.assertEqual(values[0].message, "credit_card does not follow the Luhn algorithm")
+        self.assertEqual(len(values[1]), 32)
+        self.assertFalse(os.path.isfile(os.path.join(self.json_dir, "12345678Z.json")))
+        os.remove(os.path.join(self.json_dir, "87654321X.json"))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservations03(self):
+        """Test 3: a client cannot have 2 reservations, neither stored nor in the same batch"""
+        values = self.my_hotel_manager.roomReservations([self.reservation("00000000T"),
+                                                         self.reservation("12345678Z"),
+                                                         self.reservation("12345678Z", "John Jack Smith")])
+        self.assertEqual(values[0].message, "a client with specified id_card already has a reservation")
+        self.assertEqual(values[1], "385148f30bfe0c80599f7c844216578a")
+        self.assertEqual(values[2].message, "a client with specified id_card already has a reservation")
+        os.remove(os.path.join(self.json_dir, "12345678Z.json"))
+
+    def test_room_reservations04(self):
+        """Test 4: an empty batch does not store anything"""
+        self.assertEqual(self.my_hotel_manager.roomReservations([]), [])
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservations05(self):
+        """Test 5: a record with a missing or an extra field, or that is not a dict, is rejected without affecting the
+        rest of the batch"""
+        missing_field = self.reservation("12345678Z")
+        del missing_field["phone_number"]
+        extra_field = dict(self.reservation("12345678Z"), idempotency_key="retry-1")
+        values = self.my_hotel_manager.roomReservations([missing_field, extra_field, None,
+                                                         self.reservation("87654321X")])
+        for value in values[:3]:
+            self.assertIsInstance(value, HotelManagementException)
+            self.assertEqual(value.message, "reservation record does not have the expected fields")
+        self.assertEqual(len(values[3]), 32)
+        self.assertFalse(os.path.isfile(os.path.join(self.json_dir, "12345678Z.json")))
+        os.remove(os.path.join(self.json_dir, "87654321X.json"))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservations06(self):
+        """Test 6: the batch checks of every invalid record report the same exception as roomReservation, which is
+        the first check that fails"""
+        records = [self.reservation("12345678Z", credit_card=5105105105105100),
+                   self.reservation("00000000T", credit_card="5105105105105101"),
+                   self.reservation("12345678Z", credit_card="510510510510510A"),
+                   self.reservation("12345678Z", "John"),
+                   self.reservation("1234567Z"),
+                   self.reservation(12345678),
+                   self.reservation("12345678A"),
+                   dict(self.reservation("00000000T"), phone_number="6123"),
+                   dict(self.reservation("12345678Z"), phone_number="6123"),
+                   dict(self.reservation("12345678Z"), room_type="triple"),
+                   dict(self.reservation("12345678Z"), arrival_date="30/06/2024"),
+                   dict(self.reservation("12345678Z"), arrival_date="31/06/2024"),
+                   dict(self.reservation("12345678Z"), arrival_date="2024-07-01"),
+                   dict(self.reservation("12345678Z"), num_days=11)]
+        values = self.my_hotel_manager.roomReservations(records)
+        for record, value in zip(records, values):
+            with self.assertRaises(HotelManagementException) as cm:
+                self.my_hotel_manager.roomReservation(**record)
+            self.assertIsInstance(value, HotelManagementException)
+            self.assertEqual(value.message, cm.exception.message)
+        self.assertFalse(os.path.isfile(os.path.join(self.json_dir, "12345678Z.json")))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_room_reservations07(self):
+        """Test 7: the id_cards of a batch that already have a reservation are looked up at once in every storage"""
+        with tempfile.TemporaryDirectory() as storage_root:
+            for storage in [SqliteStorage(storage_root), JournalStorage(storage_root)]:
+                hotel_manager = HotelManager(storage=storage)
+                hotel_manager.roomReservation(**self.reservation("12345678Z"))
+                with patch.object(storage, "isIdCardReserved", side_effect=AssertionError):
+                    values = hotel_manager.roomReservations([self.reservation("12345678Z"),
+                                                             self.reservation("87654321X")])
+                self.assertEqual(values[0].message, "a client with specified id_card already has a reservation")
+                self.assertEqual(len(values[1]), 32)
+                self.assertEqual(storage.findReservedIdCards(["87654321X", "00000001R", "12345678Z"]),
+                                 {"12345678Z", "87654321X"})
+                storage.close()
@@ -0,0 +1,85 @@
+""" Module that tests the sharded layout of JsonStorage and its migration tool"""
+from unittest import TestCase
+import json
+import os
+import tempfile
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.ReshardJsonStores import reshardStores
+
+
+class TestShardedStorage(TestCase):
+    """Test cases for the sharded layout of the json stores"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage_root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def makeStay(hotel_manager: HotelManager):
+        """Makes a reservation, the arrival of its client and its checkout. Returns the room_key of the stay"""
+        with freeze_time("2024-07-01"):
+            localizer = hotel_manager.roomReservation("5105105105105100", "John Smith", "12345678Z", "612345789",
+                                                      "single", "01/07/2024", 2)
+            with open(os.path.join(hotel_manager.getJsonDirectory("stays_store"), "arrival.json"), "w",
+                      encoding="utf-8") as stay_file:
+                json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+            room_key = hotel_manager.guestArrival("arrival.json")
+        with freeze_time("2024-07-03"):
+            hotel_manager.guest_checkout(room_key)
+        return room_key
+
+    def test_sharded_storage01(self):
+        """Test 1: every record is written in its shard directory, and read from it"""
+        hotel_manager = HotelManager(storage=JsonStorage(self.storage_root, sharded=True))
+        room_key = self.makeStay(hotel_manager)
+        self.assertTrue(os.path.isfile(os.path.join(self.storage_root, "reservations_store", "12", "34",
+                                                    "12345678Z.json")))
+        self.assertTrue(os.path.isfile(os.path.join(self.storage_root, "processed_stays_store", room_key[:2],
+                                                    room_key[2:4], room_key + ".json")))
+        self.assertTrue(os.path.isfile(os.path.join(self.storage_root, "checkouts_store", room_key[:2],
+                                                    room_key[2:4], room_key + "_checkout.json")))
+        # A client with a reservation in a shard directory cannot make another one
+        with freeze_time("2024-07-01"), self.assertRaises(HotelManagementException) as cm:
+            HotelManager(self.storage_root).roomReservation("5105105105105100", "John Smith", "12345678Z",
+                                                            "612345789", "single", "01/07/2024", 2)
+        self.assertEqual(cm.exception.message, "a client with specified id_card already has a reservation")
+
+    def test_sharded_storage02(self):
+        """Test 2: the layout of existing stores is detected, and they cannot be opened as flat stores"""
+        JsonStorage(self.storage_root, sharded=True)
+        self.assertTrue(JsonStorage(self.storage_root).sharded)
+        self.assertTrue(HotelManager(self.storage_root).storage.sharded)
+        with self.assertRaises(ValueError):
+            JsonStorage(self.storage_root, sharded=False)
+
+    def test_sharded_storage03(self):
+        """Test 3: the migration tool moves every record of flat stores to the sharded layout"""
+        room_key = self.makeStay(HotelManager(self.storage_root))
+        self.assertEqual(reshardStores(self.storage_root),
+                         {"reservations_store": 1, "processed_stays_store": 1, "checkouts_store": 1})
+        for folder_name in ["reservations_store", "processed_stays_store", "checkouts_store"]:
+            self.assertEqual([file_name for file_name in os.listdir(os.path.join(self.storage_root, folder_name))
+                              if file_name.endswith(".json")], [])
+        hotel_manager = HotelManager(self.storage_root)
+        self.assertTrue(hotel_manager.storage.isIdCardReserved("12345678Z"))
+        self.assertEqual(hotel_manager.storage.loadStay(room_key)["room_key"], room_key)
+        # Running it again does not move anything
+        self.assertEqual(sum(reshardStores(self.storage_root).values()), 0)
+
+    def test_sharded_storage04(self):
+        """Test 4: during an interrupted migration, the records not moved yet are still read, and a record written
+        again in the sharded layout is kept when the migration is resumed"""
+        self.makeStay(HotelManager(self.storage_root))
+        hotel_manager = HotelManager(storage=JsonStorage(self.storage_root, sharded=True))
+        self.assertEqual(hotel_manager.storage.loadReservation("12345678Z")["num_days"], 2)
+        reservation = hotel_manager.storage.loadReservation("12345678Z")
+        reservation["num_days"] = 3
+        hotel_manager.storage.saveReservations({"12345678Z": reservation})
+        reshardStores(self.storage_root)
+        self.assertEqual(HotelManager(self.storage_root).storage.loadReservation("12345678Z")["num_days"], 3)
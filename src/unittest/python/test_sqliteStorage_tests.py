@@ -0,0 +1,86 @@
+""" Module that tests HotelManager using the SQLite storage backend"""
+import json
+import os
+import tempfile
+from unittest import TestCase
+from datetime import datetime
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStorage import HotelStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+
+
+class TestSqliteStorage(TestCase):
+    """Test cases for roomReservation and guestArrival backed by SqliteStorage"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage = SqliteStorage(self.temp_dir.name)
+        self.my_hotel_manager = HotelManager(storage=self.storage)
+
+    def tearDown(self):
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def reserve(self, id_card: str = "12345678Z"):
+        """Makes a valid reservation for the given id_card"""
+        return self.my_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                     name_surname="John Smith",
+                                                     id_card=id_card,
+                                                     phone_number="612345789",
+                                                     room_type="single",
+                                                     arrival_date="01/07/2024",
+                                                     num_days=1)
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_sqlite_storage01(self):
+        """Test 1: the reservation is stored in the database and no json file is created"""
+        self.assertEqual(self.reserve(), "385148f30bfe0c80599f7c844216578a")
+        self.assertTrue(self.storage.isIdCardReserved("12345678Z"))
+        self.assertEqual(self.storage.loadReservation("12345678Z")["localizer"], "385148f30bfe0c80599f7c844216578a")
+        self.assertFalse(os.listdir(self.my_hotel_manager.getJsonDirectory("reservations_store")))
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_sqlite_storage02(self):
+        """Test 2: a client that already has a reservation in the database cannot make another one"""
+        self.reserve()
+        with self.assertRaises(HotelManagementException) as ex:
+            self.reserve()
+        self.assertEqual(ex.exception.message, "a client with specified id_card already has a reservation")
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_sqlite_storage03(self):
+        """Test 3: guestArrival reads the reservation and stores the processed stay in the database"""
+        localizer = self.reserve()
+        stay_file_path = os.path.join(self.my_hotel_manager.getJsonDirectory("stays_store"), "arrival.json")
+        with open(stay_file_path, "w", encoding="utf-8") as stay_file:
+            json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+
+        room_key = self.my_hotel_manager.guestArrival("arrival.json")
+        stay = self.storage.loadStay(room_key)
+        self.assertEqual(stay["idCard"], "12345678Z")
+        self.assertEqual(stay["localizer"], localizer)
+        self.assertEqual(stay["room_key"], room_key)
+
+    def test_sqlite_storage04(self):
+        """Test 4: a missing reservation or processed stay is reported with the same messages as the json files"""
+        with self.assertRaises(HotelManagementException) as ex:
+            self.storage.loadReservation("12345678Z")
+        self.assertEqual(ex.exception.message, "Wrong file or file path")
+        with self.assertRaises(HotelManagementException) as ex:
+            self.storage.loadStay("0" * 64)
+        self.assertEqual(ex.exception.message, "Room key not found in processed stays store.")
+
+    def test_sqlite_storage05(self):
+        """Test 5: a backend that does not implement every abstract method of HotelStorage cannot be created"""
+        class IncompleteStorage(HotelStorage):
+            """Backend that only implements the reservations"""
+            def isIdCardReserved(self, id_card: str):
+                return False
+
+            def saveReservations(self, reservations: dict):
+                pass
+
+        with self.assertRaises(TypeError) as ex:
+            IncompleteStorage(self.temp_dir.name)
+        self.assertIn("loadReservation", str(ex.exception))
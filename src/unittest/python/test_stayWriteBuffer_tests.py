@@ -0,0 +1,194 @@
+""" Module that tests the write-behind mode of the processed stays"""
+from unittest import TestCase
+from unittest.mock import patch
+import gc
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from freezegun import freeze_time
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.HotelStorage import lockedFile
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.StayWriteBuffer import OPEN_BUFFERS, StayWriteBuffer, WAL_FOLDER
+
+
+class TestStayWriteBuffer(TestCase):
+    """Test cases for StayWriteBuffer and the write-behind mode of HotelManager"""
+    def setUp(self):
+        # Each test uses its own stores
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage = JsonStorage(self.temp_dir.name)
+        self.buffers = []
+
+    def tearDown(self):
+        for buffer in self.buffers:
+            buffer.close()
+        self.temp_dir.cleanup()
+
+    def makeBuffer(self, **options):
+        """Returns a buffer of the stores of the test, which is closed at the end of the test"""
+        buffer = StayWriteBuffer(self.storage, **options)
+        self.buffers.append(buffer)
+        return buffer
+
+    def waitUntilStored(self, room_key: str):
+        """Waits until the stay of room_key has been stored, failing after 5 seconds"""
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                return self.storage.loadStay(room_key)
+            except HotelManagementException:
+                time.sleep(0.01)
+        return self.fail("The stay " + room_key + " was not stored")
+
+    def walSegments(self):
+        """Returns the names of the write ahead log segments"""
+        return [file_name for file_name in os.listdir(self.storage.getJsonDirectory(WAL_FOLDER))
+                if file_name.endswith(".wal")]
+
+    def writeSegment(self, segment_name: str, content: bytes):
+        """Writes a write ahead log segment, as a buffer that was not closed leaves it"""
+        with open(os.path.join(self.storage.getJsonDirectory(WAL_FOLDER), segment_name), "wb") as segment:
+            segment.write(content)
+
+    def test_stay_write_buffer01(self):
+        """Test 1: in write-behind mode a guest can check out before the stay is stored, and closing the HotelManager
+        stores it"""
+        with freeze_time("2024-07-01"):
+            hotel_manager = HotelManager(storage=self.storage, write_behind=True, flush_interval=60)
+            localizer = hotel_manager.roomReservation("5105105105105100", "John Smith", "12345678Z", "612345789",
+                                                      "single", "01/07/2024", 1)
+            with open(os.path.join(hotel_manager.getJsonDirectory("stays_store"), "arrival.json"), "w",
+                      encoding="utf-8") as stay_file:
+                json.dump({"Localizer": localizer, "IdCard": "12345678Z"}, stay_file)
+            room_key = hotel_manager.guestArrival("arrival.json")
+        with self.assertRaises(HotelManagementException):
+            self.storage.loadStay(room_key)
+        self.assertEqual(len(hotel_manager.stay_buffer), 1)
+        self.assertEqual(hotel_manager.occupancyOn("01/07/2024"), {"single": 1})
+        with freeze_time("2024-07-02"):
+            self.assertTrue(hotel_manager.guest_checkout(room_key))
+
+        hotel_manager.close()
+        self.assertEqual(self.storage.loadStay(room_key)["room_key"], room_key)
+        self.assertEqual(self.walSegments(), [])
+        with self.assertRaises(ValueError):
+            hotel_manager.stay_buffer.addStay(room_key, {})
+
+    def test_stay_write_buffer02(self):
+        """Test 2: the stays are stored every flush_interval seconds, and as soon as max_unflushed are waiting"""
+        buffer = self.makeBuffer(flush_interval=0.05)
+        buffer.addStay("a" * 64, {"room_key": "a" * 64})
+        self.waitUntilStored("a" * 64)
+        buffer.close()
+
+        buffer = self.makeBuffer(flush_interval=60, max_unflushed=2)
+        buffer.addStay("b" * 64, {"room_key": "b" * 64})
+        self.assertEqual(buffer.getStay("b" * 64), {"room_key": "b" * 64})
+        buffer.addStay("c" * 64, {"room_key": "c" * 64})
+        self.waitUntilStored("b" * 64)
+        self.waitUntilStored("c" * 64)
+
+    def test_stay_write_buffer03(self):
+        """Test 3: the stays of the segments left by a buffer that was not closed are stored by the next one, except
+        an incomplete last line"""
+        wal_directory = self.storage.getJsonDirectory(WAL_FOLDER)
+        # A segment of an older version, without owner, and the segments of an owner whose process has ended
+        self.writeSegment("stays.000000000001.wal",
+                          json.dumps({"key": "a" * 64, "data": {"room_key": "a" * 64}}).encode() + b"\n" +
+                          b"{\"key\": \"" + b"b" * 64)
+        self.writeSegment("stays.1-dead.000000000001.wal",
+                          json.dumps({"key": "c" * 64, "data": {"room_key": "c" * 64}}).encode() + b"\n")
+        self.writeSegment("stays.1-dead.000000000002.wal", b"")
+        self.writeSegment("stays.1-dead.lock", b"")
+        buffer = self.makeBuffer(flush_interval=60)
+        self.assertEqual(self.storage.loadStay("a" * 64), {"room_key": "a" * 64})
+        self.assertEqual(self.storage.loadStay("c" * 64), {"room_key": "c" * 64})
+        with self.assertRaises(HotelManagementException):
+            self.storage.loadStay("b" * 64)
+        # Only the empty segment of the new buffer is left
+        self.assertEqual(self.walSegments(), ["stays." + buffer.wal.owner + ".000000000001.wal"])
+        self.assertFalse(os.path.exists(os.path.join(wal_directory, "stays.1-dead.lock")))
+        with open(os.path.join(wal_directory, self.walSegments()[0]), "rb") as segment:
+            self.assertEqual(segment.read(), b"")
+
+    def test_stay_write_buffer04(self):
+        """Test 4: the stays of a flush that fails are kept in the buffer and in the write ahead log"""
+        buffer = self.makeBuffer(flush_interval=60)
+        buffer.addStay("a" * 64, {"room_key": "a" * 64})
+        with patch.object(self.storage, "saveStays", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                buffer.flush()
+        self.assertEqual(buffer.getStay("a" * 64), {"room_key": "a" * 64})
+        buffer.addStay("b" * 64, {"room_key": "b" * 64})
+        self.assertEqual(len(self.walSegments()), 2)
+        buffer.flush()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(self.storage.loadStay("a" * 64), {"room_key": "a" * 64})
+        self.assertEqual(self.storage.loadStay("b" * 64), {"room_key": "b" * 64})
+        self.assertEqual(len(self.walSegments()), 1)
+
+    def test_stay_write_buffer05(self):
+        """Test 5: a corrupt line of a segment, or an incomplete line that is not the last one of the last segment,
+        raises an exception and keeps every segment"""
+        wal_directory = self.storage.getJsonDirectory(WAL_FOLDER)
+        stay_line = json.dumps({"key": "a" * 64, "data": {"room_key": "a" * 64}}).encode() + b"\n"
+        for first_segment, second_segment in [(stay_line + b"not json\n" + stay_line, stay_line),
+                                              (stay_line + b"[1, 2]\n", stay_line),
+                                              (stay_line + b"{\"key\": \"", stay_line)]:
+            self.writeSegment("stays.000000000001.wal", first_segment)
+            self.writeSegment("stays.000000000002.wal", second_segment)
+            with self.assertRaises(HotelManagementException) as cm:
+                self.makeBuffer(flush_interval=60)
+            self.assertEqual(cm.exception.message, "Corrupt write ahead log segment stays.000000000001.wal")
+            self.assertEqual(sorted(self.walSegments()), ["stays.000000000001.wal", "stays.000000000002.wal"])
+            self.assertEqual(sorted(os.listdir(wal_directory)),
+                             ["recovery.lock", "stays.000000000001.wal", "stays.000000000002.wal"])
+            with self.assertRaises(HotelManagementException):
+                self.storage.loadStay("a" * 64)
+
+    def test_stay_write_buffer06(self):
+        """Test 6: a buffer that is dropped without being closed is released with its thread, and its stays are stored
+        when it is garbage collected"""
+        hotel_manager = HotelManager(storage=self.storage, write_behind=True, flush_interval=60)
+        hotel_manager.stay_buffer.addStay("a" * 64, {"room_key": "a" * 64})
+        self.assertIn(hotel_manager.stay_buffer, OPEN_BUFFERS)
+        buffer_reference = weakref.ref(hotel_manager.stay_buffer)
+        buffer_threads = [thread for thread in threading.enumerate() if thread.name == "StayWriteBuffer"]
+        del hotel_manager
+        gc.collect()
+        self.assertIsNone(buffer_reference())
+        for thread in buffer_threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(self.storage.loadStay("a" * 64), {"room_key": "a" * 64})
+        self.assertEqual(os.listdir(self.storage.getJsonDirectory(WAL_FOLDER)), ["recovery.lock"])
+
+    def test_stay_write_buffer07(self):
+        """Test 7: several buffers can share a storage root, and a buffer never recovers the segments of another
+        one that is still open"""
+        first_manager = HotelManager(storage_root=self.temp_dir.name, write_behind=True, flush_interval=60)
+        second_manager = HotelManager(storage_root=self.temp_dir.name, write_behind=True, flush_interval=60)
+        self.buffers.extend([first_manager.stay_buffer, second_manager.stay_buffer])
+        first_manager.stay_buffer.addStay("a" * 64, {"room_key": "a" * 64})
+        second_manager.stay_buffer.addStay("b" * 64, {"room_key": "b" * 64})
+        first_manager.stay_buffer.flush()
+        self.assertEqual(self.storage.loadStay("a" * 64), {"room_key": "a" * 64})
+        with self.assertRaises(HotelManagementException):
+            self.storage.loadStay("b" * 64)
+        self.makeBuffer(flush_interval=60)
+        with self.assertRaises(HotelManagementException):
+            self.storage.loadStay("b" * 64)
+        # The segment of the second buffer is still there, with its lock held
+        second_owner = second_manager.stay_buffer.wal.owner
+        self.assertIn("stays." + second_owner + ".000000000001.wal", self.walSegments())
+        with lockedFile(os.path.join(self.storage.getJsonDirectory(WAL_FOLDER), "stays." + second_owner + ".lock"),
+                        blocking=False) as lock_descriptor:
+            self.assertIsNone(lock_descriptor)
+        second_manager.close()
+        self.assertEqual(self.storage.loadStay("b" * 64), {"room_key": "b" * 64})
+        self.assertNotIn("stays." + second_owner + ".000000000001.wal", self.walSegments())
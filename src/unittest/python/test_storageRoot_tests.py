@@ -0,0 +1,64 @@
+""" Module that tests the configuration of the directory where the json stores are kept"""
+import os
+import tempfile
+from unittest import TestCase, mock
+from datetime import datetime
+from freezegun import freeze_time
+import UC3MTravel
+from UC3MTravel.HotelManager import HotelManager
+from UC3MTravel.HotelStorage import STORAGE_ROOT_VARIABLE
+
+
+class TestStorageRoot(TestCase):
+    """Test cases for the storage root of HotelManager"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage_root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @freeze_time(datetime.strptime("01/07/2024", "%d/%m/%Y"))
+    def test_storage_root01(self):
+        """Test 1: the stores are created and used inside the given storage_root"""
+        my_hotel_manager = HotelManager(storage_root=self.storage_root)
+        value = my_hotel_manager.roomReservation(credit_card="5105105105105100",
+                                                 name_surname="John Smith",
+                                                 id_card="12345678Z",
+                                                 phone_number="612345789",
+                                                 room_type="single",
+                                                 arrival_date="01/07/2024",
+                                                 num_days=1)
+        self.assertEqual(value, "385148f30bfe0c80599f7c844216578a")
+        self.assertTrue(os.path.isfile(os.path.join(self.storage_root, "reservations_store", "12345678Z.json")))
+
+    def test_storage_root02(self):
+        """Test 2: the environment variable is used when no storage_root is given"""
+        with mock.patch.dict(os.environ, {STORAGE_ROOT_VARIABLE: self.storage_root}):
+            my_hotel_manager = HotelManager()
+        self.assertEqual(my_hotel_manager.getJsonDirectory("stays_store"),
+                         os.path.join(self.storage_root, "stays_store"))
+
+    def test_storage_root03(self):
+        """Test 3: the directory is resolved once, so changing the current directory afterwards does not affect it"""
+        my_hotel_manager = HotelManager()
+        json_directory = my_hotel_manager.getJsonDirectory("reservations_store")
+        original_directory = os.getcwd()
+        os.chdir(self.storage_root)
+        try:
+            self.assertEqual(my_hotel_manager.getJsonDirectory("reservations_store"), json_directory)
+        finally:
+            os.chdir(original_directory)
+
+    def test_storage_root04(self):
+        """Test 4: outside of the project, the stores are kept next to the modules of the package"""
+        original_directory = os.getcwd()
+        os.chdir(self.storage_root)
+        try:
+            with mock.patch.dict(os.environ, {STORAGE_ROOT_VARIABLE: ""}):
+                my_hotel_manager = HotelManager()
+        finally:
+            os.chdir(original_directory)
+        package_directory = os.path.dirname(os.path.abspath(UC3MTravel.__file__))
+        self.assertEqual(my_hotel_manager.getJsonDirectory("reservations_store"),
+                         os.path.join(package_directory, "reservations_store"))
@@ -0,0 +1,85 @@
+""" Module that tests the export and import of the stores of StoreArchive"""
+from unittest import TestCase
+from unittest.mock import patch
+import os
+import tempfile
+from UC3MTravel.HotelManagementException import HotelManagementException
+from UC3MTravel.JournalStorage import JournalStorage
+from UC3MTravel.JsonStorage import JsonStorage
+from UC3MTravel.SqliteStorage import SqliteStorage
+from UC3MTravel.StoreArchive import exportStores, importStores
+
+
+class TestStoreArchive(TestCase):
+    """Test cases for exportStores and importStores"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.storage = JsonStorage(os.path.join(self.temp_dir.name, "json"))
+        for number in range(5):
+            id_card = f"{number:08d}" + "TRWAG"[number]
+            room_key = f"{number:064x}"
+            self.storage.saveReservations({id_card: {"id_card": id_card, "localizer": f"{number:032x}"}})
+            self.storage.saveStays({room_key: {"idCard": id_card, "localizer": f"{number:032x}",
+                                               "room_key": room_key}})
+            if number % 2 == 0:
+                self.storage.saveCheckout(room_key, {"room_key": room_key, "departure_date": "03/07/2024"})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def checkImported(self, storage):
+        """Checks that storage has every record of the json storage"""
+        for store in ["reservations", "stays", "checkouts"]:
+            self.assertEqual(sorted(storage.iterRecords(store)), sorted(self.storage.iterRecords(store)))
+        self.assertEqual(storage.loadReservation("00000002W")["localizer"], f"{2:032x}")
+        self.assertEqual(storage.loadStay(f"{4:064x}")["idCard"], "00000004G")
+
+    def test_store_archive01(self):
+        """Test 1: the json stores are exported to a JSON Lines archive and imported into a SQLite database"""
+        archive_path = os.path.join(self.temp_dir.name, "backup.jsonl")
+        report = exportStores(self.storage, archive_path)
+        self.assertEqual(report["stores"], {"reservations": 5, "stays": 5, "checkouts": 3})
+        with open(archive_path, "r", encoding="utf-8") as archive_file:
+            self.assertEqual(len(archive_file.readlines()), 13)
+
+        storage = SqliteStorage(os.path.join(self.temp_dir.name, "sqlite"))
+        report = importStores(storage, archive_path, batch_size=2)
+        self.assertEqual(report["records"], 13)
+        self.checkImported(storage)
+        storage.close()
+
+    def test_store_archive02(self):
+        """Test 2: a compressed archive is imported into a journal"""
+        archive_path = os.path.join(self.temp_dir.name, "backup.jsonl.gz")
+        exportStores(self.storage, archive_path)
+        storage = JournalStorage(os.path.join(self.temp_dir.name, "journal"), sync=False)
+        importStores(storage, archive_path)
+        self.checkImported(storage)
+        storage.close()
+
+    def test_store_archive03(self):
+        """Test 3: a SQLite database is exported page by page"""
+        storage = SqliteStorage(os.path.join(self.temp_dir.name, "sqlite"))
+        importStores(storage, self.exportArchive())
+        with patch("UC3MTravel.SqliteStorage.PAGE_SIZE", 2):
+            archive_path = os.path.join(self.temp_dir.name, "sqlite.jsonl")
+            self.assertEqual(exportStores(storage, archive_path)["records"], 13)
+        storage.close()
+        storage = JsonStorage(os.path.join(self.temp_dir.name, "imported"), sharded=True)
+        importStores(storage, archive_path)
+        self.checkImported(storage)
+
+    def test_store_archive04(self):
+        """Test 4: an archive with an invalid line is rejected"""
+        archive_path = os.path.join(self.temp_dir.name, "invalid.jsonl")
+        with open(archive_path, "w", encoding="utf-8") as archive_file:
+            archive_file.write('{"store":"reservations","key":"00000000T","data":{}}\n{"store":\n')
+        with self.assertRaises(HotelManagementException) as cm:
+            importStores(JsonStorage(os.path.join(self.temp_dir.name, "imported")), archive_path)
+        self.assertEqual(cm.exception.message, "Invalid archive line 2")
+
+    def exportArchive(self):
+        """Exports the json stores and returns the path of the archive"""
+        archive_path = os.path.join(self.temp_dir.name, "backup.jsonl")
+        exportStores(self.storage, archive_path)
+        return archive_path